@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from PySide6.QtCore import QEventLoop, QTimer, Qt
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtWidgets import QApplication, QLabel
+from scripts.thumbnail_cache import ThumbnailCache
+from scripts.carousel_loader import CarouselLoader
+from config import THUMBNAIL_SIZES
+
+# Carousel benchmark: click-to-paint latency of the property image carousel
+# Writes N synthetic 12-megapixel JPEGs (4000 x 3000) and clicks Next through them, pausing
+# DWELL ms on each image as someone looking at the photos would. Click-to-paint is the time from
+# the click until the label holds the new image, measured four ways: decoding the original on
+# the GUI thread (before), the thumbnail cache used synchronously, and CarouselLoader on a fresh
+# thumbnail folder (first lap) and again with its pixmap LRU warm (second lap). The report shows
+# the mean, 95th percentile and worst click, and the longest the GUI thread was blocked by a click.
+# Every painted image is checked to be the right one at the right height, and the script exits
+# with status 1 if any is wrong or the loader's prefetch missed more than the first image.
+#
+# Usage: python benchmarks/carousel_benchmark.py [photos] [dwell ms]
+# (set QT_QPA_PLATFORM=offscreen to run without a display)
+
+WIDTH, HEIGHT = 4000, 3000
+CAROUSEL = THUMBNAIL_SIZES["carousel"]
+
+def write_photo(path, rng): # Random colours smoothly enlarged: soft detail everywhere, like a photo
+    small_width, small_height = WIDTH // 100, HEIGHT // 100
+    pixels = bytes(rng.getrandbits(8) for _ in range(small_width * small_height * 3))
+    small = QImage(pixels, small_width, small_height, small_width * 3, QImage.Format_RGB888)
+    small.scaled(WIDTH, HEIGHT, Qt.IgnoreAspectRatio, Qt.SmoothTransformation).save(path, "JPG", 90)
+
+def wait(ms): # Run the event loop for ms milliseconds
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+def lap(paths, label, click, dwell): # Click through paths; returns (click-to-paint ms list, GUI-blocked ms list, ok)
+    latencies, blocked, ok = [], [], True
+    for path in paths:
+        start = time.perf_counter()
+        click(path)
+        blocked.append((time.perf_counter() - start) * 1000)
+        if label.property("path") != path: # Still loading: wait for the loader to paint it
+            loop = QEventLoop()
+            QTimer.singleShot(10000, loop.quit) # Give up after 10 s
+            label.painted = loop.quit
+            loop.exec()
+            label.painted = None
+        latencies.append((time.perf_counter() - start) * 1000)
+        ok = ok and label.property("path") == path and label.pixmap().height() == CAROUSEL
+        wait(dwell)
+    return latencies, blocked, ok
+
+def report(name, latencies, blocked): # One line of the table
+    p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"   {name:<28} {statistics.mean(latencies):8.1f} {p95:8.1f} {max(latencies):8.1f} {max(blocked):10.1f}")
+
+def main():
+    photos = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    dwell = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    app = QApplication(sys.argv[:1])
+    rng = random.Random(5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"photo{n}.jpg") for n in range(photos)]
+        for path in paths:
+            write_photo(path, rng)
+        print(f"🔬 {photos} photos of {WIDTH} x {HEIGHT}, {dwell} ms on each, carousel height {CAROUSEL} px")
+        print(f"   {'':<28} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8} {'GUI blocked':>10}")
+
+        label = QLabel()
+        label.painted = None
+        def paint(path, pixmap): # What PropertyDetailsPage.paint_image does
+            label.setPixmap(pixmap)
+            label.setProperty("path", path)
+            if label.painted:
+                label.painted()
+
+        before = lap(paths, label, lambda path: paint(path, QPixmap(path).scaledToHeight(CAROUSEL, Qt.SmoothTransformation)), dwell)
+        report("original on GUI thread", *before[:2])
+
+        sync_cache = ThumbnailCache(os.path.join(tmp, "thumbnails_sync"))
+        sync = lap(paths, label, lambda path: paint(path, sync_cache.pixmap(path, CAROUSEL)), dwell)
+        report("thumbnails, synchronous", *sync[:2])
+
+        loader = CarouselLoader(thumbnails=ThumbnailCache(os.path.join(tmp, "thumbnails")))
+        loader.loaded.connect(paint)
+        loader.set_images(paths)
+        index = {path: n for n, path in enumerate(paths)}
+        cold = lap(paths, label, lambda path: loader.show(index[path]), dwell)
+        report("loader, first lap", *cold[:2])
+        cold_misses = loader.stats["misses"]
+        warm = lap(paths, label, lambda path: loader.show(index[path]), dwell)
+        report("loader, second lap (LRU)", *warm[:2])
+
+        ok = before[2] and sync[2] and cold[2] and warm[2]
+        ok = ok and cold_misses <= 1 and loader.stats["misses"] == cold_misses
+        print(f"   loader: {loader.stats['hits']} click(s) served from memory, {loader.stats['misses']} waited for a decode, "
+              f"{loader.stats['prefetched']} prefetched")
+
+    print(("✅" if ok else "❌") + " Every click painted the right image, and only the first image had to be waited for")
+    sys.stdout.flush()
+    os._exit(0 if ok else 1) # Skip Qt teardown: queued decodes may still be finishing
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from cryptography.fernet import Fernet
+from scripts import encryption_manager
+from scripts.utils import compression
+
+# Compression benchmark: stored size, upload and preview time per codec
+# Writes a sample corpus like the documents the app stores (a text-heavy tenancy agreement
+# PDF, an inventory spreadsheet export, an uncompressed scan and a JPEG photo), then stores
+# every file with each available codec and with the automatic choice the app makes
+# (compression.codec_for, which skips formats that are already compressed). For each it
+# reports the stored size as a share of the original, the upload time (encrypt_file) and
+# the preview time (decrypt_to_bytes). Every stored file is decrypted and compared with
+# its original, and the script exits with status 1 if any differ.
+#
+# Usage: python benchmarks/compression_benchmark.py [scale]
+
+WORDS = ("tenant landlord property deposit rent agreement schedule clause inventory condition "
+         "kitchen bedroom carpet window boiler smoke alarm notice period guarantor the of and "
+         "shall must any such by with to in on for this be or").split()
+
+def build_corpus(folder, scale): # Sample documents; scale multiplies their sizes
+    rng = random.Random(1)
+    corpus = {}
+
+    def text(n_words): # Random prose from the tenancy vocabulary
+        return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+    pages = [f"BT /F1 11 Tf 72 720 Td ({text(450)}) Tj ET" for _ in range(400 * scale)]
+    corpus["agreement.pdf"] = b"%PDF-1.4\n" + b"".join(
+        f"{n} 0 obj << /Length {len(page)} >> stream\n{page}\nendstream endobj\n".encode() for n, page in enumerate(pages, start=1)
+    ) + b"%%EOF\n"
+    corpus["inventory.csv"] = "room,item,condition,notes\n".encode() + "".join(
+        f"{rng.choice(['Kitchen', 'Bedroom 1', 'Bedroom 2', 'Lounge', 'Bathroom'])},{rng.choice(WORDS)},"
+        f"{rng.choice(['Good', 'Fair', 'Worn', 'New'])},{text(12)}\n" for _ in range(30000 * scale)
+    ).encode()
+
+    width, height = 2480, 1754 * scale # A4 scan at 300 dpi, 8-bit grey: mostly white paper with lines of "ink"
+    rows = []
+    for y in range(height):
+        if y % 40 < 12:
+            rows.append(bytes(rng.choice((0, 40, 255, 255, 255)) for _ in range(width // 8)) * 8)
+        else:
+            rows.append(b"\xff" * width)
+    corpus["scan.bmp"] = b"BM" + bytes(52) + b"".join(rows)
+    corpus["photo.jpg"] = b"\xff\xd8\xff\xe0" + os.urandom(4 * 1024 * 1024 * scale) # Already compressed: looks random
+
+    paths = {}
+    for name, data in corpus.items():
+        paths[name] = os.path.join(folder, name)
+        with open(paths[name], "wb") as f:
+            f.write(data)
+    return paths
+
+def store(path, folder, codec): # Encrypt path with codec (None = automatic); returns (stored bytes, upload s, preview s, ok)
+    target = os.path.join(folder, os.path.basename(path) + ".encrypted")
+    start = time.perf_counter()
+    encryption_manager.encrypt_file(path, target, codec=codec)
+    upload = time.perf_counter() - start
+    start = time.perf_counter()
+    data = encryption_manager.decrypt_to_bytes(target)
+    preview = time.perf_counter() - start
+    with open(path, "rb") as f:
+        ok = data == f.read()
+    size = os.path.getsize(target)
+    os.remove(target)
+    return size, upload, preview, ok
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = os.path.join(tmp, "key.key")
+        with open(key_path, "wb") as f:
+            f.write(Fernet.generate_key())
+        encryption_manager.KeyService(key_path)
+
+        paths = build_corpus(tmp, scale)
+        original = sum(os.path.getsize(p) for p in paths.values())
+        print(f"🔬 Sample corpus: {len(paths)} documents, {original / 1048576:.1f} MB")
+        for name, path in paths.items():
+            print(f"   {name:<15} {os.path.getsize(path) / 1048576:6.1f} MB, automatic codec: {compression.codec_for(path).name}")
+
+        print(f"{'codec':<10} {'stored':>8} {'ratio':>7} {'upload':>10} {'preview':>10}")
+        ok = True
+        runs = [(codec.name, codec) for codec in compression.CODECS.values()] + [("automatic", None)]
+        for label, codec in runs:
+            stored = upload = preview = 0
+            for path in paths.values():
+                size, up, view, same = store(path, tmp, codec)
+                stored, upload, preview, ok = stored + size, upload + up, preview + view, ok and same
+            print(f"{label:<10} {stored / 1048576:5.1f} MB {stored / original:6.0%} {upload * 1000:7.0f} ms {preview * 1000:7.0f} ms")
+
+    print(("✅" if ok else "❌") + " Every stored document decrypts to its original")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from scripts.database_manager import apply_pragmas
+from scripts.migration_manager import MigrationManager
+from scripts.dashboard_stats import DashboardStatsService, DASHBOARD_STATS_QUERY, RECOMPUTE_STATS
+
+# Dashboard benchmark: separate COUNT queries vs the single-pass query vs the stored counters
+# Builds the real schema (all migrations) in a temporary database, fills it with a
+# portfolio of N properties (plus tenants, tenancies, payments, maintenance and
+# documents), then times the nine COUNT queries the dashboard used to run one by one,
+# the single-pass DASHBOARD_STATS_QUERY (the daily recompute), and
+# DashboardStatsService.collect() reading the trigger-maintained dashboard_stats row.
+# It then runs a batch of writes and checks the triggers kept the stored counters
+# equal to a full recount; the script exits with status 1 if any figures differ.
+#
+# Usage: python benchmarks/dashboard_benchmark.py [properties]
+
+RUNS = 20
+STATUSES = ["Open", "In Progress", "Resolved", "Closed", "Voided"]
+
+# The queries DashboardPage ran before, in DashboardStats field order
+SEPARATE_QUERIES = [
+    "SELECT COUNT(*) FROM properties",
+    "SELECT COUNT(*) FROM tenants",
+    """SELECT COUNT(*) FROM payments WHERE payment_type = 'rent'
+       AND due_date BETWEEN DATE('now') AND DATE('now', '+30 day')""",
+    "SELECT COUNT(*) FROM maintenance WHERE LOWER(status) NOT IN ('resolved', 'voided')",
+    "SELECT COUNT(*) FROM maintenance WHERE LOWER(status) NOT IN ('resolved', 'closed')",
+    """SELECT COUNT(*) FROM properties p WHERE NOT EXISTS (
+           SELECT 1 FROM tenancies t
+           WHERE t.property_id = p.property_id AND DATE('now') BETWEEN t.start_date AND t.end_date)""",
+    "SELECT COUNT(*) FROM tenancies WHERE end_date <= DATE('now', '+30 day')",
+    "SELECT COUNT(*) FROM payments WHERE status = 'unpaid' AND due_date < DATE('now')",
+    """SELECT COUNT(*) FROM (
+           SELECT expiry_date FROM tenant_documents UNION ALL SELECT expiry_date FROM landlord_documents
+           UNION ALL SELECT expiry_date FROM property_documents UNION ALL SELECT expiry_date FROM tenancy_documents
+       ) WHERE expiry_date IS NOT NULL AND expiry_date <= DATE('now', '+30 day')""",
+]
+
+class ConnectionDB: # The DatabaseManager call DashboardStatsService needs, on a plain connection
+    def __init__(self, conn):
+        self.conn = conn
+
+    def fetchall(self, query, params=None):
+        return self.conn.execute(query, params or ()).fetchall()
+
+    def execute(self, query, params=()):
+        self.conn.execute(query, params)
+        self.conn.commit()
+
+def day(offset): # ISO date offset days from today
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+def build_database(path, properties): # Real schema plus a random portfolio
+    conn = sqlite3.connect(path)
+    apply_pragmas(conn)
+    MigrationManager(conn).apply()
+    rng = random.Random(42)
+    start = time.perf_counter()
+
+    conn.executemany("INSERT INTO landlords (first_name, last_name, status) VALUES (?, ?, 'Active')",
+                     [(f"Landlord{i}", "Owner") for i in range(max(1, properties // 10))])
+    conn.executemany("INSERT INTO properties (door_number, street, postcode, city, status) VALUES (?, 'High Street', 'AB1 2CD', 'London', 'Available')",
+                     [(str(i),) for i in range(properties)])
+    conn.executemany("INSERT INTO tenants (first_name, last_name, status) VALUES (?, 'Tenant', 'Active')",
+                     [(f"Tenant{i}",) for i in range(properties)])
+
+    tenancies = []
+    for property_id in range(1, properties + 1):
+        if rng.random() < 0.8: # Roughly one in five properties has no tenancy at all
+            begin = rng.randint(-700, 60)
+            tenancies.append((property_id, day(begin), day(begin + 365)))
+    conn.executemany("INSERT INTO tenancies (property_id, start_date, end_date, status) VALUES (?, ?, ?, 'Active')", tenancies)
+
+    payments = [
+        (tenancy_id, tenancy_id, day(rng.randint(-300, 90)), rng.choice(["paid", "unpaid"]), rng.choice(["rent", "deposit"]))
+        for tenancy_id in range(1, len(tenancies) + 1) for _ in range(10)
+    ]
+    conn.executemany("INSERT INTO payments (tenancy_id, tenant_id, due_date, status, payment_type) VALUES (?, ?, ?, ?, ?)", payments)
+    conn.executemany("INSERT INTO maintenance (property_id, issue, date_reported, status) VALUES (?, 'Leak', ?, ?)",
+                     [(rng.randint(1, properties), day(-rng.randint(0, 400)), rng.choice(STATUSES)) for _ in range(properties * 2)])
+
+    for table, owner, owners in [("tenant_documents", "tenant_id", properties), ("property_documents", "property_id", properties),
+                                 ("landlord_documents", "landlord_id", max(1, properties // 10)), ("tenancy_documents", "tenancy_id", len(tenancies))]:
+        conn.executemany(f"INSERT INTO {table} ({owner}, doc_name, expiry_date) VALUES (?, 'doc', ?)",
+                         [(i, day(rng.randint(-30, 400)) if rng.random() < 0.7 else None) for i in range(1, owners + 1)])
+    conn.commit()
+    print(f"🗄️ Built a portfolio of {properties:,} properties, {len(tenancies):,} tenancies and "
+          f"{len(payments):,} payments in {time.perf_counter() - start:.2f}s")
+    return conn
+
+def median_ms(fn): # Median time of fn() over RUNS runs, plus its last result
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000, result
+
+def apply_writes(conn, properties): # Typical edits: new tenancies, paid rent, resolved issues, deletions
+    rng = random.Random(7)
+    for _ in range(200):
+        property_id = rng.randint(1, properties)
+        begin = rng.randint(-30, 30)
+        conn.execute("INSERT INTO tenancies (property_id, start_date, end_date, status) VALUES (?, ?, ?, 'Active')",
+                     (property_id, day(begin), day(begin + 180)))
+        conn.execute("UPDATE payments SET status = 'paid' WHERE payment_id = ?", (rng.randint(1, properties),))
+        conn.execute("UPDATE maintenance SET status = 'Resolved' WHERE maintenance_id = ?", (rng.randint(1, properties),))
+        conn.execute("DELETE FROM tenancies WHERE tenancy_id = ?", (rng.randint(1, properties // 2),))
+    conn.execute("DELETE FROM properties WHERE property_id = ?", (properties,)) # Cascades to its tenancies
+    conn.commit()
+
+def counters(stats): # The nine figures of a DashboardStats, without the timing fields
+    return (stats.total_properties, stats.total_tenants, stats.rent_due, stats.outstanding_maintenance,
+            stats.unresolved_maintenance, stats.vacant_properties, stats.ending_soon,
+            stats.overdue_payments, stats.expiring_documents)
+
+def main():
+    properties = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(os.path.join(tmp, "bench.db"), properties)
+        service = DashboardStatsService(ConnectionDB(conn))
+
+        separate_ms, separate = median_ms(lambda: tuple(conn.execute(query).fetchone()[0] for query in SEPARATE_QUERIES))
+        single_ms, single = median_ms(lambda: tuple(conn.execute(DASHBOARD_STATS_QUERY).fetchone()))
+        recompute_ms, _ = median_ms(lambda: conn.execute(RECOMPUTE_STATS))
+        stored_ms, stats = median_ms(service.collect)
+
+        print(f"🔬 Median of {RUNS} runs")
+        print(f"   {len(SEPARATE_QUERIES)} separate queries:   {separate_ms:8.2f} ms")
+        print(f"   single-pass query:    {single_ms:8.2f} ms ({separate_ms / max(single_ms, 0.001):.1f}x)")
+        print(f"   daily recompute:      {recompute_ms:8.2f} ms")
+        print(f"   stored counters read: {stored_ms:8.2f} ms ({separate_ms / max(stored_ms, 0.001):.0f}x)")
+        ok = separate == single == counters(stats)
+        print(("✅" if ok else "❌") + " Single-pass and stored figures match the separate queries")
+
+        start = time.perf_counter()
+        apply_writes(conn, properties)
+        print(f"✍️ 801 writes with the counter triggers took {(time.perf_counter() - start) * 1000:.0f} ms")
+        after = counters(service.collect())
+        fresh = tuple(conn.execute(DASHBOARD_STATS_QUERY).fetchone())
+        kept = after == fresh
+        print(("✅" if kept else "❌") + " Triggers kept the stored counters equal to a full recount")
+        if not kept:
+            print(f"   recount {fresh}\n   stored  {after}")
+        conn.close()
+
+    sys.exit(0 if ok and kept else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from config import DB_PRAGMAS
+from scripts.database_manager import ConnectionPool
+
+# Read/write concurrency benchmark for the database PRAGMA profile
+# A writer thread keeps inserting payments in small transactions (like details pages
+# saving) while reader threads run the manager-table query. The run is repeated with
+# SQLite's default rollback journal and with the tuned WAL profile from config.DB_PRAGMAS,
+# and reports reads completed, read latency (p50/p95/max) and writes completed.
+#
+# Usage: python benchmarks/db_concurrency_benchmark.py [seconds] [readers]
+
+ROLLBACK_PROFILE = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+READ_QUERY = """
+    SELECT p.payment_id, t.first_name || ' ' || t.last_name, p.amount, p.status
+    FROM payments p JOIN tenants t ON p.tenant_id = t.tenant_id
+    ORDER BY p.payment_id DESC LIMIT 50
+"""
+
+def seed_database(path, pragmas): # Create the tables and some starting rows
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode = {pragmas.get('journal_mode', 'DELETE')};")
+    conn.executescript("""
+        CREATE TABLE tenants (tenant_id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT);
+        CREATE TABLE payments (
+            payment_id INTEGER PRIMARY KEY, tenant_id INTEGER, amount REAL, status TEXT,
+            FOREIGN KEY (tenant_id) REFERENCES tenants (tenant_id)
+        );
+    """)
+    conn.executemany("INSERT INTO tenants (first_name, last_name) VALUES (?, ?)", [(f"First{i}", f"Last{i}") for i in range(1000)])
+    conn.executemany("INSERT INTO payments (tenant_id, amount, status) VALUES (?, ?, ?)", [(i % 1000 + 1, 950.0, "paid") for i in range(20000)])
+    conn.commit()
+    conn.close()
+
+def percentile(values, pct): # Simple percentile helper for the latency report
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+def run_profile(label, pragmas, seconds, readers): # Run writer + readers for a fixed time
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_database(path, pragmas)
+        pool = ConnectionPool(path, pool_size=readers + 1, pragmas=pragmas)
+
+        stop = threading.Event()
+        latencies = []
+        writes = [0]
+        lock = threading.Lock()
+
+        def writer(): # Each write holds the lock briefly, like saving a details page
+            while not stop.is_set():
+                conn, pooled = pool.acquire()
+                try:
+                    conn.execute("INSERT INTO payments (tenant_id, amount, status) VALUES (1, 100.0, 'unpaid')")
+                    conn.execute("UPDATE payments SET status = 'paid' WHERE payment_id = (SELECT MAX(payment_id) FROM payments)")
+                    time.sleep(0.002) # Time spent inside the transaction
+                    conn.commit()
+                    writes[0] += 1
+                except sqlite3.OperationalError:
+                    conn.rollback()
+                finally:
+                    pool.release(conn, pooled)
+
+        def reader(): # Time every manager-table read
+            local = []
+            while not stop.is_set():
+                conn, pooled = pool.acquire()
+                start = time.perf_counter()
+                try:
+                    conn.execute(READ_QUERY).fetchall()
+                    local.append(time.perf_counter() - start)
+                except sqlite3.OperationalError:
+                    pass
+                finally:
+                    pool.release(conn, pooled)
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        pool.close_all()
+
+        ms = [l * 1000 for l in latencies]
+        print(f"{label:<9} reads {len(ms):>7} ({len(ms) / seconds:8.0f}/s) | "
+              f"p50 {percentile(ms, 0.50):7.2f} ms | p95 {percentile(ms, 0.95):7.2f} ms | "
+              f"max {max(ms) if ms else 0:8.2f} ms | writes {writes[0]:>6}")
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print(f"🔬 {readers} reader(s) + 1 writer for {seconds:g}s per profile")
+    run_profile("rollback", ROLLBACK_PROFILE, seconds, readers)
+    run_profile("wal", DB_PRAGMAS, seconds, readers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from scripts.database_manager import ConnectionPool
+
+# Benchmark for the pooled database connections
+# Runs the same mix of small queries the dashboard and managers issue, first by opening a
+# new connection per query (the old DatabaseManager behaviour) and then through the
+# ConnectionPool. Reports connections opened per second and per-query latency for both.
+#
+# Usage: python benchmarks/db_pool_benchmark.py [queries] [threads]
+
+QUERIES = [
+    "SELECT COUNT(*) FROM properties",
+    "SELECT COUNT(*) FROM tenants",
+    "SELECT COUNT(*) FROM maintenance WHERE LOWER(status) NOT IN ('resolved', 'voided')",
+    "SELECT tenant_id, first_name, last_name FROM tenants WHERE tenant_id = 42",
+]
+
+def seed_database(path): # Create a small database with the tables the queries touch
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE properties (property_id INTEGER PRIMARY KEY, street TEXT);
+        CREATE TABLE tenants (tenant_id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT);
+        CREATE TABLE maintenance (maintenance_id INTEGER PRIMARY KEY, status TEXT);
+    """)
+    conn.executemany("INSERT INTO properties (street) VALUES (?)", [(f"Street {i}",) for i in range(500)])
+    conn.executemany("INSERT INTO tenants (first_name, last_name) VALUES (?, ?)", [(f"First{i}", f"Last{i}") for i in range(2000)])
+    conn.executemany("INSERT INTO maintenance (status) VALUES (?)", [("Open" if i % 3 else "Resolved",) for i in range(300)])
+    conn.commit()
+    conn.close()
+
+def run_unpooled(path, n): # The old behaviour: a new connection (and PRAGMA) for every query
+    opened = 0
+    for i in range(n):
+        conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        opened += 1
+        conn.execute(QUERIES[i % len(QUERIES)]).fetchall()
+        conn.commit()
+        conn.close()
+    return opened
+
+def run_pooled(pool, n): # The new behaviour: reuse the thread's pooled connection
+    for i in range(n):
+        conn, pooled = pool.acquire()
+        conn.execute(QUERIES[i % len(QUERIES)]).fetchall()
+        conn.commit()
+        pool.release(conn, pooled)
+
+def run_threads(target, threads): # Run target() on several threads at once and time it
+    workers = [threading.Thread(target=target) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - start
+
+def report(label, elapsed, total_queries, opened): # Print one line of results
+    print(f"{label:<10} {total_queries:>8} queries in {elapsed:7.3f}s | "
+          f"{total_queries / elapsed:10.0f} queries/s | "
+          f"{elapsed / total_queries * 1_000_000:8.1f} µs/query | "
+          f"{opened:>7} connections opened ({opened / elapsed:9.0f}/s)")
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_database(path)
+        total = n * threads
+
+        print(f"🔬 {n} queries on each of {threads} thread(s)")
+
+        opened = []
+        elapsed = run_threads(lambda: opened.append(run_unpooled(path, n)), threads)
+        report("before", elapsed, total, sum(opened))
+
+        pool = ConnectionPool(path)
+        elapsed = run_threads(lambda: run_pooled(pool, n), threads)
+        report("after", elapsed, total, pool.stats["opened"])
+        pool.close_all()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from cryptography.fernet import Fernet
+from scripts import encryption_manager
+from scripts.blob_store import BlobStore
+
+# Deduplication benchmark: per-entity encrypted copies vs the content-addressed blob store
+# Writes a random "joint tenancy agreement" of N MB and attaches it to several records,
+# first the old way (one encrypted copy in every entity folder) and then through BlobStore,
+# which hashes the file (once, while it is unchanged) and only encrypts the first copy. The report shows the upload time
+# and the bytes on disk for both. Every stored copy is decrypted and compared with the
+# original, and the script exits with status 1 if any differ or the blob store kept more
+# than one blob.
+#
+# Usage: python benchmarks/dedup_benchmark.py [megabytes] [records]
+
+def folder_bytes(path): # Total size of the files under path
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    records = int(sys.argv[2]) if len(sys.argv) > 2 else 5 # e.g. four tenants and the tenancy
+    key = Fernet.generate_key()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original = os.path.join(tmp, "agreement.pdf")
+        with open(original, "wb") as f:
+            for _ in range(megabytes):
+                f.write(os.urandom(1024 * 1024))
+        with open(original, "rb") as f:
+            expected = f.read()
+
+        key_path = os.path.join(tmp, "key.key")
+        with open(key_path, "wb") as f:
+            f.write(key)
+        encryption_manager.KeyService(key_path) # Both runs use the key from memory
+
+        per_entity = os.path.join(tmp, "entities")
+        start = time.perf_counter()
+        copies = []
+        for record in range(records): # Before: every record gets its own encrypted copy
+            folder = os.path.join(per_entity, str(record))
+            os.makedirs(folder)
+            copies.append(os.path.join(folder, "agreement.pdf.encrypted"))
+            encryption_manager.encrypt_file(original, copies[-1])
+        per_entity_s = time.perf_counter() - start
+
+        store = BlobStore(os.path.join(tmp, "blobs"))
+        start = time.perf_counter()
+        hashes = [store.store(original)[0] for _ in range(records)]
+        blob_s = time.perf_counter() - start
+
+        per_entity_mb, blob_mb = folder_bytes(per_entity) / 1048576, folder_bytes(store.root) / 1048576
+        print(f"🔬 {megabytes} MB document attached to {records} records")
+        print(f"   per-entity copies: {per_entity_s * 1000:8.0f} ms {per_entity_mb:8.1f} MB on disk")
+        print(f"   blob store:        {blob_s * 1000:8.0f} ms {blob_mb:8.1f} MB on disk "
+              f"({per_entity_mb / max(blob_mb, 0.001):.1f}x less)")
+
+        paths = copies + [store.path(h) for h in set(hashes)]
+        ok = len(set(hashes)) == 1 and all(encryption_manager.decrypt_to_bytes(p) == expected for p in paths)
+
+    print(("✅" if ok else "❌") + " One blob stored, and every copy decrypts to the original")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
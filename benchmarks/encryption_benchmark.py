@@ -0,0 +1,140 @@
+import io
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from cryptography.fernet import Fernet
+from scripts import encryption_manager
+
+# Encryption benchmark: whole-file Fernet vs the chunked AES-GCM container
+# Writes a random document of N MB, then encrypts and decrypts it both the old way (read
+# the whole file, one Fernet token) and with encryption_manager's streaming format. Each
+# step runs in its own Python process so its peak RSS can be measured on its own; the
+# report shows throughput (MB/s) and peak RSS above the interpreter's baseline. The
+# decrypted copies are compared with the original and the script exits with status 1
+# if any differ. Finally it encrypts many small files with the key read from disk for
+# every file (as before KeyService) and with the key served from memory.
+#
+# Usage: python benchmarks/encryption_benchmark.py [megabytes]
+
+def peak_rss_mb(): # Peak resident memory of this process, in MB
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024 # Bytes on macOS, KiB elsewhere
+    except ImportError: # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except ImportError:
+            return float("nan")
+
+def fernet_encrypt(src, dst, key): # What encrypt_file did before the chunked format
+    with open(src, "rb") as f:
+        data = f.read()
+    with open(dst, "wb") as f:
+        f.write(Fernet(key).encrypt(data))
+
+def fernet_decrypt(src, dst, key): # What decrypt_file did before the chunked format
+    with open(src, "rb") as f:
+        data = f.read()
+    with open(dst, "wb") as f:
+        f.write(Fernet(key).decrypt(data))
+
+STEPS = {
+    "fernet-encrypt": fernet_encrypt,
+    "fernet-decrypt": fernet_decrypt,
+    "stream-encrypt": encryption_manager.encrypt_file,
+    "stream-decrypt": encryption_manager.decrypt_file,
+}
+
+def worker(step, src, dst, key): # Child process: run one step and print "seconds peak_mb baseline_mb"
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    STEPS[step](src, dst, key.encode())
+    print(f"{time.perf_counter() - start} {peak_rss_mb()} {baseline}")
+
+def run_step(step, src, dst, key): # Run a step in a fresh interpreter and return (seconds, extra peak MB)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", step, src, dst, key.decode()],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    seconds, peak, baseline = (float(value) for value in output[-3:])
+    return seconds, peak - baseline
+
+def same_contents(a, b): # Compare two files without loading either whole
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        while True:
+            block_a, block_b = fa.read(1 << 20), fb.read(1 << 20)
+            if block_a != block_b:
+                return False
+            if not block_a:
+                return True
+
+SMALL_FILES = 2000
+SMALL_FILE_SIZE = 8 * 1024
+
+def time_small_files(key_path): # Seconds to encrypt SMALL_FILES documents: key read per file vs KeyService
+    data = os.urandom(SMALL_FILE_SIZE)
+
+    start = time.perf_counter()
+    for _ in range(SMALL_FILES): # Old behaviour: read the key file and build the ciphers every time
+        with open(key_path, "rb") as f:
+            key = f.read()
+        encryption_manager.encrypt_stream(io.BytesIO(data), io.BytesIO(), key)
+    per_file = time.perf_counter() - start
+
+    service = encryption_manager.KeyService(key_path)
+    start = time.perf_counter()
+    for _ in range(SMALL_FILES):
+        encryption_manager.encrypt_stream(io.BytesIO(data), io.BytesIO())
+    cached = time.perf_counter() - start
+    return per_file, cached, service.stats["loads"]
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(*sys.argv[2:6])
+        return
+
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    key = Fernet.generate_key()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original = os.path.join(tmp, "document.pdf")
+        with open(original, "wb") as f:
+            for _ in range(megabytes):
+                f.write(os.urandom(1024 * 1024))
+
+        print(f"🔬 {megabytes} MB document, chunk size {encryption_manager.ENCRYPTION_CHUNK_SIZE // 1024} KiB")
+        print(f"{'step':<16} {'seconds':>8} {'MB/s':>8} {'peak RSS':>10} {'file MB':>8}")
+        ok = True
+        for scheme in ("fernet", "stream"):
+            encrypted = os.path.join(tmp, f"{scheme}.encrypted")
+            decrypted = os.path.join(tmp, f"{scheme}.decrypted")
+            for step, src, dst in ((f"{scheme}-encrypt", original, encrypted), (f"{scheme}-decrypt", encrypted, decrypted)):
+                seconds, peak = run_step(step, src, dst, key)
+                size = os.path.getsize(dst) / (1024 * 1024)
+                print(f"{step:<16} {seconds:8.2f} {megabytes / seconds:8.1f} {peak:7.0f} MB {size:8.1f}")
+            ok = ok and same_contents(original, decrypted)
+            os.remove(decrypted)
+
+        # Files written before the chunked format must still open
+        legacy_copy = os.path.join(tmp, "legacy.decrypted")
+        encryption_manager.decrypt_file(os.path.join(tmp, "fernet.encrypted"), legacy_copy, key)
+        ok = ok and same_contents(original, legacy_copy)
+
+        key_path = os.path.join(tmp, "key.key")
+        with open(key_path, "wb") as f:
+            f.write(key)
+        per_file, cached, loads = time_small_files(key_path)
+        print(f"🔑 {SMALL_FILES} x {SMALL_FILE_SIZE // 1024} KB files: key read per file {per_file * 1000:.0f} ms, "
+              f"KeyService {cached * 1000:.0f} ms ({loads} key load)")
+
+    print(("✅" if ok else "❌") + " Decrypted copies (including a legacy Fernet file) match the original")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from scripts.database_manager import apply_pragmas
+from scripts.migration_manager import MigrationManager
+from scripts.expiry_scanner import ExpiryScanner, DOCUMENT_TABLES, START
+
+# Expiry scanner benchmark: paged expiring-documents list at scale
+# Builds the real schema (all migrations) in a temporary database with N documents spread
+# over the four *_documents tables (most with an expiry date, a share of them inside the
+# 30-day window), then times ExpiryScanner.count(), the first page and a page deep into the
+# list against the naive approach: a UNION ALL over the four tables sorted as a whole and
+# paged with OFFSET. Every page walked from the start to the end is compared with the naive
+# full sort, and the script exits with status 1 if the lists differ.
+#
+# Usage: python benchmarks/expiry_benchmark.py [documents]
+
+RUNS = 10
+OWNERS = 1000 # Tenants, landlords, properties and tenancies the documents belong to
+WINDOW_DAYS = 365 # Wide window so the list is long enough to page deep into
+
+NAIVE_QUERY = " UNION ALL ".join(
+    f"SELECT '{table.split('_')[0]}' AS entity_type, doc_id, expiry_date FROM {table} "
+    f"WHERE expiry_date IS NOT NULL AND expiry_date <= DATE('now', '+{WINDOW_DAYS} day')"
+    for table in DOCUMENT_TABLES
+) + " ORDER BY expiry_date, doc_id, entity_type LIMIT 50 OFFSET ?"
+
+class ConnectionDB: # The DatabaseManager call ExpiryScanner needs, on a plain connection
+    def __init__(self, conn):
+        self.conn = conn
+
+    def fetchall(self, query, params=None):
+        return self.conn.execute(query, params or ()).fetchall()
+
+def build_database(path, documents): # Real schema plus documents with random expiry dates
+    conn = sqlite3.connect(path)
+    apply_pragmas(conn)
+    MigrationManager(conn).apply()
+    rng = random.Random(3)
+    today = date.today()
+    conn.executemany("INSERT INTO tenants (first_name, last_name) VALUES (?, 'Tenant')", [(str(i),) for i in range(OWNERS)])
+    conn.executemany("INSERT INTO landlords (first_name, last_name) VALUES (?, 'Owner')", [(str(i),) for i in range(OWNERS)])
+    conn.executemany("INSERT INTO properties (door_number, street, postcode) VALUES (?, 'High Street', 'AB1 2CD')", [(str(i),) for i in range(OWNERS)])
+    conn.executemany("INSERT INTO tenancies (property_id, start_date, end_date) VALUES (?, '2025-01-01', '2026-01-01')",
+                     [(i,) for i in range(1, OWNERS + 1)])
+    per_table = documents // len(DOCUMENT_TABLES)
+    for table in DOCUMENT_TABLES:
+        owner = table.split("_")[0] + "_id"
+        conn.executemany(f"INSERT INTO {table} ({owner}, doc_name, doc_type, expiry_date) VALUES (?, 'doc', 'Other', ?)", [
+            (rng.randint(1, OWNERS), (today + timedelta(days=rng.randint(-60, 1500))).isoformat() if rng.random() < 0.8 else None)
+            for _ in range(per_table)
+        ])
+    conn.commit()
+    return conn
+
+def median_ms(fn): # Median time of fn() over RUNS runs, plus its last result
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000, result
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 400_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(os.path.join(tmp, "bench.db"), documents)
+        scanner = ExpiryScanner(ConnectionDB(conn))
+
+        # Walk the whole list a page at a time, keeping the cursor of each page
+        walked, cursors, cursor = [], [], START
+        while cursor is not None:
+            page, cursor = scanner.page(WINDOW_DAYS, after=cursor)
+            walked.extend((doc.entity_type, doc.doc_id, doc.expiry_date) for doc in page)
+            cursors.append(cursor)
+        deep = len(cursors) * 3 // 4 # A page three quarters of the way down
+
+        count_ms, count = median_ms(lambda: scanner.count(WINDOW_DAYS))
+        first_ms, _ = median_ms(lambda: scanner.page(WINDOW_DAYS))
+        deep_ms, _ = median_ms(lambda: scanner.page(WINDOW_DAYS, after=cursors[deep - 1]))
+        naive_first_ms, _ = median_ms(lambda: conn.execute(NAIVE_QUERY, (0,)).fetchall())
+        naive_deep_ms, _ = median_ms(lambda: conn.execute(NAIVE_QUERY, (deep * 50,)).fetchall())
+
+        naive = conn.execute(NAIVE_QUERY.replace("LIMIT 50 OFFSET ?", "")).fetchall()
+        ok = walked == [tuple(row) for row in naive] and count == len(naive)
+        conn.close()
+
+    print(f"🔬 {documents:,} documents, {count:,} expiring within {WINDOW_DAYS} days ({len(cursors)} pages), median of {RUNS} runs")
+    print(f"   count:                      {count_ms:8.2f} ms")
+    print(f"   first page: scanner {first_ms:8.2f} ms, UNION ALL + OFFSET {naive_first_ms:8.2f} ms")
+    print(f"   page {deep:>5}: scanner {deep_ms:8.2f} ms, UNION ALL + OFFSET {naive_deep_ms:8.2f} ms")
+    print(("✅" if ok else "❌") + " Paging through the scanner returns the full sorted list")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
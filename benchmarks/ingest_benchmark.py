@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import random
+import shutil
+import struct
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader
+from scripts.database_manager import DatabaseManager
+from scripts.thumbnail_cache import ThumbnailCache
+from scripts.image_ingest import ImageIngest
+from config import UPLOAD_WORKERS, IMAGE_MAX_DIMENSION, THUMBNAIL_SIZES
+
+# Image upload benchmark: adding a batch of phone photos to a property
+# Writes N synthetic 12-megapixel JPEGs (4000 x 3000); every third one carries an EXIF tag saying
+# it must be turned 90 degrees, and two pairs share a file name (from different folders). The
+# batch is uploaded the old way (copy, thumbnails and one INSERT per file, on the calling thread)
+# and through ImageIngest with one worker and with UPLOAD_WORKERS. Every ingested photo is
+# checked to be stored upright with its longer side at most IMAGE_MAX_DIMENSION, to have its
+# thumbnails and its row, and no file may overwrite another. The script also checks that a batch
+# whose INSERT fails leaves no files behind. It exits with status 1 if any check fails.
+#
+# Usage: python benchmarks/ingest_benchmark.py [photos]
+
+WIDTH, HEIGHT = 4000, 3000
+
+def exif_orientation(orientation): # APP1 segment holding just an EXIF orientation tag
+    tiff = b"MM\x00\x2a" + struct.pack(">I", 8) # Big-endian TIFF header, first IFD at offset 8
+    tiff += struct.pack(">H", 1) + struct.pack(">HHIHH", 0x0112, 3, 1, orientation, 0) + struct.pack(">I", 0)
+    payload = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+def write_photo(path, rng, orientation=None): # Random colours smoothly enlarged, optionally tagged as rotated
+    small_width, small_height = WIDTH // 100, HEIGHT // 100
+    pixels = bytes(rng.getrandbits(8) for _ in range(small_width * small_height * 3))
+    small = QImage(pixels, small_width, small_height, small_width * 3, QImage.Format_RGB888)
+    small.scaled(WIDTH, HEIGHT, Qt.IgnoreAspectRatio, Qt.SmoothTransformation).save(path, "JPG", 90)
+    if orientation:
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:2] + exif_orientation(orientation) + data[2:]) # Right after the SOI marker
+
+def old_upload(db, thumbnails, property_id, folder, files): # What ImagePickerDialog.upload_image did
+    for file_path in files:
+        dest_path = os.path.join(folder, f"{int(time.time())}_{os.path.basename(file_path)}")
+        shutil.copy(file_path, dest_path)
+        content_hash, _ = thumbnails.generate(dest_path)
+        db.execute("""
+            INSERT INTO property_images (property_id, image_path, uploaded_date, content_hash)
+            VALUES (?, ?, DATE('now'), ?)
+        """, (property_id, dest_path, content_hash))
+
+def check(db, thumbnails, property_id, results, rotated): # Stored photos are upright, bounded, thumbnailed and recorded
+    rows = dict(db.fetchall("SELECT image_path, content_hash FROM property_images WHERE property_id = ?", (property_id,)))
+    ok = set(rows) == {r["image_path"] for r in results} and len(rows) == len(results)
+    for r in results:
+        reader = QImageReader(r["image_path"])
+        size = reader.size()
+        ok = ok and reader.transformation() == QImageIOHandler.TransformationNone
+        ok = ok and max(size.width(), size.height()) <= IMAGE_MAX_DIMENSION
+        ok = ok and (size.height() > size.width()) == (r["file_path"] in rotated) # Rotated photos end up portrait
+        ok = ok and rows[r["image_path"]] == r["content_hash"]
+        ok = ok and all(os.path.exists(thumbnails.path(r["content_hash"], h)) for h in THUMBNAIL_SIZES.values())
+    return ok
+
+def main():
+    photos = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    rng = random.Random(3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "database", "bench.db"))
+        sources = os.path.join(tmp, "camera")
+        os.makedirs(os.path.join(sources, "other"))
+        files, rotated = [], set()
+        for n in range(photos):
+            if n in (1, 2): # Same names as the first photos, from another folder
+                path = os.path.join(sources, "other", f"IMG_{n - 1:04}.jpg")
+            else:
+                path = os.path.join(sources, f"IMG_{n:04}.jpg")
+            orientation = 6 if n % 3 == 0 else None # "Turn 90 degrees clockwise to view"
+            write_photo(path, rng, orientation)
+            if orientation:
+                rotated.add(path)
+            files.append(path)
+        source_mb = sum(map(os.path.getsize, files)) / 1048576
+        print(f"🔬 {photos} photos of {WIDTH} x {HEIGHT} ({source_mb:.1f} MB), {len(rotated)} tagged as rotated, "
+              f"2 name clashes, {os.cpu_count()} CPU core(s)")
+
+        with db.cursor() as cur:
+            cur.executemany("INSERT INTO properties (door_number, street, postcode) VALUES (?, 'High Street', 'AB1 2CD')",
+                            [(str(n),) for n in range(4)])
+
+        folder = os.path.join(tmp, "old", "property_images")
+        os.makedirs(folder)
+        start = time.perf_counter()
+        old_upload(db, ThumbnailCache(os.path.join(tmp, "thumbnails_old")), 1, folder, files)
+        old_s = time.perf_counter() - start
+        kept = len(os.listdir(folder))
+        stored_mb = sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder)) / 1048576
+        print(f"   old, calling thread:   {old_s:6.2f} s, {stored_mb:6.1f} MB stored, {kept} file(s) kept of {photos}")
+
+        ok = True
+        for property_id, workers in ((2, 1), (3, UPLOAD_WORKERS)):
+            thumbnails = ThumbnailCache(os.path.join(tmp, f"thumbnails_{workers}"))
+            folder = os.path.join(tmp, f"ingest_{workers}", "property_images")
+            updates = []
+            start = time.perf_counter()
+            results = ImageIngest(db, thumbnails, workers=workers).ingest(
+                property_id, folder, files, progress=lambda done, total, path, ok: updates.append(done))
+            took = time.perf_counter() - start
+            stored_mb = sum(os.path.getsize(r["image_path"]) for r in results if r["ok"]) / 1048576
+            ok = ok and all(r["ok"] for r in results) and updates == list(range(1, photos + 1))
+            ok = ok and len(os.listdir(folder)) == photos and check(db, thumbnails, property_id, results, rotated)
+            print(f"   ImageIngest, {workers} worker(s): {took:6.2f} s, {stored_mb:6.1f} MB stored, "
+                  f"{sum(r['rewritten'] for r in results)} rewritten, {photos - sum(r['rewritten'] for r in results)} copied")
+
+        # A batch whose rows can't be written leaves nothing behind
+        folder = os.path.join(tmp, "failed", "property_images")
+        results = ImageIngest(db, ThumbnailCache(os.path.join(tmp, "thumbnails_failed"))).ingest(999, folder, files[:4])
+        ok = ok and not any(r["ok"] for r in results) and not os.listdir(folder)
+        print(f"   failed INSERT (no property 999): {len(os.listdir(folder))} file(s) left behind")
+
+    print(("✅" if ok else "❌") + " Every photo was stored upright within the size limit, thumbnailed and recorded, with no clashes")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
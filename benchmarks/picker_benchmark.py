@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from PySide6.QtCore import QEventLoop, QTimer, Qt
+from PySide6.QtGui import QIcon, QImage
+from PySide6.QtWidgets import QApplication, QListWidget, QListWidgetItem
+from scripts.database_manager import DatabaseManager
+from scripts.thumbnail_cache import ThumbnailCache
+import scripts.thumbnail_cache as thumbnail_module
+from scripts.image_picker_dialog import ImagePickerDialog, SCROLL_SETTLE_MS
+
+# Image picker benchmark: opening and scrolling a property with many photos
+# Writes N synthetic photos (3000 x 2000 JPEGs) for one property and opens its image picker two
+# ways: the old list, where every item got QIcon(original), which decodes the full photo as the
+# item is made, and the grid with lazy thumbnails. For both it times open to first paint
+# and each repaint while scrolling a page at a time to the end; for the grid it also times how
+# long the visible thumbnails take to arrive, a fast flick from top to bottom, and a page-by-page
+# scroll that pauses just past the settle delay. The script checks that the grid only decoded
+# originals for items that were on screen (none while flicking past, and none for items already
+# scrolled past when their turn came), that every visible item ends up with its thumbnail, and
+# that the hashes worked out on the way were saved. It exits with status 1 if any check fails.
+#
+# Usage: python benchmarks/picker_benchmark.py [photos]
+# (set QT_QPA_PLATFORM=offscreen to run without a display)
+
+WIDTH, HEIGHT = 3000, 2000
+
+def write_photo(path, rng): # Random colours smoothly enlarged: soft detail everywhere, like a photo
+    small_width, small_height = WIDTH // 100, HEIGHT // 100
+    pixels = bytes(rng.getrandbits(8) for _ in range(small_width * small_height * 3))
+    small = QImage(pixels, small_width, small_height, small_width * 3, QImage.Format_RGB888)
+    small.scaled(WIDTH, HEIGHT, Qt.IgnoreAspectRatio, Qt.SmoothTransformation).save(path, "JPG", 90)
+
+def wait(ms): # Run the event loop for ms milliseconds
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+def paint_ms(view): # Time one full repaint of a list view's viewport
+    start = time.perf_counter()
+    view.viewport().grab()
+    return (time.perf_counter() - start) * 1000
+
+def scroll_pages(view): # Scroll a page at a time to the end; returns the repaint time of each page
+    bar, times = view.verticalScrollBar(), []
+    while bar.value() < bar.maximum():
+        bar.setValue(bar.value() + bar.pageStep())
+        QApplication.processEvents()
+        times.append(paint_ms(view))
+    return times
+
+def settle(dialog, timeout=20): # Wait until the grid has no thumbnails queued; returns ms waited
+    start = time.perf_counter()
+    wait(2 * 30) # Let the scroll-settle timer fire
+    while dialog.pending and time.perf_counter() - start < timeout:
+        wait(5)
+    return (time.perf_counter() - start) * 1000
+
+def on_screen_done(dialog): # Every visible item shows its thumbnail
+    return all(dialog.items_path(item) in dialog.icons for item in dialog.visible_items())
+
+
+class BenchPicker(ImagePickerDialog): # The real dialog with its images in the benchmark's folder, counting results
+    folder = None
+    loaded = skipped = 0
+
+    def thumbnail_loaded(self, path, image, content_hash):
+        if image is None:
+            self.skipped += 1
+        else:
+            self.loaded += 1
+        super().thumbnail_loaded(path, image, content_hash)
+
+    def create_property_folder(self, property_id, door_number, street, postcode):
+        return self.folder
+
+    def items_path(self, item):
+        return item.data(Qt.UserRole)[1]
+
+
+def main():
+    photos = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    app = QApplication(sys.argv[:1])
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "database", "bench.db"))
+        thumbnails = thumbnail_module._shared = ThumbnailCache(os.path.join(tmp, "thumbnails")) # Used by the dialog
+        BenchPicker.folder = os.path.join(tmp, "property_images")
+        os.makedirs(BenchPicker.folder)
+        paths = [os.path.join(BenchPicker.folder, f"1700000000_photo{n}.jpg") for n in range(photos)]
+        for path in paths:
+            write_photo(path, rng)
+        with db.cursor() as cur:
+            cur.execute("INSERT INTO properties (door_number, street, postcode) VALUES ('1', 'High Street', 'AB1 2CD')")
+            cur.executemany("INSERT INTO property_images (property_id, image_path, uploaded_date) VALUES (1, ?, DATE('now'))",
+                            [(path,) for path in paths])
+        print(f"🔬 {photos} photos of {WIDTH} x {HEIGHT} in one property")
+
+        # Before: a list with QIcon(original) per item, which decodes every photo in full
+        start = time.perf_counter()
+        old = QListWidget()
+        old.resize(620, 420)
+        for path in paths:
+            item = QListWidgetItem(os.path.basename(path))
+            item.setIcon(QIcon(path))
+            old.addItem(item)
+        old.show()
+        QApplication.processEvents()
+        old_open = (time.perf_counter() - start) * 1000 + paint_ms(old)
+        old_scroll = scroll_pages(old)
+        print(f"   old list:  first paint {old_open:8.1f} ms, scrolling {len(old_scroll)} page(s): "
+              f"mean {statistics.mean(old_scroll):6.1f} ms, max {max(old_scroll):6.1f} ms per repaint")
+        old.close()
+
+        # After: the grid, first with no thumbnails on disk, then reopened
+        ok = True
+        for run in ("cold", "warm"):
+            before = thumbnails.stats["generated"]
+            start = time.perf_counter()
+            dialog = BenchPicker(1, "1", "High Street", "AB1 2CD") # Each dialog starts with no icons in memory
+            dialog.show()
+            QApplication.processEvents()
+            first_paint = (time.perf_counter() - start) * 1000 + paint_ms(dialog.image_list)
+            arrived = settle(dialog)
+            seen = {dialog.items_path(item) for item in dialog.visible_items()}
+            ok = ok and on_screen_done(dialog)
+
+            scroll, waits = [], []
+            bar = dialog.image_list.verticalScrollBar()
+            while bar.value() < bar.maximum():
+                bar.setValue(bar.value() + bar.pageStep())
+                QApplication.processEvents()
+                scroll.append(paint_ms(dialog.image_list))
+                waits.append(settle(dialog))
+                seen |= {dialog.items_path(item) for item in dialog.visible_items()}
+                ok = ok and on_screen_done(dialog)
+            generated = thumbnails.stats["generated"] - before
+            if run == "cold":
+                ok = ok and generated <= len(seen)
+            else:
+                ok = ok and generated == 0
+            print(f"   grid ({run}): first paint {first_paint:8.1f} ms, visible thumbnails after {arrived:6.0f} ms, "
+                  f"{generated} original(s) decoded for {len(seen)} item(s) seen")
+            print(f"      scrolling {len(scroll)} page(s): mean {statistics.mean(scroll):6.1f} ms, max {max(scroll):6.1f} ms per repaint, "
+                  f"thumbnails in after {statistics.mean(waits):6.0f} ms on average")
+            dialog.accept()
+            QApplication.processEvents()
+
+        hashed = db.fetchval("SELECT COUNT(*) FROM property_images WHERE content_hash IS NOT NULL")
+        ok = ok and hashed == len(seen)
+        print(f"   {hashed} content hash(es) saved")
+
+        # A flick from top to bottom faster than the settle delay: nothing in between is decoded
+        dialog = BenchPicker(1, "1", "High Street", "AB1 2CD")
+        dialog.show()
+        settle(dialog)
+        before = thumbnails.stats["generated"] + thumbnails.stats["hits"]
+        bar = dialog.image_list.verticalScrollBar()
+        for value in range(0, bar.maximum() + 1, max(1, bar.singleStep() * 4)):
+            bar.setValue(value)
+            QApplication.processEvents()
+        bar.setValue(bar.maximum())
+        settle(dialog)
+        loaded = thumbnails.stats["generated"] + thumbnails.stats["hits"] - before
+        last_screen = len(dialog.visible_items())
+        ok = ok and loaded <= last_screen and on_screen_done(dialog)
+        print(f"   flick to the end: {loaded} thumbnail(s) loaded for the {last_screen} item(s) on the last screen")
+        dialog.accept()
+
+        # A page at a time, pausing past the settle delay but not long enough to decode a screenful
+        # (no thumbnails on disk yet): requests for items that left the screen are skipped
+        thumbnails = thumbnail_module._shared = ThumbnailCache(os.path.join(tmp, "thumbnails_slow"))
+        dialog = BenchPicker(1, "1", "High Street", "AB1 2CD")
+        dialog.show()
+        settle(dialog)
+        dialog.loaded = dialog.skipped = 0
+        before = thumbnails.stats["generated"]
+        bar, pause, seen = dialog.image_list.verticalScrollBar(), 2 * SCROLL_SETTLE_MS, set()
+        while bar.value() < bar.maximum():
+            bar.setValue(bar.value() + bar.pageStep())
+            wait(pause)
+            seen |= {dialog.items_path(item) for item in dialog.visible_items()}
+        settle(dialog)
+        generated = thumbnails.stats["generated"] - before
+        ok = ok and dialog.skipped > 0 and generated == dialog.loaded <= len(seen) and on_screen_done(dialog)
+        print(f"   slow scroll ({pause} ms per page): {dialog.loaded} thumbnail(s) loaded for {len(seen)} item(s) seen, "
+              f"{dialog.skipped} request(s) skipped after their items left the screen")
+        dialog.accept()
+
+    print(("✅" if ok else "❌") + " The grid only decoded what was on screen, and every visible item got its thumbnail")
+    sys.stdout.flush()
+    os._exit(0 if ok else 1) # Skip Qt teardown: queued decodes may still be finishing
+
+if __name__ == "__main__":
+    main()
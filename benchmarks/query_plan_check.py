@@ -0,0 +1,40 @@
+import os
+import sys
+import sqlite3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from scripts.migration_manager import MigrationManager
+from scripts.utils.db_indexes import check_query_plans, QUERY_PLAN_CHECKS, FULL_INDEX_SCANS_EXPECTED
+
+# Query plan check for the dashboard and manager queries
+# Builds the latest schema in memory by running the migrations (or opens the database
+# given on the command line) and runs EXPLAIN QUERY PLAN on every query in
+# QUERY_PLAN_CHECKS. Exits with
+# status 1 if any of them falls back to scanning a whole table, or a whole index outside
+# FULL_INDEX_SCANS_EXPECTED, so a query change that loses its index is caught before it ships.
+#
+# Usage: python benchmarks/query_plan_check.py [path/to/database.db]
+
+def main():
+    if len(sys.argv) > 1: # Check an existing database as it is
+        conn = sqlite3.connect(sys.argv[1])
+    else: # Build a fresh schema at the latest migration
+        conn = sqlite3.connect(":memory:")
+        MigrationManager(conn).apply()
+
+    failures = check_query_plans(conn)
+    conn.close()
+
+    for name in QUERY_PLAN_CHECKS:
+        expected = " (full index scan expected)" if name in FULL_INDEX_SCANS_EXPECTED else ""
+        print(f"{'❌' if name in failures else '✅'} {name}{expected}")
+        for detail in failures.get(name, []):
+            print(f"      {detail}")
+
+    if failures:
+        print(f"{len(failures)} query(ies) fall back to a table or index scan.")
+        sys.exit(1)
+    print("All checked queries use an index.")
+
+if __name__ == "__main__":
+    main()
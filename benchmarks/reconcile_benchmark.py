@@ -0,0 +1,172 @@
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from scripts.database_manager import DatabaseManager
+from scripts.document_manager import DocumentManager
+from scripts.blob_store import BlobStore
+from scripts.storage_reconciler import StorageReconciler, ENTITY_TABLES, QUARANTINE_STAMP, remove_entity_folders
+
+# Storage reconciler benchmark: orphaned files in the resources tree
+# Builds a resources tree in a temporary folder for N entities of each type: entity folders with
+# documents that have rows and documents that don't, property images with and without rows,
+# folders of entities that were deleted (as TenancyManager used to leave behind), blobs with and
+# without document_blobs rows, blobs only a deleted document used, and a few orphans too recent to
+# judge. It then times a dry run, a quarantine run and a second (clean) run, checks that exactly
+# the planted orphans were found and moved and that every referenced file is still in place, and
+# that an expired quarantine batch is deleted. Finally it times deleting a property with many
+# images the old way (rmtree on the GUI thread) against remove_entity_folders(). The script exits
+# with status 1 if any check fails.
+#
+# Usage: python benchmarks/reconcile_benchmark.py [entities per type]
+
+DOCS_PER_ENTITY = 4
+ORPHANS_PER_ENTITY = 1
+IMAGES_PER_PROPERTY = 6
+FILE_SIZE = 4096
+BLOBS = 1000
+BIG_PROPERTY_IMAGES = 2000
+OLD = time.time() - 3 * 3600 # Planted files are older than the grace period
+
+def write(path, size=FILE_SIZE, old=True): # Create a file of size bytes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+    if old:
+        os.utime(path, (OLD, OLD))
+    return path
+
+def build_tree(db, storage_paths, blobs, entities): # Returns (referenced paths, orphan paths, recent orphans)
+    rng = random.Random(7)
+    referenced, orphans, recent = [], [], []
+    with db.cursor() as cur:
+        cur.executemany("INSERT INTO tenants (first_name, last_name) VALUES (?, 'Tenant')", [(str(i),) for i in range(entities)])
+        cur.executemany("INSERT INTO landlords (first_name, last_name) VALUES (?, 'Owner')", [(str(i),) for i in range(entities)])
+        cur.executemany("INSERT INTO properties (door_number, street, postcode) VALUES (?, 'High Street', 'AB1 2CD')",
+                        [(str(i),) for i in range(entities)])
+        cur.executemany("INSERT INTO tenancies (property_id, start_date, end_date) VALUES (?, '2025-01-01', '2026-01-01')",
+                        [(i,) for i in range(1, entities + 1)])
+
+        for entity_type, (table, id_field, _) in ENTITY_TABLES.items():
+            for entity_id in range(1, entities + 1):
+                folder = os.path.join(storage_paths[entity_type], f"{entity_id}_Entity_{entity_id}")
+                for n in range(DOCS_PER_ENTITY):
+                    name = f"1700000000_doc{n}.pdf.encrypted"
+                    referenced.append(write(os.path.join(folder, name)))
+                    cur.execute(f"INSERT INTO {table} ({id_field}, doc_name, doc_type, file_path) VALUES (?, 'doc', 'Other', ?)",
+                                (entity_id, name))
+                for n in range(ORPHANS_PER_ENTITY): # Left behind by a failed upload or an old delete
+                    orphans.append(write(os.path.join(folder, f"1600000000_lost{n}.pdf.encrypted")))
+                if rng.random() < 0.05: # Not ours: must be kept
+                    referenced.append(write(os.path.join(folder, "notes.txt")))
+                if entity_id % 50 == 0: # Too recent to judge
+                    recent.append(write(os.path.join(folder, "1800000000_new.pdf.encrypted"), old=False))
+                if entity_type == "property":
+                    images = os.path.join(folder, "property_images")
+                    for n in range(IMAGES_PER_PROPERTY):
+                        path = write(os.path.join(images, f"1700000000_photo{n}.jpg"))
+                        if n < IMAGES_PER_PROPERTY - 1:
+                            referenced.append(path)
+                            cur.execute("INSERT INTO property_images (property_id, image_path, uploaded_date) VALUES (?, ?, DATE('now'))",
+                                        (entity_id, path))
+                        else:
+                            orphans.append(path)
+
+            for entity_id in range(entities + 1, entities + 1 + entities // 10): # Folders of deleted entities
+                folder = os.path.join(storage_paths[entity_type], f"{entity_id}_Deleted")
+                for n in range(DOCS_PER_ENTITY):
+                    orphans.append(write(os.path.join(folder, f"1700000000_doc{n}.pdf.encrypted")))
+
+        for n in range(BLOBS):
+            blob_hash = f"{rng.getrandbits(256):064x}"
+            path = write(blobs.path(blob_hash))
+            if n % 10 == 0: # Encrypted, but the upload never committed its row
+                orphans.append(path)
+                continue
+            cur.execute("INSERT INTO document_blobs (blob_hash, size, created_at) VALUES (?, ?, DATETIME('now'))", (blob_hash, FILE_SIZE))
+            cur.execute("INSERT INTO tenant_documents (tenant_id, doc_name, doc_type, file_path, blob_hash) VALUES (?, 'blob', 'Other', ?, ?)",
+                        (rng.randint(1, entities), f"{blob_hash}.pdf.encrypted", blob_hash))
+            referenced.append(path)
+
+        unused = [] # Blobs whose only document was removed by a cascade: collected from the database
+        for n in range(BLOBS // 20):
+            blob_hash = f"{rng.getrandbits(256):064x}"
+            unused.append(write(blobs.path(blob_hash)))
+            cur.execute("INSERT INTO document_blobs (blob_hash, size, created_at) VALUES (?, ?, DATETIME('now'))", (blob_hash, FILE_SIZE))
+            cur.execute("INSERT INTO tenant_documents (tenant_id, doc_name, doc_type, file_path, blob_hash) VALUES (1, 'gone', 'Other', 'gone', ?)", (blob_hash,))
+        cur.execute("DELETE FROM tenant_documents WHERE doc_name = 'gone'")
+    return referenced, orphans, recent, unused
+
+def main():
+    entities = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage_paths = {entity_type: os.path.join(tmp, folder) for entity_type, folder in
+                         (("landlord", "landlords"), ("property", "properties"), ("tenant", "tenants"), ("tenancy", "tenancies"))}
+        quarantine = os.path.join(tmp, "quarantine")
+        DatabaseManager(os.path.join(tmp, "database", "bench.db")) # Created first, so every DocumentManager uses it
+        documents = DocumentManager()
+        documents.blobs = BlobStore(os.path.join(tmp, "blobs"))
+
+        start = time.perf_counter()
+        referenced, orphans, recent, unused = build_tree(documents.db, storage_paths, documents.blobs, entities)
+        build_s = time.perf_counter() - start
+        orphan_bytes = len(orphans) * FILE_SIZE
+        print(f"🔬 {entities} entities per type: {len(referenced)} referenced file(s), {len(orphans)} orphan(s), "
+              f"{len(recent)} recent, {len(unused)} unused blob(s) (built in {build_s:.1f} s)")
+
+        reconciler = lambda **kwargs: StorageReconciler(documents, storage_paths=storage_paths, quarantine_dir=quarantine,
+                                                        thumbnails_dir=os.path.join(tmp, "thumbnails"), **kwargs)
+        dry = reconciler(dry_run=True).run()
+        ok = dry.orphan_files == len(orphans) and dry.orphan_bytes == orphan_bytes and all(map(os.path.exists, orphans))
+        print(f"   dry run:        {dry.seconds * 1000:8.0f} ms, {dry.orphan_files} orphan(s) found, nothing moved")
+
+        batches = []
+        report = reconciler().run(progress=lambda r: batches.append(r.orphan_files))
+        ok = ok and report.orphan_files == len(orphans) and report.quarantined_bytes == orphan_bytes
+        ok = ok and report.unused_blobs == len(unused) and report.reclaimed_bytes == len(unused) * FILE_SIZE
+        ok = ok and not any(map(os.path.exists, orphans + unused)) and all(map(os.path.exists, referenced + recent))
+        print(f"   quarantine run: {report.seconds * 1000:8.0f} ms, {len(batches)} batch(es), "
+              f"{report.quarantined_bytes / 1048576:.1f} MB quarantined, {report.reclaimed_bytes / 1048576:.1f} MB reclaimed")
+        for area, (files, size) in sorted(report.areas.items()):
+            print(f"      {area:<16} {files:6} file(s) {size / 1048576:8.1f} MB")
+        moved = sum(len(names) for _, _, names in os.walk(quarantine))
+        ok = ok and moved == len(orphans)
+
+        clean = reconciler().run()
+        ok = ok and clean.orphan_files == 0 and clean.skipped_recent == len(recent)
+        print(f"   second run:     {clean.seconds * 1000:8.0f} ms, {clean.orphan_files} orphan(s)")
+
+        # Age the quarantine batch past ORPHAN_QUARANTINE_DAYS: the next run deletes it
+        batch_folder = report.quarantine_folder
+        os.rename(batch_folder, os.path.join(quarantine, time.strftime(QUARANTINE_STAMP, time.localtime(OLD - 365 * 86400))))
+        purge = reconciler().run()
+        ok = ok and purge.purged_bytes == orphan_bytes and not os.listdir(quarantine)
+        print(f"   expired quarantine: {purge.purged_bytes / 1048576:.1f} MB deleted")
+
+        # Deleting a property with many images: rmtree on the GUI thread vs remove_entity_folders()
+        for label in ("old", "new"):
+            folder = os.path.join(storage_paths["property"], f"{entities + 100}_Big", "property_images")
+            for n in range(BIG_PROPERTY_IMAGES):
+                write(os.path.join(folder, f"{n}.jpg"), 64 * 1024)
+            start = time.perf_counter()
+            if label == "old":
+                shutil.rmtree(os.path.dirname(folder))
+                blocked = time.perf_counter() - start
+            else:
+                future = remove_entity_folders("property", entities + 100, storage_paths)
+                blocked = time.perf_counter() - start
+                future.result()
+                ok = ok and not os.path.exists(os.path.dirname(folder)) and not any(
+                    name.startswith(".deleted_") for name in os.listdir(storage_paths["property"]))
+            print(f"   delete a property with {BIG_PROPERTY_IMAGES} images, GUI thread blocked ({label}): {blocked * 1000:8.1f} ms")
+
+    print(("✅" if ok else "❌") + " Exactly the orphans were quarantined, referenced files kept, expired quarantine deleted")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from config import SEARCH_RESULT_LIMIT, SEARCH_RANK_MAX_HITS
+from scripts.database_manager import apply_pragmas
+from scripts.migration_manager import MigrationManager
+from scripts.search_service import SearchService
+
+# Search benchmark: LIKE scans vs the FTS5 indexes
+# Builds the real schema (all migrations) in a temporary database, loads N tenants,
+# then times the old picker search (LIKE '%kw%' over four columns) against the
+# ranked, prefix-aware FTS5 search the pickers and managers now use. It also checks
+# that the sync triggers keep the index right after an insert, rename and delete.
+#
+# Usage: python benchmarks/search_benchmark.py [tenants]
+
+FIRST_NAMES = ["James", "Olivia", "Amir", "Chloe", "Liam", "Priya", "Noah", "Sofia", "Kwame", "Zara"]
+LAST_NAMES = ["Smith", "Khan", "Jones", "Patel", "Brown", "Okafor", "Taylor", "Nowak", "Evans", "Chen"]
+SEARCHES = ["smi", "priya", "okafor", "j smith", "0770", "zara chen", "nomatch"]
+RUNS = 20
+
+LIKE_QUERY = """
+    SELECT tenant_id, first_name || ' ' || last_name AS name, email, phone
+    FROM tenants
+    WHERE first_name LIKE ? OR last_name LIKE ? OR email LIKE ? OR phone LIKE ?
+"""
+
+FTS_QUERY = """
+    SELECT tenant_id, first_name || ' ' || last_name AS name, email, phone
+    FROM tenants
+    JOIN ({hits}) AS search_hits ON tenant_id = search_hits.search_rowid
+    ORDER BY search_hits.search_rank
+"""
+
+class ConnectionDB: # The two DatabaseManager calls SearchService needs, on a plain connection
+    def __init__(self, conn):
+        self.conn = conn
+
+    def fetchval(self, query, params=None):
+        row = self.conn.execute(query, params or ()).fetchone()
+        return row[0] if row else None
+
+    def fetchall(self, query, params=None):
+        return self.conn.execute(query, params or ()).fetchall()
+
+def build_database(path, tenants): # Real schema plus N random tenants
+    conn = sqlite3.connect(path)
+    apply_pragmas(conn)
+    MigrationManager(conn).apply()
+    rng = random.Random(42)
+    rows = []
+    for i in range(tenants):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append((first, last, f"{first.lower()}.{last.lower()}{i}@example.com", f"07700 {i:06d}", "Active"))
+    start = time.perf_counter()
+    conn.executemany("INSERT INTO tenants (first_name, last_name, email, phone, status) VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    print(f"🗄️ Inserted {tenants:,} tenants (FTS kept in sync by triggers) in {time.perf_counter() - start:.2f}s")
+    return conn
+
+def time_call(fn): # Median time of fn() over RUNS runs, plus the number of rows it returned
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        rows = fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000, len(rows)
+
+def fts_search(conn, service, text): # What the tenant picker runs: the hits subquery, joined and ordered
+    hits_sql, params, _ = service.hits_subquery("tenants", text, SEARCH_RESULT_LIMIT)
+    return conn.execute(FTS_QUERY.format(hits=hits_sql), params).fetchall()
+
+def check_triggers(conn): # The index must follow inserts, renames and deletes
+    def found(text):
+        return conn.execute("SELECT COUNT(*) FROM tenants_fts WHERE tenants_fts MATCH ?", (SearchService.match_query(text),)).fetchone()[0]
+
+    cur = conn.execute("INSERT INTO tenants (first_name, last_name, email, phone, status) VALUES ('Quentin', 'Zebedee', 'qz@example.com', '1', 'Active')")
+    tenant_id = cur.lastrowid
+    ok = found("zebed") == 1
+    conn.execute("UPDATE tenants SET last_name = 'Yarrow' WHERE tenant_id = ?", (tenant_id,))
+    ok = ok and found("zebed") == 0 and found("quentin yarr") == 1
+    conn.execute("DELETE FROM tenants WHERE tenant_id = ?", (tenant_id,))
+    ok = ok and found("quentin") == 0
+    conn.rollback()
+    print(("✅" if ok else "❌") + " FTS index follows insert, rename and delete")
+    return ok
+
+def main():
+    tenants = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(os.path.join(tmp, "bench.db"), tenants)
+
+        service = SearchService(ConnectionDB(conn))
+        print(f"🔬 Median of {RUNS} runs, FTS limited to the best {SEARCH_RESULT_LIMIT} hits "
+              f"(ranked in full up to {SEARCH_RANK_MAX_HITS} matches)")
+        print(f"{'search':<12} {'LIKE ms':>9} {'rows':>7} | {'FTS ms':>8} {'rows':>5} | speed-up")
+        for text in SEARCHES:
+            like_ms, like_rows = time_call(lambda: conn.execute(LIKE_QUERY, (f"%{text}%",) * 4).fetchall())
+            fts_ms, fts_rows = time_call(lambda: fts_search(conn, service, text))
+            print(f"{text!r:<12} {like_ms:9.2f} {like_rows:7} | {fts_ms:8.2f} {fts_rows:5} | {like_ms / max(fts_ms, 0.001):6.1f}x")
+
+        ok = check_triggers(conn)
+        conn.close()
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
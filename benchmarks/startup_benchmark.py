@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import tempfile
+import statistics
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from PySide6.QtCore import QEventLoop, QTimer
+from PySide6.QtWidgets import QApplication
+import config
+from scripts.database_manager import DatabaseManager
+from scripts.base_manager import BaseManager
+from benchmarks.dashboard_benchmark import build_database
+
+# Startup benchmark: login to first paint of the main window, all pages built vs built on demand
+# Builds the real schema in a temporary database with a portfolio of N properties (the same data
+# as dashboard_benchmark), then opens the main window RUNS times with LAZY_PAGES = False (every
+# page and its first query built at login, as before) and with LAZY_PAGES = True. It reports the
+# time from login to the window's first paint, to the dashboard showing its figures, and to the
+# first rows of the Tenants page after clicking it, and checks that a lazy window paints before
+# building any page and that clicking Tenants runs no query on the GUI thread (no synchronous
+# BaseManager.load_data()). It then opens every page of a lazy window and checks that each is
+# built once, replaces its placeholder and shows its rows. The script exits with status 1 if any
+# check fails or lazy pages don't paint sooner.
+# Importing main.py creates the app's resource folders and key, as starting the app does.
+#
+# Usage: python benchmarks/startup_benchmark.py [properties]
+# (set QT_QPA_PLATFORM=offscreen to run without a display)
+
+RUNS = 5
+USER = {"username": "admin", "is_admin": 1}
+SYNC_LOADS = [] # Managers whose load_data() ran, in order
+
+def count_sync_loads(): # Record every synchronous BaseManager.load_data() call in SYNC_LOADS
+    load_data = BaseManager.load_data
+    def counted(self):
+        SYNC_LOADS.append(type(self).__name__)
+        load_data(self)
+    BaseManager.load_data = counted
+
+def wait_until(condition, timeout=30): # Run the event loop until condition() holds; returns ms waited
+    start = time.perf_counter()
+    while not condition() and time.perf_counter() - start < timeout:
+        loop = QEventLoop()
+        QTimer.singleShot(1, loop.quit)
+        loop.exec()
+    return (time.perf_counter() - start) * 1000
+
+def loading(page): # A manager page is still waiting for its first rows
+    return hasattr(page, "empty_label") and page.empty_label.isVisible() and page.empty_label.text() == "Loading..."
+
+def has_rows(page): # A manager page shows rows from the database
+    return bool(page.table_model.rows if page.virtual_mode else page.page_data)
+
+def open_page(window, name): # Click a sidebar item; returns the page once it shows its rows
+    for row in range(window.sidebar.count()):
+        if window.sidebar.item(row).text().strip() == name:
+            window.sidebar.setCurrentRow(row)
+    wait_until(lambda: name in window.pages and not loading(window.pages[name]))
+    return window.pages.get(name)
+
+def start_window(main_window_class, lazy): # Log in once; returns (window, [first paint ms, dashboard ms, tenants ms], sync loads)
+    config.LAZY_PAGES = lazy
+    controller = SimpleNamespace(theme="dark", toggle_theme=lambda: None)
+    window = main_window_class(controller, USER)
+    window.show()
+    wait_until(lambda: window.first_paint_ms is not None)
+    wait_until(lambda: "Dashboard" in window.pages and window.pages["Dashboard"].cards["Total Properties"].text() != "0")
+    dashboard_ms = (time.perf_counter() - window.started_at) * 1000
+    start, loads = time.perf_counter(), len(SYNC_LOADS)
+    open_page(window, "Tenants")
+    tenants_ms = (time.perf_counter() - start) * 1000
+    return window, [window.first_paint_ms, dashboard_ms, tenants_ms], SYNC_LOADS[loads:]
+
+def main():
+    properties = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app = QApplication(sys.argv[:1])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        conn = build_database(path, properties)
+        conn.execute("INSERT INTO tenancy_tenants (tenancy_id, tenant_id) SELECT tenancy_id, property_id FROM tenancies")
+        conn.commit() # The Tenancies page lists tenancies with their tenants
+        conn.close()
+        DatabaseManager(path) # Created first, so every page uses it
+        from main import MainWindow # Imported once the database is bound
+        count_sync_loads()
+
+        results, ok, first_visit_loads = {False: [], True: []}, True, []
+        for _ in range(RUNS): # Alternate, so both modes see the same cache state
+            for lazy in (False, True):
+                window, timings, loads = start_window(MainWindow, lazy)
+                results[lazy].append(timings)
+                first_visit_loads += loads
+                ok = ok and window.pages_at_first_paint == (0 if lazy else len(window.page_factories))
+                window.close()
+                window.deleteLater()
+                wait_until(lambda: False, timeout=0.05)
+
+        print(f"   {'':<26} {'first paint':>12} {'dashboard':>10} {'Tenants':>10}  (median ms of {RUNS})")
+        medians = {}
+        for lazy, label in ((False, "all pages at login"), (True, "pages on demand")):
+            medians[lazy] = [statistics.median(column) for column in zip(*results[lazy])]
+            print(f"   {label:<26} {medians[lazy][0]:12.0f} {medians[lazy][1]:10.0f} {medians[lazy][2]:10.0f}")
+        ok = ok and medians[True][0] < medians[False][0] and not first_visit_loads
+        print(f"   synchronous load_data() calls while opening Tenants: {len(first_visit_loads)} {sorted(set(first_visit_loads))}")
+
+        # Every page of a lazy window opens once, in place of its placeholder, and shows its rows
+        config.LAZY_PAGES = True
+        window = MainWindow(SimpleNamespace(theme="dark", toggle_theme=lambda: None), USER)
+        window.show()
+        wait_until(lambda: "Dashboard" in window.pages)
+        ok = ok and len(window.pages) == 1
+        for name in window.page_factories:
+            page = open_page(window, name)
+            ok = ok and page is not None and window.stack.currentWidget() is page
+            ok = ok and (not hasattr(page, "table_widget") or has_rows(page))
+        built = dict(window.pages)
+        for name in window.page_factories: # Second visits reuse the pages
+            open_page(window, name)
+        ok = ok and window.pages == built and not window.placeholders
+        ok = ok and window.stack.count() == len(window.page_factories)
+        print(f"   lazy window: {len(built)} page(s) built once each, {window.stack.count()} in the stack")
+
+    print(("✅" if ok else "❌") + " Pages built on demand paint sooner, and every page opens with its rows")
+    sys.stdout.flush()
+    os._exit(0 if ok else 1) # Skip Qt teardown: search workers may still be finishing
+
+if __name__ == "__main__":
+    main()
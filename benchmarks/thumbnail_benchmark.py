@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Allow running from any folder
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QGuiApplication, QImage, QPixmap
+from scripts.thumbnail_cache import ThumbnailCache
+from config import THUMBNAIL_SIZES
+
+# Thumbnail benchmark: property carousel clicks on a listing of large photos
+# Writes N synthetic 12-megapixel JPEGs (4000 x 3000), then shows each one in the carousel
+# the old way (QPixmap of the original, scaledToHeight(180)) and through ThumbnailCache: the
+# first view (hash, one scaled decode, both thumbnail sizes written), a later view with the
+# hash known from property_images, and one with only the in-memory hash memo. The report shows
+# the mean time per click. Every thumbnail is checked for its height, for matching the old
+# scaled image, and for being served without decoding the original again; the script exits
+# with status 1 if any check fails.
+#
+# Usage: python benchmarks/thumbnail_benchmark.py [photos]
+# (set QT_QPA_PLATFORM=offscreen to run without a display)
+
+WIDTH, HEIGHT = 4000, 3000
+CAROUSEL = THUMBNAIL_SIZES["carousel"]
+
+def write_photo(path, rng): # Random colours smoothly enlarged: soft detail everywhere, like a photo
+    small_width, small_height = WIDTH // 100, HEIGHT // 100
+    pixels = bytes(rng.getrandbits(8) for _ in range(small_width * small_height * 3))
+    small = QImage(pixels, small_width, small_height, small_width * 3, QImage.Format_RGB888)
+    small.scaled(WIDTH, HEIGHT, Qt.IgnoreAspectRatio, Qt.SmoothTransformation).save(path, "JPG", 90)
+
+def mean_difference(a, b, samples=2000): # Mean per-channel difference of two same-sized images at sampled pixels
+    rng = random.Random(1)
+    total = 0
+    for _ in range(samples):
+        x, y = rng.randrange(min(a.width(), b.width())), rng.randrange(min(a.height(), b.height()))
+        pa, pb = a.pixelColor(x, y), b.pixelColor(x, y)
+        total += abs(pa.red() - pb.red()) + abs(pa.green() - pb.green()) + abs(pa.blue() - pb.blue())
+    return total / (samples * 3)
+
+def mean_ms(paths, show): # Mean milliseconds per click
+    start = time.perf_counter()
+    for path in paths:
+        show(path)
+    return (time.perf_counter() - start) * 1000 / len(paths)
+
+def main():
+    photos = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    app = QGuiApplication(sys.argv[:1])
+    rng = random.Random(5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"photo{n}.jpg") for n in range(photos)]
+        for path in paths:
+            write_photo(path, rng)
+        size_mb = sum(map(os.path.getsize, paths)) / 1048576
+        print(f"🔬 {photos} photos of {WIDTH} x {HEIGHT} ({size_mb / photos:.1f} MB each), carousel height {CAROUSEL} px")
+
+        old_images = {}
+        def show_old(path): # What update_image_display did before the thumbnail cache
+            old_images[path] = QPixmap(path).scaledToHeight(CAROUSEL, Qt.SmoothTransformation)
+        old_ms = mean_ms(paths, show_old)
+
+        cache = ThumbnailCache(os.path.join(tmp, "thumbnails"))
+        first_ms = mean_ms(paths, lambda path: cache.pixmap(path, CAROUSEL))
+        generated = cache.stats["generated"]
+        hashes = {path: cache.content_hash(path) for path in paths} # As stored in property_images
+
+        new_images = {}
+        def show_new(path):
+            new_images[path] = cache.pixmap(path, CAROUSEL, hashes[path])
+        warm_ms = mean_ms(paths, show_new)
+        memo_ms = mean_ms(paths, lambda path: cache.pixmap(path, CAROUSEL))
+
+        print(f"   original decoded per click:    {old_ms:8.1f} ms")
+        print(f"   first view (makes thumbnails): {first_ms:8.1f} ms")
+        print(f"   thumbnail, hash from database: {warm_ms:8.2f} ms ({old_ms / warm_ms:.0f}x faster)")
+        print(f"   thumbnail, hash from memo:     {memo_ms:8.2f} ms")
+
+        ok = generated == photos and cache.stats["generated"] == photos # Nothing decoded after the first views
+        worst = 0.0
+        for path in paths:
+            old, new = old_images[path].toImage(), new_images[path].toImage()
+            ok = ok and new.height() == CAROUSEL and abs(new.width() - old.width()) <= 1
+            ok = ok and all(QImage(cache.path(hashes[path], height)).height() == height for height in THUMBNAIL_SIZES.values())
+            worst = max(worst, mean_difference(old, new))
+        ok = ok and worst < 8
+        print(f"   largest mean pixel difference from the old scaling: {worst:.1f} / 255")
+
+    print(("✅" if ok else "❌") + " Thumbnails have the right sizes, match the old scaling, and originals are decoded once")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,9 @@ LANDLORDS_DIR      = os.path.join(RESOURCES_DIR, "landlords")
 PROPERTIES_DIR     = os.path.join(RESOURCES_DIR, "properties")
 TENANTS_DIR        = os.path.join(RESOURCES_DIR, "tenants")
 TENANCIES_DIR      = os.path.join(RESOURCES_DIR, "tenancies")
+BLOBS_DIR          = os.path.join(RESOURCES_DIR, "blobs")
+QUARANTINE_DIR     = os.path.join(RESOURCES_DIR, "quarantine")
+THUMBNAILS_DIR     = os.path.join(RESOURCES_DIR, "thumbnails")
 
 # === Core file paths === #
 DB_PATH            = os.path.join(DB_DIR, "starpmk_database.db")
@@ -46,12 +49,54 @@ DOCUMENT_TYPES = {
     "tenancy": ["Tenancy Agreement", "Deposit Info", "Inspection Report", "Other"]
 }
 
+# === Database Settings === #
+DB_POOL_SIZE = 8                # Max number of long-lived (per-thread) pooled connections
+DB_HEALTH_CHECK_INTERVAL = 30   # Seconds a pooled connection may sit idle before it is health-checked
+
+# PRAGMA profile applied to every database connection (and by init_database.py)
+# WAL lets the manager tables keep reading while a details page is writing
+DB_PRAGMAS = {
+    "journal_mode": "WAL",          # Readers no longer block on writers
+    "synchronous": "NORMAL",        # Safe with WAL, far fewer fsyncs than FULL
+    "mmap_size": 268435456,         # 256 MB of memory-mapped reads
+    "cache_size": -65536,           # 64 MB page cache (negative = KiB)
+    "temp_store": "MEMORY",         # Sorts and temp tables stay in RAM
+    "wal_autocheckpoint": 1000,     # Checkpoint the WAL every 1000 pages
+}
+
 # === Security Settings === #
 MAX_FILE_SIZE_MB = 150  # Max upload size (in megabytes)
+ENCRYPTION_CHUNK_SIZE = 1024 * 1024  # Plaintext bytes per authenticated chunk in encrypted documents
+UPLOAD_WORKERS = 4  # Files processed in parallel by a batch upload (documents are encrypted, photos scaled and thumbnailed)
+DOCUMENT_CACHE_MB = 64  # Decrypted documents kept in memory for repeat previews (cleared on logout and exit)
+DEDUPLICATE_DOCUMENTS = True  # Store each distinct document once in BLOBS_DIR, shared by every record that uses it
+DOCUMENT_COMPRESSION = "zstd"  # "zstd" (zlib is used if the zstandard package isn't installed), "zlib" or "none"
+COMPRESSION_LEVELS = {"zlib": 6, "zstd": 3}  # Higher levels give smaller documents but slower uploads
+INCOMPRESSIBLE_EXTENSIONS = {  # Already-compressed formats, stored without trying to compress them
+    "jpg", "jpeg", "png", "gif", "webp", "heic", "zip", "7z", "rar", "gz",
+    "docx", "xlsx", "pptx", "odt", "ods", "mp3", "mp4", "mov", "avi",
+}
+ORPHAN_ACTION = "quarantine"  # What "Reclaim Storage" does with files no record uses: "quarantine" (move to QUARANTINE_DIR) or "delete"
+ORPHAN_GRACE_MINUTES = 60  # Files changed more recently than this are never treated as orphans
+ORPHAN_BATCH_SIZE = 200  # Orphans moved or deleted per batch
+ORPHAN_QUARANTINE_DAYS = 30  # Quarantined files older than this are deleted for good
 
 # === UI Settings === #
 APP_NAME = "STAR Property Management Kit"
 ICON_PATH = resource_path("starpmk.ico")
+TABLE_FETCH_BATCH = 200 # Rows fetched per scroll step by the infinite-scroll manager tables
+SEARCH_RESULT_LIMIT = 200 # Best-ranked matches shown by the picker dialogs
+SEARCH_RANK_MAX_HITS = 2000 # Searches with more matches than this are not ranked as a whole
+SEARCH_DEBOUNCE_MS = 200 # Pause in typing before a search box runs its query
+EXPIRY_WINDOW_DAYS = 30 # Days ahead covered by the expiring documents list
+EXPIRY_PAGE_SIZE = 50 # Rows per page in the expiring documents list
+THUMBNAIL_SIZES = {"carousel": 180, "picker": 64} # Heights (px) of the stored property image thumbnails
+CAROUSEL_PREFETCH = 2 # Images loaded ahead on each side of the one shown in the property carousel
+CAROUSEL_CACHE_SIZE = 48 # Carousel images kept in memory (about 170 KB each)
+PICKER_ICON_CACHE_SIZE = 500 # Image picker thumbnails kept in memory (about 25 KB each)
+LAZY_PAGES = True # Build each main window page the first time it is opened (False builds them all at login)
+IMAGE_MAX_DIMENSION = 2560 # Uploaded property photos with a longer side than this (px) are scaled down
+IMAGE_JPEG_QUALITY = 90 # JPEG quality of property photos that are scaled down or turned upright on upload
 
 # === Styles === #
 STYLES_DIR = resource_path("styles")
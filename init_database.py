@@ -1,8 +1,11 @@
 import os
 import sys
 import sqlite3
+import pathlib
 from cryptography.fernet import Fernet # Import the Fernet class for encryption
 from scripts.utils.security_utils import hash_password  # Import the hash_password function
+from scripts.database_manager import apply_pragmas, read_pragmas  # Import the shared PRAGMA profile helpers
+from scripts.migration_manager import MigrationManager  # Import the schema migration engine
 
 def get_base_dir():
    # Get the base directory of the script or executable
@@ -25,6 +28,16 @@ def main(): # Main function to initialize the database and create necessary dire
         KEY_PATH = os.path.join(DB_DIR, "key.key")
         DB_PATH  = os.path.join(DB_DIR, "starpmk_database.db")
 
+        # === Dry run: list pending migrations and their expected duration, change nothing === #
+        if "--dry-run" in sys.argv:
+            if os.path.exists(DB_PATH): # Open the existing database read-only
+                conn = sqlite3.connect(pathlib.Path(DB_PATH).as_uri() + "?mode=ro", uri=True)
+            else: # No database yet, so every migration is pending
+                conn = sqlite3.connect(":memory:")
+            MigrationManager(conn).apply(dry_run=True)
+            conn.close()
+            return
+
         # === Create all necessary folders === #
         resource_dirs = [
             DB_DIR,
@@ -34,6 +47,7 @@ def main(): # Main function to initialize the database and create necessary dire
             os.path.join(BASE_DIR, "resources", "tenancies"),
             os.path.join(BASE_DIR, "resources", "backups"),
             os.path.join(BASE_DIR, "resources", "temp_preview"),
+            os.path.join(BASE_DIR, "resources", "blobs"),
         ]
         for d in resource_dirs: # Create each directory if it doesn't exist
             os.makedirs(d, exist_ok=True)
@@ -47,184 +61,17 @@ def main(): # Main function to initialize the database and create necessary dire
             key = key_file.read()
         fernet = Fernet(key) # Create a Fernet object for encryption/decryption
 
-        # === Connect to SQLite and enforce foreign keys === #
+        # === Connect to SQLite and apply the PRAGMA profile === #
         conn = sqlite3.connect(DB_PATH) # Connect to the SQLite database
-        conn.execute("PRAGMA foreign_keys = ON;") # Enable foreign key constraints
+        apply_pragmas(conn) # Enable foreign keys, WAL and the tuned settings from config.DB_PRAGMAS
+        in_effect = read_pragmas(conn) # Report the journal mode actually in effect
+        print("🗄️ PRAGMA profile: " + ", ".join(f"{k}={v}" for k, v in in_effect.items()))
         cur = conn.cursor() # Create a cursor object to execute SQL commands
 
-        # === Table definitions === #
-        TABLES = {
-            "users": """
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id     INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username    TEXT    UNIQUE NOT NULL,
-                    password    TEXT    NOT NULL,
-                    is_admin    INTEGER NOT NULL DEFAULT 0
-                );
-            """,
-            "activity_logs": """
-                CREATE TABLE IF NOT EXISTS activity_logs (
-                    log_id      INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user        TEXT,
-                    action      TEXT,
-                    details     TEXT,
-                    timestamp   TEXT,
-                    FOREIGN KEY (user) REFERENCES users(username) ON DELETE SET NULL
-                );
-            """,
-            "landlords": """
-                CREATE TABLE IF NOT EXISTS landlords (
-                    landlord_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name  TEXT,
-                    last_name   TEXT,
-                    email       TEXT,
-                    phone       TEXT,
-                    address     TEXT,
-                    status      TEXT
-                );
-            """,
-            "landlord_documents": """
-                CREATE TABLE IF NOT EXISTS landlord_documents (
-                    doc_id      INTEGER PRIMARY KEY AUTOINCREMENT,
-                    landlord_id INTEGER,
-                    doc_type    TEXT,
-                    doc_name    TEXT,
-                    file_path   TEXT,
-                    uploaded_date TEXT,
-                    expiry_date TEXT,
-                    FOREIGN KEY (landlord_id) REFERENCES landlords (landlord_id) ON DELETE CASCADE
-                );
-            """,
-            "properties": """
-                CREATE TABLE IF NOT EXISTS properties (
-                    property_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    door_number TEXT,
-                    street      TEXT,
-                    postcode    TEXT,
-                    area        TEXT,
-                    city        TEXT,
-                    bedrooms    INTEGER,
-                    property_type TEXT,
-                    price       REAL,
-                    availability_date TEXT,
-                    landlord_id INTEGER,
-                    image_path  TEXT,
-                    status      TEXT,
-                    notes       TEXT,
-                    FOREIGN KEY (landlord_id) REFERENCES landlords (landlord_id) ON DELETE SET NULL
-                );
-            """,
-            "property_images": """
-                CREATE TABLE IF NOT EXISTS property_images (
-                    image_id      INTEGER PRIMARY KEY AUTOINCREMENT,
-                    property_id   INTEGER,
-                    image_path    TEXT,
-                    uploaded_date TEXT,
-                    FOREIGN KEY (property_id) REFERENCES properties(property_id) ON DELETE CASCADE
-                );
-            """,
-            "property_documents": """
-                CREATE TABLE IF NOT EXISTS property_documents (
-                    doc_id      INTEGER PRIMARY KEY AUTOINCREMENT,
-                    property_id INTEGER,
-                    doc_type    TEXT,
-                    doc_name    TEXT,
-                    file_path   TEXT,
-                    uploaded_date TEXT,
-                    expiry_date TEXT,
-                    FOREIGN KEY (property_id) REFERENCES properties (property_id) ON DELETE CASCADE
-                );
-            """,
-            "tenants": """
-                CREATE TABLE IF NOT EXISTS tenants (
-                    tenant_id   INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name  TEXT,
-                    last_name   TEXT,
-                    email       TEXT,
-                    phone       TEXT,
-                    date_of_birth TEXT,
-                    nationality TEXT,
-                    emergency_contact TEXT,
-                    status      TEXT
-                );
-            """,
-            "tenant_documents": """
-                CREATE TABLE IF NOT EXISTS tenant_documents (
-                    doc_id      INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tenant_id   INTEGER,
-                    doc_type    TEXT,
-                    doc_name    TEXT,
-                    file_path   TEXT,
-                    uploaded_date TEXT,
-                    expiry_date TEXT,
-                    FOREIGN KEY (tenant_id) REFERENCES tenants (tenant_id) ON DELETE CASCADE
-                );
-            """,
-            "tenancies": """
-                CREATE TABLE IF NOT EXISTS tenancies (
-                    tenancy_id      INTEGER PRIMARY KEY AUTOINCREMENT,
-                    property_id     INTEGER,
-                    start_date      TEXT,
-                    end_date        TEXT,
-                    rent_amount     REAL,
-                    deposit_amount  REAL,
-                    status          TEXT,
-                    FOREIGN KEY (property_id) REFERENCES properties(property_id) ON DELETE CASCADE
-                );
-            """,
-            "tenancy_tenants": """
-                CREATE TABLE IF NOT EXISTS tenancy_tenants (
-                    tenancy_id    INTEGER,
-                    tenant_id     INTEGER,
-                    PRIMARY KEY (tenancy_id, tenant_id),
-                    FOREIGN KEY (tenancy_id) REFERENCES tenancies(tenancy_id) ON DELETE CASCADE,
-                    FOREIGN KEY (tenant_id) REFERENCES tenants(tenant_id) ON DELETE CASCADE
-                );
-            """,
-            "tenancy_documents": """
-                CREATE TABLE IF NOT EXISTS tenancy_documents (
-                    doc_id      INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tenancy_id  INTEGER,
-                    doc_type    TEXT,
-                    doc_name    TEXT,
-                    file_path   TEXT,
-                    uploaded_date TEXT,
-                    expiry_date TEXT,
-                    FOREIGN KEY (tenancy_id) REFERENCES tenancies(tenancy_id) ON DELETE CASCADE
-                );
-            """,
-            "payments": """
-                CREATE TABLE IF NOT EXISTS payments (
-                    payment_id  INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tenancy_id  INTEGER,
-                    tenant_id   INTEGER,
-                    payment_date TEXT,
-                    due_date    TEXT,
-                    amount      REAL,
-                    method      TEXT,
-                    status      TEXT,
-                    payment_type TEXT,
-                    notes       TEXT,
-                    FOREIGN KEY (tenancy_id) REFERENCES tenancies (tenancy_id) ON DELETE CASCADE,
-                    FOREIGN KEY (tenant_id) REFERENCES tenants (tenant_id) ON DELETE CASCADE
-                );
-            """,
-            "maintenance": """
-                CREATE TABLE IF NOT EXISTS maintenance (
-                    maintenance_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    property_id INTEGER,
-                    issue       TEXT,
-                    description TEXT,
-                    date_reported TEXT,
-                    status      TEXT,
-                    FOREIGN KEY (property_id) REFERENCES properties(property_id) ON DELETE CASCADE
-                );
-            """,
-        }
-
-        # === Execute table creations === #
-        for name, ddl in TABLES.items(): # Loop through each table definition
-            cur.execute(ddl) # Execute the SQL command to create the table
+        # === Apply schema migrations === #
+        # Creates the tables on a fresh install and upgrades an existing database
+        # (indexes, new columns, triggers...) to the latest version
+        MigrationManager(conn).apply()
 
         # === Seed default admin user === # 
         cur.execute("SELECT 1 FROM users WHERE username = ?;", ("admin",)) # Check if the admin user already exists
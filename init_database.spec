@@ -5,8 +5,8 @@ a = Analysis(
     ['init_database.py'],
     pathex=[],
     binaries=[],
-    datas=[('resources', 'resources')],
-    hiddenimports=[],
+    datas=[('resources', 'resources'), ('scripts/migrations', 'scripts/migrations')], # MigrationManager reads the migration scripts from disk
+    hiddenimports=['scripts.utils.db_indexes', 'scripts.utils.file_utils'], # Imported by migrations 0002 and 0006, which PyInstaller doesn't analyse
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
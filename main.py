@@ -5,10 +5,11 @@ from PySide6.QtWidgets import ( # This module is used for creating the GUI compo
     QListWidget, QListWidgetItem, QStackedWidget, QPushButton,
     QLabel, QLineEdit, QFormLayout, QMessageBox
 )
-from PySide6.QtCore import Qt, QSize, QSettings # This module is used for managing application settings and animations
+from PySide6.QtCore import Qt, QSize, QSettings, QTimer # This module is used for managing application settings and animations
 from PySide6.QtGui import QIcon # This module is used for handling icons and images
 import sqlite3 # This module is used for SQL database operations
 import atexit # This module is used for cleanup operations when the application exits
+import time # This module is used for the startup timing report
 
 import config # This module contains configuration settings for the application
 from scripts.dashboard_page import DashboardPage # This module contains the dashboard page of the application
@@ -24,6 +25,7 @@ from scripts import encryption_manager # This module contains encryption-related
 from scripts.document_manager import TEMP_FILES_TO_CLEAN # This module allows the temporary files to be cleaned
 from scripts.utils.file_utils import cleanup_temp_preview_folder # This module allows the temporary files to be cleaned
 from scripts.admin_page import AdminPage # This module contains the admin page functionalities
+from scripts.database_manager import DatabaseManager # This module contains the pooled database connections
 from config import DB_PATH, ICON_PATH, TEMP_PREVIEW_DIR, MAX_FILE_SIZE_MB # This module contains config settings for the application
 from config import resource_path # This module contains the resource path functionalities
 
@@ -38,6 +40,7 @@ required_folders = [
     config.STORAGE_PATHS["tenancy"], # Ensure the tenancies directory exists
     config.BACKUPS_DIR, # Ensure the backups directory exists
     config.TEMP_PREVIEW_DIR, # Ensure the temp preview directory exists
+    config.BLOBS_DIR, # Ensure the document blob store exists
     ]
 
 for folder in required_folders:
@@ -197,6 +200,11 @@ class STARPMKApp:
 
         self.settings = QSettings("STARPropertyManagementKit", "STARPMK")
 
+        # Close the pooled database connections cleanly when the app quits
+        self.app.aboutToQuit.connect(DatabaseManager().close)
+        # Drop decrypted documents held in memory for previews
+        self.app.aboutToQuit.connect(DocumentManager.clear_cache)
+
         # Clean the contents of the temp preview folder at startup
         # This is to ensure that any old files are removed before the app starts
         cleanup_temp_preview_folder()
@@ -227,9 +235,35 @@ class STARPMKApp:
 # MAIN WINDOW (AFTER LOGIN)
 # ============================ #
 
+# This class stands in for a page that hasn't been built yet
+# It shows "Loading..." and calls on_painted() once, straight after it has first been painted
+class PagePlaceholder(QWidget):
+    def __init__(self, text, on_painted):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        label = QLabel(text)
+        label.setAlignment(Qt.AlignCenter)
+        label.setObjectName("PageLabel")
+        layout.addWidget(label)
+        self.on_painted = on_painted
+
+    def paintEvent(self, event): # The placeholder is on screen: build the real page next
+        super().paintEvent(event)
+        if self.on_painted is not None:
+            QTimer.singleShot(0, self.on_painted)
+            self.on_painted = None
+
 # This class handles the main window of the application after login
+# The pages are kept in a registry by sidebar name. With config.LAZY_PAGES each page starts as a
+# PagePlaceholder in the stack and is built the first time it is opened, just after the
+# placeholder has been painted; the manager pages then fetch their first rows on a worker thread.
+# So logging in only builds the dashboard. With LAZY_PAGES = False every page is built at login.
+# The time from login to the window's first paint is reported when DEBUG_MODE is on.
 class MainWindow(QMainWindow):
     def __init__(self, main_app, user):
+        self.started_at = time.perf_counter() # For the startup timing report
+        self.first_paint_ms = None
+        self.pages_at_first_paint = None
         super().__init__() # Initialize the main window
         self.main_app = main_app
         self.user = user
@@ -257,30 +291,29 @@ class MainWindow(QMainWindow):
         sidebar_container.setLayout(sidebar_layout)
         sidebar_container.setFixedWidth(200)
 
+        # Page registry: sidebar name -> how to build the page
+        self.page_factories = {
+            "Dashboard": DashboardPage,
+            "Tenants": TenantManager,
+            "Properties": PropertyManager,
+            "Landlords": LandlordManager,
+            "Tenancies": TenancyManager,
+            "Payments": PaymentManager,
+            "Maintenance": MaintenanceManager,
+        }
+        if self.user["is_admin"]: # Add admin page if user is admin
+            self.page_factories["Admin"] = lambda: AdminPage(self.user)
+        self.pages = {} # sidebar name -> page, once built
+        self.placeholders = {} # sidebar name -> "Loading..." page, until the page is built
+
         # Pages for stacked widget
         self.stack = QStackedWidget()
-        self.dashboard_page = DashboardPage()
-        self.tenant_page = TenantManager()
-        self.property_page = PropertyManager()
-        self.landlord_page = LandlordManager()
-        self.tenancy_page = TenancyManager()
-        self.payment_page = PaymentManager()
-        self.maintenance_page = MaintenanceManager()
-
-        self.stack.addWidget(self.dashboard_page)
-        self.stack.addWidget(self.tenant_page)
-        self.stack.addWidget(self.property_page)
-        self.stack.addWidget(self.landlord_page)
-        self.stack.addWidget(self.tenancy_page)
-        self.stack.addWidget(self.payment_page)
-        self.stack.addWidget(self.maintenance_page)
-
-        self.stack.setCurrentWidget(self.dashboard_page)
-
-        # Add admin page to sidebar if user is admin
-        if self.user["is_admin"]:
-            self.admin_page = AdminPage(self.user)
-            self.stack.addWidget(self.admin_page)
+        for name in self.page_factories:
+            if config.LAZY_PAGES:
+                self.placeholders[name] = PagePlaceholder("Loading...", lambda name=name: self.build_page(name))
+                self.stack.addWidget(self.placeholders[name])
+            else:
+                self.build_page(name)
 
         # Add sidebar and pages to main layout
         main_layout.addWidget(sidebar_container)
@@ -290,7 +323,43 @@ class MainWindow(QMainWindow):
         self.load_sidebar_items()
 
         self.sidebar.setCurrentRow(0)
-        self.stack.setCurrentIndex(0)
+
+    def paintEvent(self, event): # Report the time from login to the first paint of the window
+        super().paintEvent(event)
+        if self.first_paint_ms is None:
+            self.first_paint_ms = (time.perf_counter() - self.started_at) * 1000
+            self.pages_at_first_paint = len(self.pages)
+            if config.DEBUG_MODE:
+                print(f"[Startup] Main window painted {self.first_paint_ms:.0f} ms after login "
+                      f"({self.pages_at_first_paint} of {len(self.page_factories)} pages built, LAZY_PAGES={config.LAZY_PAGES})")
+
+    def build_page(self, name): # Create a page and put it in the stack (in place of its placeholder)
+        if name in self.pages:
+            return self.pages[name]
+        start = time.perf_counter()
+        page = self.page_factories[name]()
+        self.pages[name] = page
+        placeholder = self.placeholders.pop(name, None)
+        if placeholder is None:
+            self.stack.addWidget(page)
+        else:
+            self.stack.insertWidget(self.stack.indexOf(placeholder), page)
+            if self.stack.currentWidget() is placeholder:
+                self.stack.setCurrentWidget(page)
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+        if config.DEBUG_MODE:
+            print(f"[Startup] {name} page built in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return page
+
+    def show_page(self, name): # Switch to a page (or to its placeholder, which builds it once painted)
+        page = self.pages.get(name)
+        if page is None:
+            self.stack.setCurrentWidget(self.placeholders[name])
+            return
+        self.stack.setCurrentWidget(page)
+        if hasattr(page, 'load_data_async'): # Refresh the rows on a search worker (the dashboard refreshes itself when shown)
+            page.load_data_async()
 
     def create_label_page(self, text): # This method creates labels for the stacked widget
         page = QWidget()
@@ -333,32 +402,8 @@ class MainWindow(QMainWindow):
 
         text = item.text().strip() # Get the text of the current item
 
-        if text == "Dashboard": # If the item is "Dashboard", set the current widget to the dashboard page
-            self.stack.setCurrentWidget(self.dashboard_page)
-
-        elif text == "Tenants": # If the item is "Tenants", set the current widget to the tenant page
-            self.stack.setCurrentWidget(self.tenant_page)
-            self.tenant_page.load_data() 
-
-        elif text == "Properties": # If the item is "Properties", set the current widget to the property page
-            self.stack.setCurrentWidget(self.property_page)
-            self.property_page.load_data()
-
-        elif text == "Landlords": # If the item is "Landlords", set the current widget to the landlord page
-            self.stack.setCurrentWidget(self.landlord_page)
-            self.landlord_page.load_data()
-
-        elif text == "Tenancies": # If the item is "Tenancies", set the current widget to the tenancy page
-            self.stack.setCurrentWidget(self.tenancy_page)
-            self.tenancy_page.load_data()
-
-        elif text == "Payments": # If the item is "Payments", set the current widget to the payment page
-            self.stack.setCurrentWidget(self.payment_page)
-            self.payment_page.load_data()
-
-        elif text == "Maintenance": # If the item is "Maintenance", set the current widget to the maintenance page
-            self.stack.setCurrentWidget(self.maintenance_page)
-            self.maintenance_page.load_data()
+        if text in self.page_factories: # A page: Dashboard, Tenants, Properties... (Admin only for admins)
+            self.show_page(text)
 
         elif text == "Switch Theme": # If the item is "Switch Theme", toggle the theme
             self.main_app.toggle_theme()
@@ -366,11 +411,9 @@ class MainWindow(QMainWindow):
 
         elif text == "Logout": # If the item is "Logout", show a confirmation dialog
             reply = QMessageBox.question(self, "Logout", "Are you sure you want to logout?", QMessageBox.Yes | QMessageBox.No)
+            DocumentManager.clear_cache() # Decrypted documents must not outlive the session
             self.close()
 
-        elif text == "Admin" and self.user["is_admin"]: # If the item is "Admin" and the user is an admin, set the current widget to the admin page
-            self.stack.setCurrentWidget(self.admin_page)
-
 
 
 # ========================= #
@@ -381,9 +424,6 @@ class MainWindow(QMainWindow):
 # It creates an instance of the STARPMKApp class and runs the application
 if __name__ == "__main__":
 
-    app = STARPMKApp()
-    app.run()
-
     def clean_temp_files(): # This function cleans up temporary files when the application exits
         for path in TEMP_FILES_TO_CLEAN:
             try:
@@ -391,6 +431,10 @@ if __name__ == "__main__":
                     os.remove(path)
             except Exception as e:
                 print(f"[WARN] Failed to delete temp file: {e}")
-# This is to ensure that any temporary files are removed when the application exits
+    # This is to ensure that any temporary files (e.g. PDFs opened for preview) are removed when the application exits
+    # It is registered before run(), which does not return until the app quits
     atexit.register(clean_temp_files)
 
+    app = STARPMKApp()
+    app.run()
+
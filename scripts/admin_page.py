@@ -1,6 +1,9 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox, QHBoxLayout
-from PySide6.QtCore import Qt
+import threading
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox, QHBoxLayout, QProgressDialog
+from PySide6.QtCore import Qt, QThread, Signal
 from scripts.utils.user_manager import UserManager
+from scripts.database_manager import DatabaseManager
+from scripts.storage_reconciler import StorageReconciler
 from config import BACKUPS_DIR, TEMP_PREVIEW_DIR, DB_PATH
 import shutil, os
 from datetime import datetime
@@ -11,6 +14,29 @@ from datetime import datetime
 # viewing activity logs, cleaning temporary files, and creating backups.
 # The admin page is only accessible to users with admin privileges.
 
+# ReconcileWorker class running StorageReconciler off the GUI thread
+# Reports progress after every batch of orphans and the final ReconcileReport through Qt signals.
+
+class ReconcileWorker(QThread):
+    progress = Signal(int, int) # files scanned, orphans found so far
+    completed = Signal(object) # ReconcileReport, or the exception that stopped the run
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cancel_event = threading.Event() # Set by the progress dialog's Cancel button
+
+    def run(self): # Called on the worker thread
+        try:
+            report = StorageReconciler().run(
+                progress=lambda report: self.progress.emit(report.scanned_files, report.orphan_files),
+                cancelled=self.cancel_event.is_set,
+            )
+        except Exception as e:
+            print("[ERROR] Storage reconcile failed:", e)
+            report = e
+        self.completed.emit(report)
+
+
 # The AdminPage class is a QWidget that contains buttons for each of the admin functions.
 class AdminPage(QWidget):
     def __init__(self, user, parent=None):
@@ -44,6 +70,13 @@ class AdminPage(QWidget):
         cleanup_btn.clicked.connect(self.clean_temp)
         layout.addWidget(cleanup_btn)
 
+        # Orphaned Files Cleanup
+        # This button finds document and image files no record uses any more (e.g. left behind
+        # by deleted tenancies) and quarantines them in the background.
+        self.reclaim_btn = QPushButton("Reclaim Storage")
+        self.reclaim_btn.clicked.connect(self.reclaim_storage)
+        layout.addWidget(self.reclaim_btn)
+
         # Database Backup
         # This button creates a backup of the SQLite database.
         # The BACKUPS_DIR is the directory where backups are stored.
@@ -70,13 +103,40 @@ class AdminPage(QWidget):
             QMessageBox.critical(self, "Error",
                                  f"Could not clean temp files:\n{e}")
 
+    def reclaim_storage(self): # This function removes orphaned files on a worker thread.
+        self.reclaim_btn.setEnabled(False)
+        self.progress_dialog = QProgressDialog("Scanning stored files...", "Cancel", 0, 0, self)
+        self.progress_dialog.setWindowTitle("Reclaim Storage")
+        self.progress_dialog.setWindowModality(Qt.WindowModal)
+        self.progress_dialog.setMinimumDuration(300) # Only shown if the scan takes a moment
+
+        self.reconcile_worker = ReconcileWorker(self)
+        self.reconcile_worker.progress.connect(self.show_reconcile_progress)
+        self.reconcile_worker.completed.connect(self.reconcile_finished)
+        self.progress_dialog.canceled.connect(self.reconcile_worker.cancel_event.set)
+        self.reconcile_worker.start()
+
+    def show_reconcile_progress(self, scanned, orphans): # Update the progress dialog after each batch
+        self.progress_dialog.setLabelText(f"Scanned {scanned} file(s), {orphans} orphaned")
+
+    def reconcile_finished(self, report): # Show the report of what was reclaimed
+        self.reconcile_worker.wait()
+        self.progress_dialog.canceled.disconnect(self.reconcile_worker.cancel_event.set)
+        self.progress_dialog.reset()
+        self.reclaim_btn.setEnabled(True)
+        if isinstance(report, Exception):
+            QMessageBox.critical(self, "Error", f"Could not reclaim storage:\n{report}")
+        else:
+            QMessageBox.information(self, "Storage Reclaimed", report.summary())
+
     def create_backup(self): # This function creates a backup of the SQLite database.
-        # It copies the database file to the BACKUPS_DIR with a timestamp.
+        # It copies the database to the BACKUPS_DIR with a timestamp.
+        # SQLite's backup API is used so that changes still in the WAL file are included.
         try:
             os.makedirs(BACKUPS_DIR, exist_ok=True)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             dest = os.path.join(BACKUPS_DIR, f"backup_{timestamp}.db")
-            shutil.copy(DB_PATH, dest)
+            DatabaseManager().backup(dest)
             QMessageBox.information(self, "Backup Complete",
                                     f"Backup saved as:\n{dest}")
         except Exception as e: # Handle any exceptions that occur during backup
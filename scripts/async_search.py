@@ -0,0 +1,146 @@
+import time
+from collections import deque
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from config import SEARCH_DEBOUNCE_MS, DEBUG_MODE
+
+
+class SearchSignals(QObject): # Carries a worker's result back to the GUI thread
+    finished = Signal(int, object, float) # generation, result, seconds spent in the worker
+    failed = Signal(int, str) # generation, error message
+
+
+class SearchTask(QRunnable): # Runs one search query on a worker thread
+    def __init__(self, generation, text, run, signals, args=()):
+        super().__init__()
+        self.generation = generation
+        self.text = text
+        self.args = args # Taken on the GUI thread when the search started
+        self.run_search = run
+        self.signals = signals
+
+    def run(self): # Called by QThreadPool on a worker thread
+        start = time.perf_counter()
+        try:
+            result = self.run_search(self.text, *self.args)
+            self.signals.finished.emit(self.generation, result, time.perf_counter() - start)
+        except RuntimeError: # The search box was closed while the query was running
+            pass
+        except Exception as e: # Report database errors on the GUI thread
+            try:
+                self.signals.failed.emit(self.generation, str(e))
+            except RuntimeError:
+                pass
+
+
+# DebouncedSearch class wiring a search box to a background query
+# Every keystroke restarts a short timer; only when typing pauses for SEARCH_DEBOUNCE_MS
+# does run(text) start on a worker thread. Each keystroke also bumps a generation
+# number, so a result that comes back for older text is dropped instead of being
+# shown, and a query still waiting in the pool queue is cancelled. apply(result) then
+# runs on the GUI thread. Keystroke-to-render latency (debounce + query + render)
+# is recorded for every applied search and exposed through latency_measured and stats().
+# With run=None, apply(text) is called directly once typing pauses (in-memory filters).
+# refresh() runs the search for the current text straight away, e.g. to load a page's data.
+# snapshot(), if given, is called on the GUI thread as each search starts and returns a tuple
+# of extra arguments for run(text, ...), so the worker never reads the widgets' state itself.
+
+class DebouncedSearch(QObject):
+    latency_measured = Signal(float) # Keystroke-to-render time of an applied search, in ms
+    _pool = None # Worker threads shared by every search box
+
+    def __init__(self, line_edit, run, apply, delay_ms=SEARCH_DEBOUNCE_MS, parent=None, snapshot=None):
+        super().__init__(parent)
+        self.line_edit = line_edit
+        self.run = run
+        self.apply = apply
+        self.snapshot = snapshot
+
+        self.generation = 0 # Bumped on every keystroke
+        self.latencies = deque(maxlen=200) # Recent keystroke-to-render times (ms)
+        self.dropped = 0 # Stale results thrown away
+        self._typed_at = time.perf_counter() # Time of the last keystroke
+        self._queued = None # Task waiting in the pool, if any
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.dispatch)
+
+        self.signals = SearchSignals(self)
+        self.signals.finished.connect(self.handle_finished)
+        self.signals.failed.connect(self.handle_failed)
+
+        line_edit.textChanged.connect(self.handle_text_changed)
+
+    @classmethod
+    def pool(cls): # Lazily created thread pool for the search queries
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(2)
+            cls._pool.setExpiryTimeout(-1) # Keep the threads (and their pooled DB connections) alive
+        return cls._pool
+
+    def handle_text_changed(self): # Keystroke: invalidate older searches and restart the timer
+        self.generation += 1
+        self._typed_at = time.perf_counter()
+        self.timer.start()
+
+    def dispatch(self): # Typing paused: start the search for the current text
+        text = self.line_edit.text()
+        if self.run is None: # In-memory filter, cheap enough for the GUI thread
+            self.apply(text)
+            self.record_latency(0.0, text)
+            return
+
+        if self._queued is not None: # Still waiting for a thread, no point running it
+            self.pool().tryTake(self._queued)
+        args = self.snapshot() if self.snapshot else ()
+        self._queued = SearchTask(self.generation, text, self.run, self.signals, args)
+        self.pool().start(self._queued)
+
+    def refresh(self): # Run the search for the current text now (e.g. because the data changed)
+        self.generation += 1 # Results of searches already running may be out of date
+        self._typed_at = time.perf_counter()
+        self.timer.stop()
+        self.dispatch()
+
+    def flush(self): # Run a pending search straight away (e.g. when Enter is pressed)
+        if self.timer.isActive():
+            self.timer.stop()
+            self.dispatch()
+
+    def handle_finished(self, generation, result, query_seconds): # GUI thread: show the result if it is still current
+        self.forget_task(generation)
+        if generation != self.generation:
+            self.dropped += 1
+            return
+        self.apply(result)
+        self.record_latency(query_seconds * 1000, self.line_edit.text())
+
+    def forget_task(self, generation): # The queued task has run, stop tracking it
+        if self._queued is not None and self._queued.generation == generation:
+            self._queued = None
+
+    def handle_failed(self, generation, message): # GUI thread: log a failed search
+        self.forget_task(generation)
+        if generation == self.generation:
+            print(f"[ERROR] Search failed: {message}")
+
+    def record_latency(self, query_ms, text): # Store and publish the keystroke-to-render time
+        latency_ms = (time.perf_counter() - self._typed_at) * 1000
+        self.latencies.append(latency_ms)
+        self.latency_measured.emit(latency_ms)
+        if DEBUG_MODE:
+            print(f"[Search] {text!r}: {latency_ms:.0f} ms from last keystroke to render (query {query_ms:.1f} ms)")
+
+    def stats(self): # Summary of recent keystroke-to-render latencies
+        values = sorted(self.latencies)
+        if not values:
+            return {"searches": 0, "dropped": self.dropped}
+        return {
+            "searches": len(values),
+            "dropped": self.dropped,
+            "last_ms": self.latencies[-1],
+            "p50_ms": values[len(values) // 2],
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+        }
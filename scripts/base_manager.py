@@ -1,9 +1,14 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QHBoxLayout, QLineEdit,
-    QTableWidget, QTableWidgetItem, QPushButton,
+    QTableWidget, QTableWidgetItem, QTableView, QPushButton,
     QAbstractItemView, QHeaderView, QMessageBox
 )
 from PySide6.QtCore import Qt
+from scripts.database_manager import DatabaseManager
+from scripts.manager_table_model import ManagerTableModel
+from scripts.search_service import SearchService
+from scripts.async_search import DebouncedSearch
+from config import TABLE_FETCH_BATCH
 
 
 # BaseManager is a base class for creating a data management interface in a PyQt/PySide application.
@@ -11,9 +16,35 @@ from PySide6.QtCore import Qt
 # a table widget for displaying data, and pagination controls.
 # The class is intended to be subclassed for specific data types and functionalities.
 # It is not meant to be instantiated directly.
+#
+# Subclasses that implement get_query() are paged in SQL: only the rows of the current
+# page are fetched, sorted by the clicked header, and the total row count is cached until
+# the data or the search text changes. Next/Previous use keyset paging (WHERE past the
+# last row seen) so a page flip costs the same on a large table as on a small one.
+# Subclasses that only implement get_data() keep the old in-memory paging.
+# Subclasses that name a search_index are searched through its FTS5 index (prefix
+# matches, ranked by relevance until a header is clicked); otherwise search_columns are
+# matched with LIKE. Typing in the search box is debounced; for SQL-paged managers the
+# search, row count and first page are fetched on a worker thread (see async_search)
+# and results for text that has since changed are dropped.
+#
+# load_data_async() fetches the same way, so building a manager doesn't wait for its first
+# query: the table says "Loading..." until the rows arrive.
+#
+# Setting virtual_table = True (with get_query) swaps the pages for one QTableView backed
+# by ManagerTableModel: rows are fetched in batches as the user scrolls down, and only
+# the visible cells are drawn, so tens of thousands of rows stay responsive.
 
 class BaseManager(QWidget): # BaseManager class inherits from QWidget
 
+    # === Server-side paging settings (used with get_query) === #
+    sort_columns = [] # Result column behind each table column (None = not sortable)
+    key_column = None # Unique result column, used as the sort tie-breaker and for keyset paging
+    default_sort = None # (column, descending) used until a header is clicked
+    search_columns = [] # Result columns matched against the search text (LIKE fallback)
+    search_index = None # Entity in search_service.SEARCH_INDEXES, matched on key_column
+    virtual_table = False # Infinite scroll instead of Previous/Next pages
+
     # Constructor takes title, search placeholder, columns, and parent widget
     def __init__(self, title, search_placeholder, columns, parent=None):
         super().__init__(parent)
@@ -21,6 +52,14 @@ class BaseManager(QWidget): # BaseManager class inherits from QWidget
         self.items_per_page = 10 # Number of items to display per page
         self.current_page = 0 # Current page index
         self.filtered_data = [] # List to hold filtered data
+        self.page_data = [] # Rows shown on the current page
+        self.total_rows = 0 # Number of rows across all pages
+        self._count_cache = None # Cached COUNT(*) for server-side paging
+        self._page_move = 0 # 1/-1 when the next refresh is a Next/Previous page flip
+        self.sort_column = None # Index of the clicked header column
+        self.sort_descending = False
+        self.search_state = ("", None) # (search text, FTS hits subquery) of the search being shown
+        self._prefetched = None # First rows already fetched by a search worker
 
         # === Layouts === #
         layout = QVBoxLayout()
@@ -32,7 +71,15 @@ class BaseManager(QWidget): # BaseManager class inherits from QWidget
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText(search_placeholder)
-        self.search_input.textChanged.connect(self.apply_search_filter)
+        # Debounced; SQL-paged managers search on a worker thread
+        self.search_worker = DebouncedSearch(
+            self.search_input,
+            self.run_search if self.is_server_paged() else None,
+            self.apply_search_results if self.is_server_paged() else self.apply_search_filter,
+            parent=self,
+            snapshot=lambda: (self.header_sort(),) # The sort is read here, on the GUI thread
+        )
+        self.search_input.returnPressed.connect(self.search_worker.flush)
         search_layout.addWidget(self.search_input)
         layout.addLayout(search_layout)
 
@@ -58,18 +105,27 @@ class BaseManager(QWidget): # BaseManager class inherits from QWidget
         layout.addLayout(button_layout)
 
         # === Table Widget === #
-        self.table_widget = QTableWidget()
-        self.table_widget.setColumnCount(len(columns))
-        self.table_widget.setHorizontalHeaderLabels(columns)
+        self.virtual_mode = self.virtual_table and self.is_server_paged()
+        if self.virtual_mode: # Lazily filled model; rows are fetched as the view scrolls
+            self.table_model = ManagerTableModel(self, columns, TABLE_FETCH_BATCH, self)
+            self.table_model.rowsInserted.connect(self.update_row_count_label)
+            self.table_widget = QTableView()
+            self.table_widget.setModel(self.table_model)
+            self.table_widget.doubleClicked.connect(self.handle_double_click)
+        else:
+            self.table_widget = QTableWidget()
+            self.table_widget.setColumnCount(len(columns))
+            self.table_widget.setHorizontalHeaderLabels(columns)
+            self.table_widget.setSortingEnabled(True)
+            self.table_widget.itemDoubleClicked.connect(self.handle_double_click)
         self.table_widget.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table_widget.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table_widget.setSortingEnabled(True)
-        self.table_widget.itemDoubleClicked.connect(self.handle_double_click)
+        self.table_widget.horizontalHeader().sectionClicked.connect(self.handle_sort)
         self.table_widget.setStyleSheet("""
-            QTableWidget::item:hover { ## Highlight on hover
+            QTableView::item:hover { /* Highlight on hover (QTableView also matches QTableWidget) */
                 background-color: #cce7ff;
             }
-            QTableWidget::item:selected { ## Highlight on selection
+            QTableView::item:selected { /* Highlight on selection */
                 background-color: #90caf9;
                 color: black;
             }
@@ -108,28 +164,67 @@ class BaseManager(QWidget): # BaseManager class inherits from QWidget
         pagination_layout.addStretch()
         pagination_layout.addWidget(self.next_button)
 
+        if self.virtual_mode: # Scrolling replaces the page buttons
+            self.prev_button.setVisible(False)
+            self.next_button.setVisible(False)
+
         layout.addLayout(pagination_layout)
         self.setLayout(layout)
 
     # === Search Filter === #
     # This method filters the data based on the search input.
-    def apply_search_filter(self):
-        query = self.search_input.text().strip().lower()
+    def apply_search_filter(self, text=None):
+        query = (self.search_input.text() if text is None else text).strip().lower()
+        self.current_page = 0
+        self._count_cache = None # The search changes the row count
+        self.search_state = self.make_search_state(query)
+        if not self.is_server_paged():
+            self.filtered_data = [
+                item for item in self.get_data()
+                if self.filter_item(item, query)
+            ]
+        self.refresh_table()
+
+    def run_search(self, text, sort): # Worker thread: search state, row count and first rows for text
+        # Works only from its arguments and the database, never from the widgets;
+        # sort is header_sort() as it was when the search started
+        state = self.make_search_state(text)
+        if self.virtual_mode:
+            return state, None, self.first_rows(state, self.table_model.batch_size + 1, sort), sort
+        return state, self.count_query(state), self.first_rows(state, self.items_per_page, sort), sort
+
+    def apply_search_results(self, result): # GUI thread: show what a search worker fetched
+        self.search_state, self._count_cache, rows, sort = result
+        self._prefetched = rows if sort == self.header_sort() else None # Fetched again if the sort changed meanwhile
+        self.empty_label.setText("No data found.") # Replaces "Loading..." from load_data_async()
         self.current_page = 0
-        self.filtered_data = [
-            item for item in self.get_data()
-            if self.filter_item(item, query)
-        ]
         self.refresh_table()
 
     # === Refresh Table === #
     # This method refreshes the table with the current page of data.
     # It updates the table widget, pagination label, and button states.
     def refresh_table(self):
-        self.filtered_data = self.get_data()
-        start = self.current_page * self.items_per_page
-        end = start + self.items_per_page
-        page_data = self.filtered_data[start:end]
+        if self.virtual_mode: # The model fetches its own rows as the view scrolls
+            self.table_model.reload(self.take_prefetched())
+            has_rows = bool(self.table_model.rows)
+            self.table_widget.setVisible(has_rows)
+            self.empty_label.setVisible(not has_rows)
+            header = self.table_widget.horizontalHeader()
+            header.setStretchLastSection(True)
+            header.setSectionResizeMode(QHeaderView.Stretch)
+            self.update_row_count_label()
+            return
+
+        if self.is_server_paged():
+            self.table_widget.setSortingEnabled(False) # Rows already arrive sorted from SQL
+            self.page_data = self.fetch_page()
+        else:
+            self.total_rows = len(self.filtered_data)
+            start = self.current_page * self.items_per_page
+            end = start + self.items_per_page
+            self.page_data = self.filtered_data[start:end]
+        self._page_move = 0
+        page_data = self.page_data
 
         self.table_widget.setRowCount(0)
         if not page_data:
@@ -141,14 +236,16 @@ class BaseManager(QWidget): # BaseManager class inherits from QWidget
             self.table_widget.setRowCount(len(page_data))
             for row, item in enumerate(page_data):
                 for col, value in enumerate(self.extract_row_values(item)):
-                    self.table_widget.setItem(row, col, QTableWidgetItem(str(value)))
+                    cell = QTableWidgetItem(str(value))
+                    cell.setData(Qt.UserRole, row) # Remember the page row, even if the table is re-sorted
+                    self.table_widget.setItem(row, col, cell)
 
             self.table_widget.resizeColumnsToContents()
             header = self.table_widget.horizontalHeader()
             header.setStretchLastSection(True)
             header.setSectionResizeMode(QHeaderView.Stretch)
 
-        total_pages = max(1, (len(self.filtered_data) + self.items_per_page - 1) // self.items_per_page)
+        total_pages = max(1, (self.total_rows + self.items_per_page - 1) // self.items_per_page)
         self.pagination_label.setText(f"Page {self.current_page + 1} of {total_pages}")
 
         self.prev_button.setEnabled(self.current_page > 0)
@@ -158,31 +255,208 @@ class BaseManager(QWidget): # BaseManager class inherits from QWidget
         # Check if the current page is greater than 0
         if self.current_page > 0:
             self.current_page -= 1
+            self._page_move = -1
             self.refresh_table()
 
     def go_to_next_page(self): # This method handles the pagination to go to the next page.
         # Check if the next page exists
-        if (self.current_page + 1) * self.items_per_page < len(self.filtered_data):
+        if (self.current_page + 1) * self.items_per_page < self.total_rows:
             self.current_page += 1
+            self._page_move = 1
             self.refresh_table()
 
+    def update_row_count_label(self): # Virtual mode: show how many rows are loaded
+        loaded = len(self.table_model.rows)
+        if self.table_model.exhausted:
+            self.pagination_label.setText(f"{loaded:,} rows")
+        else:
+            self.pagination_label.setText(f"{loaded:,} rows loaded, scroll for more")
+
+    def handle_sort(self, column): # Sort by the clicked header column (server-side paging only)
+        # Managers without get_query() keep QTableWidget's own in-page sorting
+        if not self.is_server_paged() or column >= len(self.sort_columns) or not self.sort_columns[column]:
+            return
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+
+        header = self.table_widget.horizontalHeader()
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(column, Qt.DescendingOrder if self.sort_descending else Qt.AscendingOrder)
+        self.current_page = 0
+        self.refresh_table()
+
+    # === Server-side Paging === #
+    def is_server_paged(self): # True when the subclass provides a SQL query to page through
+        return self.get_query() is not None
+
+    def header_sort(self): # GUI thread: (column, descending) of the clicked header, or None
+        if self.sort_column is None:
+            return None
+        return self.sort_columns[self.sort_column], self.sort_descending
+
+    def current_order(self, state=None): # GUI thread: (column, descending) for the active sort
+        return self.resolve_order(self.header_sort(), state or self.search_state)
+
+    def resolve_order(self, sort, state): # (column, descending) for a header sort (or None) and a search state
+        if sort is not None:
+            return sort
+        hits = state[1]
+        if hits is not None and hits[2]: # Best matches first
+            return "search_rank", False
+        return self.default_sort or (self.key_column, False)
+
+    def make_search_state(self, text): # (text, FTS hits subquery or None) for a search text
+        text = text.strip()
+        if not text or not self.search_index or not self.key_column:
+            return text, None
+        return text, SearchService().hits_subquery(self.search_index, text)
+
+    def page_source(self, state=None): # The subclass query plus the search filter, as (sql, conditions, params)
+        sql, params = self.get_query()
+        sql = f"SELECT * FROM ({sql}) AS page_source"
+        conditions = []
+        params = list(params)
+        text, hits = state or self.search_state
+        if hits is not None: # Join the ranked FTS hits
+            hits_sql, hits_params, _ = hits
+            sql += f" JOIN ({hits_sql}) AS search_hits ON page_source.{self.key_column} = search_hits.search_rowid"
+            params += hits_params
+        elif text and self.search_columns:
+            conditions.append("(" + " OR ".join(f"{col} LIKE ?" for col in self.search_columns) + ")")
+            params += [f"%{text}%"] * len(self.search_columns)
+        return sql, conditions, params
+
+    def run_page_query(self, sql, params): # Run a paging query and return its rows as dictionaries
+        with DatabaseManager().cursor() as cur:
+            cur.execute(sql, params)
+            col_names = [desc[0] for desc in cur.description]
+            return [dict(zip(col_names, row)) for row in cur.fetchall()]
+
+    def select_rows(self, extra_condition, extra_params, order_by, limit, offset=0, state=None): # One LIMIT query on the page source
+        sql, conditions, params = self.page_source(state)
+        if extra_condition:
+            conditions = conditions + [extra_condition]
+            params = params + list(extra_params)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order_by} LIMIT ? OFFSET ?"
+        return self.run_page_query(sql, params + [limit, offset])
+
+    def count_rows(self): # COUNT(*) of the filtered query, cached until the data or search changes
+        if self._count_cache is None:
+            self._count_cache = self.count_query()
+        return self._count_cache
+
+    def count_query(self, state=None): # Run COUNT(*) over the filtered query
+        sql, conditions, params = self.page_source(state)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with DatabaseManager().cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM ({sql})", params)
+            return cur.fetchone()[0]
+
+    def first_rows(self, state, limit, sort): # The first rows for a search state, in the given header sort
+        return self.select_rows(None, [], self.order_clause(*self.resolve_order(sort, state)), limit, 0, state)
+
+    def take_prefetched(self): # Hand over (once) the rows a search worker already fetched
+        rows, self._prefetched = self._prefetched, None
+        return rows
+
+    def keyset_segments(self, column, descending, boundary): # WHERE/ORDER BY pairs for the rows after boundary
+        # NULLs sort first in SQLite, and row-value comparisons skip them, so the
+        # NULL rows are fetched as a separate segment to keep every lookup on an index
+        key = self.key_column
+        key_value = boundary[key]
+        if column == key:
+            op, direction = ("<", "DESC") if descending else (">", "ASC")
+            return [(f"{key} {op} ?", [key_value], f"{key} {direction}")]
+
+        value = boundary[column]
+        if not descending:
+            if value is None:
+                return [
+                    (f"{column} IS NULL AND {key} > ?", [key_value], f"{key} ASC"),
+                    (f"{column} IS NOT NULL", [], f"{column} ASC, {key} ASC"),
+                ]
+            return [(f"({column}, {key}) > (?, ?)", [value, key_value], f"{column} ASC, {key} ASC")]
+
+        if value is None:
+            return [(f"{column} IS NULL AND {key} < ?", [key_value], f"{key} DESC")]
+        return [
+            (f"({column}, {key}) < (?, ?)", [value, key_value], f"{column} DESC, {key} DESC"),
+            (f"{column} IS NULL", [], f"{key} DESC"),
+        ]
+
+    def fetch_page(self): # Fetch the rows for self.current_page from the database
+        self.total_rows = self.count_rows()
+        last_page = max(0, (self.total_rows - 1) // self.items_per_page)
+        if self.current_page > last_page: # Rows were deleted since the page was shown
+            self.current_page = last_page
+            self._page_move = 0
+
+        limit = self.items_per_page
+        prefetched = self.take_prefetched()
+        if prefetched is not None: # A search worker already fetched the first page
+            return prefetched
+        if self._page_move and self.page_data and self.key_column: # Keyset page flip from the rows on screen
+            forward = self._page_move > 0
+            return self.fetch_adjacent(self.page_data[-1] if forward else self.page_data[0], limit, forward)
+
+        # First load, new sort or search, or a reload in place: plain LIMIT/OFFSET
+        return self.select_rows(None, [], self.order_clause(*self.current_order()), limit, self.current_page * limit)
+
+    def fetch_more_rows(self, loaded, limit): # Virtual mode: the batch that follows the rows already loaded
+        if loaded and self.key_column:
+            return self.fetch_adjacent(loaded[-1], limit, forward=True)
+        return self.select_rows(None, [], self.order_clause(*self.current_order()), limit, len(loaded))
+
+    def order_clause(self, column, descending): # ORDER BY text for a sort column plus the key tie-breaker
+        direction = "DESC" if descending else "ASC"
+        order_by = f"{column} {direction}"
+        if self.key_column and column != self.key_column:
+            order_by += f", {self.key_column} {direction}"
+        return order_by
+
+    def fetch_adjacent(self, boundary, limit, forward=True): # Keyset: up to limit rows after (or before) boundary
+        column, descending = self.current_order()
+        rows = []
+        # Walking backwards is the same walk with the sort order flipped
+        for condition, params, order_by in self.keyset_segments(column, descending != (not forward), boundary):
+            rows += self.select_rows(condition, params, order_by, limit - len(rows))
+            if len(rows) >= limit:
+                break
+        return rows if forward else rows[::-1]
+
+    def selected_item(self): # Return the data item for the selected table row, or None
+        if self.virtual_mode:
+            return self.table_model.row_item(self.table_widget.currentIndex().row())
+        cell = self.table_widget.item(self.table_widget.currentRow(), 0)
+        if cell is None:
+            return None
+        index = cell.data(Qt.UserRole)
+        if index is None or not 0 <= index < len(self.page_data):
+            return None
+        return self.page_data[index]
+
     def handle_double_click(self): # This method handles the double-click event on a table row.
-        # Get the selected row index
-        selected_row = self.table_widget.currentRow()
-        if 0 <= selected_row < len(self.filtered_data):
-            self.open_details_dialog(self.filtered_data[selected_row])
+        # Get the item for the selected row
+        item = self.selected_item()
+        if item is not None:
+            self.open_details_dialog(item)
 
     def handle_edit(self): # This method handles the edit button click event.
-        # Get the selected row index
-        selected_row = self.table_widget.currentRow()
-        if 0 <= selected_row < len(self.filtered_data):
-            self.open_details_dialog(self.filtered_data[selected_row])
+        # Get the item for the selected row
+        item = self.selected_item()
+        if item is not None:
+            self.open_details_dialog(item)
 
     def handle_delete(self): # This method handles the delete button click event.
-        # Get the selected row index
-        selected_row = self.table_widget.currentRow()
-        if 0 <= selected_row < len(self.filtered_data):
-            item = self.filtered_data[selected_row]
+        # Get the item for the selected row
+        item = self.selected_item()
+        if item is not None:
             confirm = QMessageBox.question(
                 self,
                 "Confirm Deletion",
@@ -192,6 +466,9 @@ class BaseManager(QWidget): # BaseManager class inherits from QWidget
             if confirm == QMessageBox.Yes:
                 self.delete_item(item)
 
+    def get_query(self): # Override in subclasses to return (sql, params) for server-side paging.
+        return None
+
     def get_data(self): # This method should be overridden in subclasses to provide the data.
         raise NotImplementedError
 
@@ -208,5 +485,19 @@ class BaseManager(QWidget): # BaseManager class inherits from QWidget
         raise NotImplementedError
 
     def load_data(self): # This method loads the data and refreshes the table.
-        self.filtered_data = self.get_data() # Get the data
+        self._count_cache = None # Rows may have been added or removed
+        self._prefetched = None
+        self.search_state = self.make_search_state(self.search_state[0]) # Match counts may have changed
+        if not self.is_server_paged():
+            self.filtered_data = self.get_data() # Get the data
         self.refresh_table() # Refresh the table with the data
+
+    def load_data_async(self): # Like load_data(), but the row count and first rows are fetched on a search worker
+        if not self.is_server_paged():
+            self.load_data()
+            return
+        if not (self.table_model.rows if self.virtual_mode else self.page_data): # Nothing shown yet
+            self.table_widget.setVisible(False)
+            self.empty_label.setText("Loading...")
+            self.empty_label.setVisible(True)
+        self.search_worker.refresh() # apply_search_results() shows them
@@ -0,0 +1,74 @@
+import os
+import threading
+from collections import OrderedDict
+from scripts import encryption_manager
+from config import BLOBS_DIR
+
+# BlobStore class keeping one encrypted copy of each distinct document
+# Blobs are named by the keyed content hash of their plaintext (encryption_manager.content_hash)
+# and spread over sub-folders by the first two characters, e.g. blobs/3f/3fa9....encrypted.
+# Storing a file that is already in the store only costs the hash: nothing is encrypted or written.
+# The hashes of recently stored source files are remembered by path, modification time and size,
+# so attaching the same file to several records (e.g. a joint tenancy agreement) hashes it once.
+# Which documents use each blob is recorded in the database (document_blobs, migration 0005),
+# and blobs nothing uses any more are removed by DocumentManager.collect_blob_garbage().
+# collecting is held while unused blobs are removed and while an upload records its blobs,
+# so a blob reused by an upload can't be collected between storing it and saving its row.
+
+HASH_MEMO_SIZE = 256 # Source files whose content hash is remembered
+
+class BlobStore:
+    collecting = threading.RLock() # Shared by every store: the database decides what is unused
+
+    def __init__(self, root=BLOBS_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._writing = {} # blob hash -> Lock, so a batch holding the same file twice encrypts it once
+        self._hashes = OrderedDict() # (path, mtime_ns, size, hash key) -> blob hash, least recently used first
+
+    def path(self, blob_hash): # Where the blob with this hash is stored
+        return os.path.join(self.root, blob_hash[:2], f"{blob_hash}.encrypted")
+
+    def content_hash(self, file_path): # Content hash of a source file, reusing it if the file is unchanged
+        info = os.stat(file_path)
+        memo = (os.path.abspath(file_path), info.st_mtime_ns, info.st_size, encryption_manager.key_material().hash_key)
+        with self._lock:
+            blob_hash = self._hashes.get(memo)
+            if blob_hash is not None:
+                self._hashes.move_to_end(memo)
+                return blob_hash
+        blob_hash = encryption_manager.hash_file(file_path)
+        with self._lock:
+            self._hashes[memo] = blob_hash
+            if len(self._hashes) > HASH_MEMO_SIZE:
+                self._hashes.popitem(last=False)
+        return blob_hash
+
+    def store(self, file_path): # Add a file; returns (blob_hash, created), created is False for a duplicate
+        blob_hash = self.content_hash(file_path)
+        with self._lock:
+            lock = self._writing.setdefault(blob_hash, threading.Lock())
+        try:
+            with lock:
+                target = self.path(blob_hash)
+                if os.path.exists(target):
+                    return blob_hash, False
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                encryption_manager.encrypt_file(file_path, target)
+                return blob_hash, True
+        finally:
+            with self._lock:
+                self._writing.pop(blob_hash, None)
+
+    def remove(self, blob_hash): # Delete a blob; returns the bytes freed
+        path = self.path(blob_hash)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        try:
+            os.rmdir(os.path.dirname(path)) # Only succeeds once the sub-folder is empty
+        except OSError:
+            pass
+        return size
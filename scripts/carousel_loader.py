@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPixmap
+from scripts.thumbnail_cache import thumbnail_cache
+from config import THUMBNAIL_SIZES, CAROUSEL_PREFETCH, CAROUSEL_CACHE_SIZE
+
+
+class LoaderSignals(QObject): # Carries a decoded image back to the GUI thread
+    finished = Signal(str, object, str) # image path, QImage (None if skipped), content hash
+
+
+class DecodeTask(QRunnable): # Loads one image's thumbnail (made if needed) on a worker thread
+    # If wanted(path) is False by the time the task starts, nothing is loaded and the image is None
+    def __init__(self, path, height, content_hash, thumbnails, signals, wanted=None):
+        super().__init__()
+        self.path = path
+        self.height = height
+        self.content_hash = content_hash
+        self.thumbnails = thumbnails
+        self.signals = signals
+        self.wanted = wanted
+
+    def run(self): # Called by QThreadPool on a worker thread
+        try:
+            if self.wanted is not None and not self.wanted(self.path):
+                content_hash, image = "", None
+            else:
+                content_hash = self.content_hash or self.thumbnails.content_hash(self.path)
+                image = self.thumbnails.image(self.path, self.height, content_hash)
+        except OSError: # File missing or unreadable: reported as a null image
+            content_hash, image = "", QImage()
+        try:
+            self.signals.finished.emit(self.path, image, content_hash)
+        except RuntimeError: # The page was closed while the image was loading
+            pass
+
+
+# CarouselLoader class feeding the property carousel without blocking Prev/Next
+# show(index) paints straight from a pixmap LRU when the image is there; otherwise its thumbnail is
+# loaded on a worker thread (ThumbnailCache: a small JPEG, or one scaled QImageReader decode the
+# first time) and loaded(path, pixmap) is emitted when it arrives. Every show() also queues the
+# CAROUSEL_PREFETCH images on each side, so stepping through a listing finds the next image ready.
+# The LRU holds CAROUSEL_CACHE_SIZE pixmaps shared by every carousel, so reopening a property is
+# instant too. hashed(path, content_hash, image_id) reports hashes worked out for images that had
+# none recorded, with the id given for the image in set_images() (None if there was none).
+
+class CarouselLoader(QObject):
+    loaded = Signal(str, QPixmap) # image path, pixmap (null if the image can't be read)
+    hashed = Signal(str, str, object) # image path, content hash computed while loading, image id or None
+    _pool = None # Worker threads shared by every carousel
+    _pixmaps = OrderedDict() # image path -> QPixmap, least recently used first (GUI thread only)
+
+    def __init__(self, height=THUMBNAIL_SIZES["carousel"], prefetch=CAROUSEL_PREFETCH,
+                 cache_size=CAROUSEL_CACHE_SIZE, thumbnails=None, parent=None):
+        super().__init__(parent)
+        self.height = height
+        self.prefetch = prefetch
+        self.cache_size = cache_size
+        self.thumbnails = thumbnails or thumbnail_cache()
+        self.paths = []
+        self.hashes = {} # image path -> content hash, where known
+        self.ids = {} # image path -> property_images row id, where known
+        self.current = None # Path of the image the carousel is waiting for
+        self._pending = set() # Paths queued or decoding
+        self.stats = {"hits": 0, "misses": 0, "prefetched": 0}
+
+        self.signals = LoaderSignals(self)
+        self.signals.finished.connect(self.handle_finished)
+
+    @classmethod
+    def pool(cls): # Lazily created thread pool for the decodes
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(2)
+        return cls._pool
+
+    def set_images(self, paths, hashes=None, ids=None): # New list of images (e.g. after the picker closes)
+        self.paths = list(paths)
+        self.hashes = dict(hashes or {})
+        self.ids = dict(ids or {})
+        self.current = None
+
+    def show(self, index): # Paint image index now if cached, else load it; prefetch its neighbours either way
+        if not self.paths:
+            return
+        path = self.paths[index % len(self.paths)]
+        self.current = path
+        pixmap = self.cached(path)
+        if pixmap is not None:
+            self.stats["hits"] += 1
+            self.loaded.emit(path, pixmap)
+        else:
+            self.stats["misses"] += 1
+            self.queue(path)
+        for step in range(1, self.prefetch + 1): # Next images first: Next is clicked more than Prev
+            for neighbour in (index + step, index - step):
+                self.queue(self.paths[neighbour % len(self.paths)], prefetch=True)
+
+    def cached(self, path): # Pixmap from the LRU, or None
+        pixmap = self._pixmaps.get(path)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(path)
+        return pixmap
+
+    def queue(self, path, prefetch=False): # Start loading path unless it is cached or already on its way
+        if path in self._pending or path in self._pixmaps:
+            return
+        self._pending.add(path)
+        if prefetch:
+            self.stats["prefetched"] += 1
+        task = DecodeTask(path, self.height, self.hashes.get(path), self.thumbnails, self.signals)
+        self.pool().start(task, 0 if prefetch else 1) # The image being waited for jumps the queue
+
+    def handle_finished(self, path, image, content_hash): # Runs on the GUI thread when a decode is done
+        self._pending.discard(path)
+        pixmap = QPixmap.fromImage(image) if image is not None and not image.isNull() else QPixmap()
+        if not pixmap.isNull():
+            self._pixmaps[path] = pixmap
+            self._pixmaps.move_to_end(path)
+            while len(self._pixmaps) > self.cache_size:
+                self._pixmaps.popitem(last=False)
+        if content_hash and path in self.paths and not self.hashes.get(path):
+            self.hashes[path] = content_hash
+            self.hashed.emit(path, content_hash, self.ids.get(path))
+        if path == self.current:
+            self.loaded.emit(path, pixmap)
@@ -2,6 +2,7 @@ from PySide6.QtWidgets import QWidget, QDialog, QVBoxLayout, QLabel, QHBoxLayout
 from PySide6.QtCore import Qt
 from scripts.maintenance_manager import MaintenanceManager
 from scripts.database_manager import DatabaseManager
+from scripts.dashboard_stats import DashboardStatsService
 from scripts.property_details_page import PropertyDetailsPage
 from scripts.tenant_details_page import TenantDetailsPage
 from scripts.payment_details_page import PaymentDetailsPage
@@ -9,6 +10,7 @@ from scripts.maintenance_details_page import MaintenanceDetailsPage
 from scripts.tenancy_manager import TenancyManager
 from scripts.property_manager import PropertyManager
 from scripts.tenant_manager import TenantManager
+from scripts.expiring_documents_dialog import ExpiringDocumentsDialog
 
 
 # DashboardPage is a QWidget subclass that represents the main dashboard of the application.
@@ -21,6 +23,7 @@ class DashboardPage(QWidget): # DashboardPage class inherits from QWidget
         super().__init__()
         self.setObjectName("DashboardPage")
         self.db = DatabaseManager() # Initialize the database manager
+        self.stats_service = DashboardStatsService(self.db) # Cards, alerts and insights in one query
         self.setup_ui() # Setup the UI components
 
     def apply_stylesheet(self, mode="light"): # Apply the stylesheet based on the mode (light or dark)
@@ -144,10 +147,7 @@ class DashboardPage(QWidget): # DashboardPage class inherits from QWidget
         sidebar_container.setFixedWidth(300)
         main_layout.addWidget(sidebar_container, 1)
 
-        self.load_data()
-        self.load_alerts()
-        self.load_insights()
-        self.load_activity_feed()
+        self.refresh_dashboard()
 
     def create_stat_card(self, label_text, count_label): # Create a statistics card
         button = QPushButton()
@@ -226,82 +226,42 @@ class DashboardPage(QWidget): # DashboardPage class inherits from QWidget
             self.tm_window.raise_()
             self.tm_window.resize(900, 600) # Resize the window
 
-    def load_data(self): # Load data from the database and update the statistics cards
-        # This method fetches data from the database and updates the statistics cards.
-        data_queries = {
-            # Query to get the total number of properties
-            "Total Properties": (
-                "SELECT COUNT(*) FROM properties", 
-                "🏘️ {}"),
-
-            # Query to get the total number of tenants
-            "Total Tenants": (
-                "SELECT COUNT(*) FROM tenants", 
-                "👥 {}"),
-
-            # Query to get the number of rent payments due in the next 30 days
-            # This is to be replaced with a rent calendar
-            "Rent Due (30d)": ("""
-                SELECT COUNT(*) FROM payments 
-                WHERE payment_type = 'rent' 
-                AND due_date BETWEEN DATE('now') AND DATE('now', '+30 day')""", 
-                "💸 {}"),
-
-            # Query to get the number of outstanding maintenance issues
-            # This counts issues that are not resolved or voided
-            "Outstanding Maintenance": (
-                "SELECT COUNT(*) FROM maintenance WHERE LOWER(status) NOT IN ('resolved', 'voided')",
-                "🔧 {}"),
-
-            # Query to get the number of vacant properties
-            # This counts properties that are not currently tenanted
-            # The subquery checks if the property is not in any active tenancies
-            "Vacant Properties": ("""
-                SELECT COUNT(*) FROM properties 
-                WHERE property_id NOT IN (
-                    SELECT property_id FROM tenancies 
-                    WHERE DATE('now') BETWEEN start_date AND end_date)""", 
-                    "📭 {}"),
-
-            # Query to get the number of tenancies ending in the next 30 days
-            # This counts tenancies that have an end date within the next 30 days
-            "Tenancies Ending Soon (30d)": ("""
-                SELECT COUNT(*) FROM tenancies 
-                WHERE end_date <= DATE('now', '+30 day')""", 
-                "⏳ {}"),
+    def refresh_dashboard(self): # Reload the cards, alerts, insights and activity feed
+        stats = self.stats_service.collect() # One query for everything except the feed
+        self.load_data(stats)
+        self.load_alerts(stats)
+        self.load_insights(stats)
+        self.load_activity_feed()
+
+    def load_data(self, stats=None): # Update the statistics cards
+        # stats is a DashboardStats snapshot; a fresh one is collected when it is not given.
+        stats = stats or self.stats_service.collect()
+        card_values = {
+            "Total Properties": ("🏘️ {}", stats.total_properties),
+            "Total Tenants": ("👥 {}", stats.total_tenants),
+            "Rent Due (30d)": ("💸 {}", stats.rent_due), # This is to be replaced with a rent calendar
+            "Outstanding Maintenance": ("🔧 {}", stats.outstanding_maintenance),
+            "Vacant Properties": ("📭 {}", stats.vacant_properties),
+            "Tenancies Ending Soon (30d)": ("⏳ {}", stats.ending_soon),
         }
 
-        for key, (query, template) in data_queries.items():
-            value = self.db.fetchval(query)
+        for key, (template, value) in card_values.items():
             self.cards[key].setText(template.format(value))
 
-    def load_alerts(self): # Load alerts and reminders from the database
-        # This method fetches alerts and reminders from the database and displays them.
+    def load_alerts(self, stats=None): # Show the alerts and reminders
+        # This method builds the alerts from a DashboardStats snapshot and displays them.
+        stats = stats or self.stats_service.collect()
         self.clear_layout(self.alerts_layout)
         alerts = []
 
-        overdue = self.db.fetchval("SELECT COUNT(*) FROM payments WHERE status = 'unpaid' AND due_date < DATE('now')")
-        if overdue: # Show the number of overdue payments
-            alerts.append(f"🔴 {overdue} overdue payment(s) need attention.")
-
-        expiring_docs = self.db.fetchval("""
-            SELECT COUNT(*) FROM (
-                SELECT expiry_date FROM tenant_documents
-                UNION ALL
-                SELECT expiry_date FROM landlord_documents
-                UNION ALL
-                SELECT expiry_date FROM property_documents
-                UNION ALL
-                SELECT expiry_date FROM tenancy_documents
-            ) WHERE expiry_date IS NOT NULL AND expiry_date <= DATE('now', '+30 day')
-        """)
+        if stats.overdue_payments: # Show the number of overdue payments
+            alerts.append(f"🔴 {stats.overdue_payments} overdue payment(s) need attention.")
 
-        if expiring_docs: # Show the number of expiring documents
-            alerts.append(f"📁 {expiring_docs} document(s) expiring in the next 30 days.")
+        if stats.expiring_documents: # Show the number of expiring documents, linked to the list of them
+            alerts.append(f'📁 <a href="expiring_documents">{stats.expiring_documents} document(s)</a> expiring in the next 30 days.')
 
-        open_issues = self.db.fetchval("SELECT COUNT(*) FROM maintenance WHERE LOWER(status) NOT IN ('resolved', 'closed')")
-        if open_issues: # Show the number of unresolved maintenance issues
-            alerts.append(f"🛠 {open_issues} unresolved maintenance issue(s).")
+        if stats.unresolved_maintenance: # Show the number of unresolved maintenance issues
+            alerts.append(f"🛠 {stats.unresolved_maintenance} unresolved maintenance issue(s).")
 
         if not alerts: # If there are no alerts, show a clear message
             label = QLabel("✅ All clear. No urgent issues.")
@@ -310,26 +270,24 @@ class DashboardPage(QWidget): # DashboardPage class inherits from QWidget
             for alert in alerts:
                 label = QLabel(alert)
                 label.setWordWrap(True)
+                label.linkActivated.connect(self.open_alert_link)
                 self.alerts_layout.addWidget(label)
 
-    def load_insights(self): # Load insights from the database
-        # This method fetches insights from the database and displays them.
+    def open_alert_link(self, link): # Drill down from an alert
+        if link == "expiring_documents":
+            ExpiringDocumentsDialog(parent=self).exec()
+
+    def load_insights(self, stats=None): # Show the tenancy insights
+        # This method builds the insights from a DashboardStats snapshot and displays them.
+        stats = stats or self.stats_service.collect()
         self.clear_layout(self.insights_layout)
         insights = []
 
-        ending_tenancies = self.db.fetchval("SELECT COUNT(*) FROM tenancies WHERE end_date <= DATE('now', '+30 day')")
-        if ending_tenancies: # Show the number of tenancies ending soon
-            insights.append(f"📅 {ending_tenancies} tenancy(ies) ending within 30 days.")
+        if stats.ending_soon: # Show the number of tenancies ending soon
+            insights.append(f"📅 {stats.ending_soon} tenancy(ies) ending within 30 days.")
 
-        vacant_properties = self.db.fetchval("""
-            SELECT COUNT(*) FROM properties p
-            WHERE NOT EXISTS (
-                SELECT 1 FROM tenancies t
-                WHERE t.property_id = p.property_id AND DATE('now') BETWEEN t.start_date AND t.end_date
-            )
-        """)
-        if vacant_properties: # Show the number of vacant properties
-            insights.append(f"🏠 {vacant_properties} property(ies) currently have no active tenancy.")
+        if stats.vacant_properties: # Show the number of vacant properties
+            insights.append(f"🏠 {stats.vacant_properties} property(ies) currently have no active tenancy.")
 
         if not insights: # If there are no insights, show a clear message
             label = QLabel("✅ No tenancy risks or gaps detected.")
@@ -361,31 +319,28 @@ class DashboardPage(QWidget): # DashboardPage class inherits from QWidget
     def showEvent(self, event): # Handle the show event of the widget
         # This method is called when the widget is shown.
         super().showEvent(event)
-        self.load_data() # Refresh the data when the widget is shown
-        self.load_alerts() # Refresh the alerts
-        self.load_insights() # Refresh the insights
-        self.load_activity_feed() # Refresh the activity feed
+        self.refresh_dashboard() # Refresh the cards, alerts, insights and activity feed
 
     def add_property(self): # Open the PropertyDetailsPage dialog to add a new property
         # This method opens a dialog to add a new property.
         dialog = PropertyDetailsPage()
         if dialog.exec() == QDialog.Accepted:
-            self.load_data()  # Refresh dashboard stats
+            self.refresh_dashboard()  # Refresh dashboard stats
 
     def add_tenant(self): # Open the TenantDetailsPage dialog to add a new tenant
         # This method opens a dialog to add a new tenant.
         dialog = TenantDetailsPage()
         if dialog.exec() == QDialog.Accepted:
-            self.load_data()
+            self.refresh_dashboard()
 
     def record_payment(self): # Open the PaymentDetailsPage dialog to record a payment
         # This method opens a dialog to record a payment.
         dialog = PaymentDetailsPage()
         if dialog.exec() == QDialog.Accepted:
-            self.load_data()
+            self.refresh_dashboard()
 
     def report_maintenance(self): # Open the MaintenanceDetailsPage dialog to report maintenance
         # This method opens a dialog to report maintenance.
         dialog = MaintenanceDetailsPage()
         if dialog.exec() == QDialog.Accepted:
-            self.load_data()
+            self.refresh_dashboard()
@@ -0,0 +1,128 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from scripts.database_manager import DatabaseManager
+from config import DEBUG_MODE
+
+# Every card, alert and insight on the dashboard in one statement
+# Each scalar subquery is served by an index from 0002_secondary_indexes (see
+# QUERY_PLAN_CHECKS). The two maintenance counts share one pass over the status index,
+# which groups the issues by status first so LOWER() runs once per status rather than
+# once per row. Columns come back in the order of the DashboardStats fields.
+DASHBOARD_STATS_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM properties) AS total_properties,
+        (SELECT COUNT(*) FROM tenants) AS total_tenants,
+        (SELECT COUNT(*) FROM payments
+         WHERE payment_type = 'rent'
+         AND due_date BETWEEN DATE('now') AND DATE('now', '+30 day')) AS rent_due,
+        maintenance_counts.outstanding AS outstanding_maintenance,
+        maintenance_counts.unresolved AS unresolved_maintenance,
+        (SELECT COUNT(*) FROM properties p
+         WHERE NOT EXISTS (
+            SELECT 1 FROM tenancies t
+            WHERE t.property_id = p.property_id AND DATE('now') BETWEEN t.start_date AND t.end_date
+         )) AS vacant_properties,
+        (SELECT COUNT(*) FROM tenancies WHERE end_date <= DATE('now', '+30 day')) AS ending_soon,
+        (SELECT COUNT(*) FROM payments WHERE status = 'unpaid' AND due_date < DATE('now')) AS overdue_payments,
+        (SELECT COUNT(*) FROM tenant_documents WHERE expiry_date <= DATE('now', '+30 day'))
+        + (SELECT COUNT(*) FROM landlord_documents WHERE expiry_date <= DATE('now', '+30 day'))
+        + (SELECT COUNT(*) FROM property_documents WHERE expiry_date <= DATE('now', '+30 day'))
+        + (SELECT COUNT(*) FROM tenancy_documents WHERE expiry_date <= DATE('now', '+30 day')) AS expiring_documents
+    FROM (
+        SELECT COALESCE(SUM(CASE WHEN LOWER(status) NOT IN ('resolved', 'voided') THEN issues END), 0) AS outstanding,
+               COALESCE(SUM(CASE WHEN LOWER(status) NOT IN ('resolved', 'closed') THEN issues END), 0) AS unresolved
+        FROM (SELECT status, COUNT(*) AS issues FROM maintenance GROUP BY status)
+    ) AS maintenance_counts
+"""
+
+# Counters kept in the dashboard_stats table (migration 0004_dashboard_stats), in DashboardStats order
+STAT_COLUMNS = [
+    "total_properties", "total_tenants", "rent_due", "outstanding_maintenance", "unresolved_maintenance",
+    "vacant_properties", "ending_soon", "overdue_payments", "expiring_documents",
+]
+
+# The stored counters, the date they were computed for, and whether that date is today
+STORED_STATS_QUERY = f"""
+    SELECT {", ".join(STAT_COLUMNS)}, computed_on, computed_on IS DATE('now')
+    FROM dashboard_stats WHERE id = 1
+"""
+
+# Daily roll-forward: recount everything for today and re-anchor the triggers on it
+RECOMPUTE_STATS = f"""
+    UPDATE dashboard_stats SET ({", ".join(STAT_COLUMNS)}, computed_on) =
+        (SELECT *, DATE('now') FROM ({DASHBOARD_STATS_QUERY}))
+    WHERE id = 1
+"""
+
+
+# DashboardStats class holding one snapshot of the dashboard figures
+# outstanding_maintenance feeds the card (anything not resolved or voided) and
+# unresolved_maintenance the alert (anything not resolved or closed).
+# elapsed_ms is how long the snapshot took to read, computed_on the date the counters
+# are correct for, and recomputed is True when this read had to recount the tables.
+
+@dataclass
+class DashboardStats:
+    total_properties: int = 0
+    total_tenants: int = 0
+    rent_due: int = 0
+    outstanding_maintenance: int = 0
+    unresolved_maintenance: int = 0
+    vacant_properties: int = 0
+    ending_soon: int = 0
+    overdue_payments: int = 0
+    expiring_documents: int = 0
+    elapsed_ms: float = 0.0
+    computed_on: str = None
+    recomputed: bool = False
+
+
+# DashboardStatsService class used by DashboardPage
+# collect() reads the dashboard_stats row, which the triggers from migration
+# 0004_dashboard_stats keep current, so its cost does not depend on the size of the
+# portfolio. The first read of each day recounts everything with DASHBOARD_STATS_QUERY
+# to roll the date-relative counters forward; if the table is missing the figures are
+# counted live instead. The time of every read is kept so slow dashboards show up: it
+# is printed in debug mode and summarised by stats(), the same way DebouncedSearch
+# reports search latency.
+
+class DashboardStatsService:
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager() # Anything with fetchall()/execute(), e.g. for benchmarks
+        self.latencies = deque(maxlen=100) # Recent collect() times (ms)
+
+    def collect(self): # Read every dashboard figure, recounting first if the stored row is stale
+        start = time.perf_counter()
+        rows = self.db.fetchall(STORED_STATS_QUERY)
+        recomputed = False
+        if rows and (not rows[0][-1] or None in rows[0][:len(STAT_COLUMNS)]): # Anchored on an earlier day
+            self.db.execute(RECOMPUTE_STATS)
+            rows = self.db.fetchall(STORED_STATS_QUERY)
+            recomputed = True
+
+        if rows:
+            *counts, computed_on, _ = rows[0]
+        else: # No summary table (or the read failed): count the tables directly
+            live = self.db.fetchall(DASHBOARD_STATS_QUERY)
+            counts, computed_on, recomputed = (list(live[0]) if live else []), None, True
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        stats = DashboardStats(*[value or 0 for value in counts], elapsed_ms=elapsed_ms,
+                               computed_on=computed_on, recomputed=recomputed)
+        self.latencies.append(elapsed_ms)
+        if DEBUG_MODE:
+            action = "recomputed" if recomputed else "read"
+            print(f"[Dashboard] Statistics {action} in {elapsed_ms:.1f} ms")
+        return stats
+
+    def stats(self): # Summary of recent collect() times
+        values = sorted(self.latencies)
+        if not values:
+            return {"runs": 0}
+        return {
+            "runs": len(values),
+            "last_ms": self.latencies[-1],
+            "p50_ms": values[len(values) // 2],
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+        }
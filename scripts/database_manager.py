@@ -1,13 +1,151 @@
 import sqlite3
 import os
+import time
+import atexit
+import threading
 from contextlib import contextmanager
-from config import DB_PATH
+from config import DB_PATH, DB_POOL_SIZE, DB_HEALTH_CHECK_INTERVAL, DB_PRAGMAS
+from scripts.migration_manager import MigrationManager
+
+def apply_pragmas(conn, pragmas=DB_PRAGMAS): # Apply a PRAGMA profile to an open connection
+    conn.execute("PRAGMA foreign_keys = ON;") # Enable foreign key constraints
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value};")
+    return conn
+
+def read_pragmas(conn, pragmas=DB_PRAGMAS): # Read back the PRAGMA values actually in effect
+    in_effect = {"foreign_keys": conn.execute("PRAGMA foreign_keys;").fetchone()[0]}
+    for name in pragmas:
+        row = conn.execute(f"PRAGMA {name};").fetchone()
+        in_effect[name] = row[0] if row else None
+    return in_effect
+
+# ConnectionPool class to keep long-lived SQLite connections
+# Each thread gets its own connection, which is opened on first use and then reused
+# for every query that thread runs. Up to pool_size connections are kept alive; any
+# extra threads get a short-lived connection that is closed straight after use.
+# Idle connections are health-checked before they are handed out again, and
+# connections owned by threads that have finished are closed and reclaimed.
+
+class ConnectionPool:
+    def __init__(self, db_path, pool_size=DB_POOL_SIZE, health_check_interval=DB_HEALTH_CHECK_INTERVAL, pragmas=DB_PRAGMAS):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.health_check_interval = health_check_interval
+        self.pragmas = pragmas # PRAGMA profile applied to every new connection
+
+        self._local = threading.local() # Per-thread connection slot
+        self._lock = threading.Lock() # Guards the registry of pooled connections
+        self._connections = {} # Thread ident -> (thread, connection)
+        self._generation = 0 # Bumped by close_all() so stale thread slots are reopened
+
+        # Counters used by the benchmark and for debugging
+        self.stats = {"opened": 0, "reused": 0, "overflow": 0, "recycled": 0}
+
+    def _open(self): # Open a new connection with the standard settings
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=10,                 # Increase timeout to handle locked DB
+            check_same_thread=False     # For multithreaded PySide6 apps
+        )
+        apply_pragmas(conn, self.pragmas) # Foreign keys plus the configured PRAGMA profile
+        self.stats["opened"] += 1
+        return conn
+
+    def _is_healthy(self, conn): # Check that a connection can still run a query
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _prune_dead_threads(self): # Close connections owned by threads that have finished
+        # Must be called with self._lock held
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                conn.close()
+                del self._connections[ident]
+                self.stats["recycled"] += 1
+
+    def _drop_local(self): # Forget (and close) the connection held by the current thread
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is None:
+            return
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self): # Return (connection, pooled) for the current thread
+        conn = getattr(self._local, "conn", None)
+
+        if conn is not None:
+            if self._local.generation != self._generation: # The pool was shut down since
+                self._local.conn = None
+                conn = None
+            elif time.monotonic() - self._local.last_used > self.health_check_interval:
+                if not self._is_healthy(conn): # Stale or broken connection, replace it
+                    self._drop_local()
+                    conn = None
+
+        if conn is not None:
+            self.stats["reused"] += 1
+            return conn, True
+
+        with self._lock:
+            self._prune_dead_threads()
+            if len(self._connections) >= self.pool_size: # Pool is full, hand out a throwaway connection
+                self.stats["overflow"] += 1
+                return self._open(), False
+
+            conn = self._open()
+            self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+
+        self._local.conn = conn
+        self._local.generation = self._generation
+        self._local.last_used = time.monotonic()
+        return conn, True
+
+    def release(self, conn, pooled): # Give a connection back after use
+        if pooled:
+            self._local.last_used = time.monotonic()
+        else:
+            conn.close() # Overflow connections are not kept
+
+    def discard(self, conn, pooled): # Throw away a connection that raised an unrecoverable error
+        if pooled:
+            self._drop_local()
+        else:
+            conn.close()
+
+    def close_all(self): # Close every pooled connection (used at app exit)
+        with self._lock:
+            for thread, conn in self._connections.values():
+                try:
+                    if str(self.pragmas.get("journal_mode", "")).lower() == "wal":
+                        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);") # Fold the WAL back into the main file
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+            self._generation += 1
+
+    def size(self): # Number of live pooled connections
+        with self._lock:
+            return len(self._connections)
+
 
 # DatabaseManager class to manage SQLite database connections and queries
 # Singleton pattern to ensure only one instance of DatabaseManager exists
 # This class handles the connection to the SQLite database, executes queries,
-# and manages transactions. It also provides a context manager for cursor management, 
-# ensuring that connections are properly closed after use.
+# and manages transactions. Connections come from a ConnectionPool, so every
+# cursor(), execute(), fetchval() and fetchall() call on a thread reuses the same
+# long-lived connection instead of opening a new one. The pool is closed at app exit.
+# Every connection gets the PRAGMA profile from config.DB_PRAGMAS (WAL by default),
+# and the mode in effect is checked and reported once at startup.
 
 class DatabaseManager:
     _instance = None
@@ -25,40 +163,87 @@ class DatabaseManager:
         if not hasattr(self, '_logged'):
             print(f"[DB] Connecting to: {self.db_path}")
             self._logged = True
-        
 
-    def connect(self): # This method is called to connect to the database
-        conn = sqlite3.connect(
-            self.db_path,
-            timeout=10,                 # Increase timeout to handle locked DB
-            check_same_thread=False     # For multithreaded PySide6 apps
-        )
-        conn.execute("PRAGMA foreign_keys = ON;") # Enable foreign key constraints
-        return conn
+        self.pool = ConnectionPool(self.db_path) # Long-lived per-thread connections
+        self._local = threading.local() # Tracks nested cursor() blocks per thread
+        atexit.register(self.close) # Close pooled connections cleanly at app exit
+        self.check_pragmas() # Report the journal mode and PRAGMA profile in effect
+        self.migrate() # Bring existing databases up to the latest schema version
+
+    def migrate(self): # Apply any pending schema migrations (indexes, columns, triggers...)
+        conn = self.connect() # Dedicated connection so the migrations own their transactions
+        try:
+            MigrationManager(conn).apply()
+        finally:
+            conn.close()
+
+    def check_pragmas(self): # Startup check: compare the PRAGMAs in effect with the configured profile
+        conn, pooled = self.pool.acquire()
+        try:
+            in_effect = read_pragmas(conn, self.pool.pragmas)
+        finally:
+            self.pool.release(conn, pooled)
+
+        print("[DB] PRAGMA profile: " + ", ".join(f"{k}={v}" for k, v in in_effect.items()))
+
+        # A few PRAGMAs report back in a different form (e.g. synchronous=1), so only
+        # the journal mode is compared; WAL can silently fall back on some file systems
+        wanted = str(self.pool.pragmas.get("journal_mode", "")).lower()
+        if wanted and str(in_effect.get("journal_mode", "")).lower() != wanted:
+            print(f"[DB] WARNING: journal_mode is {in_effect.get('journal_mode')}, expected {wanted}")
+        return in_effect
+
+    def connect(self): # This method is called to open a standalone connection to the database
+        # Callers that use this own the connection and must close it themselves
+        return self.pool._open()
 
     @contextmanager # Context manager for handling database connections
     def cursor(self): # This method is called to create a cursor for executing queries
-        conn = self.connect()
+        # Nested cursor() blocks on the same thread share the outermost block's connection
+        # (pooled or overflow), so only the outermost block commits and gives it back
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            conn, pooled = self._local.conn
+        else:
+            conn, pooled = self.pool.acquire()
+            self._local.conn = (conn, pooled)
         cur = conn.cursor()
+        self._local.depth = depth + 1
 
         try: # This method is called to execute a query
-            yield cur # Yield the cursor to the caller. 
+            yield cur # Yield the cursor to the caller.
             # Yield means that the function will return the cursor and pause execution until the caller is done with it.
-            conn.commit()
+            if depth == 0:
+                conn.commit()
 
         except sqlite3.OperationalError as e: # Handle database locked error
-            conn.rollback() # Rollback the transaction on error
+            conn = self._rollback(conn, pooled)
             print(f"Database locked error: {e}")
             raise # Re-raise the exception to be handled by the caller
 
         except Exception as e: # Handle other database errors
-            conn.rollback() # Rollback the transaction on error
+            conn = self._rollback(conn, pooled)
             print(f"Database error: {e}")
             raise # Re-raise the exception to be handled by the caller
 
-        finally: # This method is called to close the cursor and connection
-            cur.close()
-            conn.close()  # Always close the connection after operation
+        finally: # This method is called to close the cursor and give the connection back to the pool
+            self._local.depth = depth
+            try:
+                cur.close()
+            except sqlite3.Error: # Already closed with a discarded connection
+                pass
+            if depth == 0:
+                self._local.conn = None
+                if conn is not None:
+                    self.pool.release(conn, pooled)
+
+    def _rollback(self, conn, pooled): # Roll back after an error; returns None if the connection was broken and discarded
+        try:
+            conn.rollback() # Rollback the transaction on error
+            return conn
+        except sqlite3.Error: # The connection itself is broken, don't reuse it
+            self.pool.discard(conn, pooled)
+            return None
 
     def execute(self, query, params=(), fetchone=False, fetchall=False, commit=False): # Execute a query on the database
         with self.cursor() as cur:
@@ -68,27 +253,40 @@ class DatabaseManager:
                 result = cur.fetchone()
                 print(f"Fetchone result: {result}") # Print the result of the fetchone operation
                 return result
-            
+
             if fetchall: # Fetch all results from the database
                 result = cur.fetchall()
                 print(f"Fetchall result: {result}") # Print the result of the fetchall operation
                 return result
             return None
-    
+
     def fetchval(self, query, params=None): # Fetch a value from the database
         with self.cursor() as cur:
             cur.execute(query, params or ())
             result = cur.fetchone()
             return result[0] if result else None
-        
+
     def fetchall(self, query, params=None): # Fetch all values from the database
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cur = conn.cursor()
+            with self.cursor() as cur:
                 cur.execute(query, params or ())
                 return cur.fetchall()
         except sqlite3.Error as e: # Handle database errors
             print("Database fetchall error:", e)
             return []
 
+    def backup(self, dest_path): # Copy the live database (including any WAL content) to dest_path
+        # A plain file copy would miss changes still sitting in the -wal file
+        conn, pooled = self.pool.acquire()
+        try:
+            dest = sqlite3.connect(dest_path)
+            try:
+                with dest:
+                    conn.backup(dest)
+            finally: # Don't leave a handle open on a half-written backup
+                dest.close()
+        finally:
+            self.pool.release(conn, pooled)
 
+    def close(self): # Close all pooled connections (called at app exit)
+        self.pool.close_all()
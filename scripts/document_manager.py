@@ -2,23 +2,103 @@ import os
 import shutil
 import datetime
 import tempfile
+import threading
 import webbrowser
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from scripts import encryption_manager
 from scripts.encryption_manager import encrypt_file
 from scripts.database_manager import DatabaseManager
-from config import STORAGE_PATHS, TEMP_PREVIEW_DIR
+from scripts.blob_store import BlobStore
+from scripts.utils.file_utils import entity_folder_name
+from config import STORAGE_PATHS, TEMP_PREVIEW_DIR, UPLOAD_WORKERS, DOCUMENT_CACHE_MB, DEDUPLICATE_DOCUMENTS, DEBUG_MODE
 
 TEMP_FILES_TO_CLEAN = [] # List to keep track of temporary files created during the process
 # This will be used to clean up temporary files after the process is done
 
+# DecryptedDocumentCache class keeping recently opened documents in memory
+# An LRU cache of decrypted bytes held to a byte budget: the least recently used documents
+# are evicted once the total would go over max_bytes, and a single document larger than the
+# budget is never cached. Entries are keyed by the encrypted file's path and checked against
+# its modification time and size, so a replaced file is decrypted again rather than served stale.
+# Shared by every DocumentManager and safe to use from worker threads.
+
+class DecryptedDocumentCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # path -> (stamp, data), least recently used first
+        self._lock = threading.Lock()
+        self.size = 0 # Bytes currently held
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "too_large": 0}
+
+    @staticmethod
+    def stamp(path): # Modification time and size identifying one version of a file
+        info = os.stat(path)
+        return (info.st_mtime_ns, info.st_size)
+
+    def get(self, path, stamp): # Cached bytes for this version of path, or None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                self.stats["hits"] += 1
+                return entry[1]
+            if entry is not None: # The file has changed since it was cached
+                self._remove(path)
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, path, stamp, data): # Cache data, evicting the least recently used documents to make room
+        if len(data) > self.max_bytes:
+            self.stats["too_large"] += 1
+            return
+        with self._lock:
+            self._remove(path)
+            self._entries[path] = (stamp, data)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.stats["evictions"] += 1
+
+    def discard(self, path): # Forget a document (e.g. when it is deleted)
+        with self._lock:
+            self._remove(path)
+
+    def _remove(self, path): # Drop an entry; the caller holds the lock
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def clear(self): # Drop every decrypted document (logout, app exit)
+        with self._lock:
+            if DEBUG_MODE and (self._entries or self.stats["hits"] or self.stats["misses"]):
+                print(f"[Cache] Clearing {len(self._entries)} document(s), {self.size / 1048576:.1f} MB; {self.summary()}")
+            self._entries.clear()
+            self.size = 0
+
+    def summary(self): # Stats for debugging: hits, misses, evictions and current usage
+        return {**self.stats, "documents": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes}
+
 # DocumentManager class to manage document storage, encryption, and database interactions
 # This class handles the upload, retrieval, and deletion of documents for different entities
 # (tenants, landlords, properties, tenancies) in the database.
 # It also manages the encryption and decryption of files, ensuring that sensitive information is stored securely.
+# With DEDUPLICATE_DOCUMENTS on, new uploads go to the shared BlobStore and the document row records
+# the blob's hash; rows without one are read from the entity folder recorded in their folder_path.
+# Folder names and resolved file paths are cached for every instance, so opening a document that
+# has been listed needs no database round trip. A document's location never changes once stored;
+# folder names do, so the pages that rename an entity call invalidate_folder_name().
 
 class DocumentManager:
-    def __init__(self):
+    cache = DecryptedDocumentCache(DOCUMENT_CACHE_MB * 1024 * 1024) # Shared by every instance
+    folder_names = {} # (entity_type, entity_id) -> folder name
+    document_paths = {} # (entity_type, entity_id, filename) -> encrypted file path
+
+    def __init__(self, deduplicate=DEDUPLICATE_DOCUMENTS):
         self.db = DatabaseManager()
+        self.blobs = BlobStore()
+        self.deduplicate = deduplicate
 
         # Define the mapping of entity types to their respective database tables and folder names
         # This mapping is used to determine how to store and retrieve documents for each entity type
@@ -50,15 +130,34 @@ class DocumentManager:
         }
 
     # Define the mapping of entity types to their respective storage paths
+    # Paths of listed or opened documents come from the cache; others are looked up once
     def _get_encrypted_path(self, entity_type: str, entity_id: int, filename: str) -> str:
-        # Build the folder name (e.g. "4_PropertyName")
-        folder_name = self.get_folder_name(entity_type, entity_id)
+        key = (entity_type, int(entity_id), filename)
+        path = self.document_paths.get(key)
+        if path is None:
+            blob_hash, folder_path = self.get_storage(entity_type, entity_id, filename)
+            path = self.resolve_path(entity_type, entity_id, filename, blob_hash, folder_path)
+        return path
 
-        # Get the base storage folder from your config
-        base_dir = STORAGE_PATHS[entity_type]
+    # Work out (and cache) where a document's encrypted file is from its row's blob_hash and folder_path
+    def resolve_path(self, entity_type, entity_id, filename, blob_hash, folder_path):
+        if blob_hash: # Deduplicated documents live in the blob store under their content hash
+            path = self.blobs.path(blob_hash)
+        else: # Older rows without a folder_path are in the folder named after the entity (e.g. "4_PropertyName")
+            folder_name = folder_path or self.get_folder_name(entity_type, entity_id)
+            path = os.path.join(STORAGE_PATHS[entity_type], folder_name, filename)
+        if blob_hash or folder_path: # Only stored locations are final
+            self.document_paths[(entity_type, int(entity_id), filename)] = path
+        return path
 
-        # Return the full path to the .encrypted file
-        return os.path.join(base_dir, folder_name, filename)
+    # Look up where a document is stored: (blob_hash, folder_path), either may be None
+    def get_storage(self, entity_type, entity_id, filename):
+        config = self.table_map[entity_type]
+        rows = self.db.fetchall(
+            f"SELECT blob_hash, folder_path FROM {config['table']} WHERE {config['id_field']} = ? AND file_path = ?",
+            (entity_id, filename)
+        )
+        return rows[0] if rows else (None, None)
 
     # Ensure the entity folders exist in the storage path
     # This method creates the necessary folders for storing documents based on the entity type
@@ -70,52 +169,154 @@ class DocumentManager:
 
     # Get the folder name for the entity based on its type and ID
     # This method retrieves the folder name from the database based on the entity type and ID
+    # The name is cached until invalidate_folder_name() is called for the entity
     def get_folder_name(self, entity_type, entity_id):
-        with self.db.cursor() as cur:
+        key = (entity_type, int(entity_id))
+        folder_name = self.folder_names.get(key)
+        if folder_name is None:
             config = self.table_map[entity_type]
             query = f"SELECT {config['folder_name_sql']} AS name FROM {config.get('name_table', config['table'])} WHERE {config['id_field']} = ?"
-            cur.execute(query, (entity_id,))
-            result = cur.fetchone()
-            if result and result[0]:
-                name = result[0]
-                sanitized = "_".join(name.split())  # Replaces spaces with _
-                sanitized = "".join(c if c.isalnum() or c == "_" else "" for c in sanitized)
-                return f"{entity_id}_{sanitized}"
-        return str(entity_id)
+            rows = self.db.fetchall(query, (entity_id,))
+            folder_name = entity_folder_name(entity_id, rows[0][0] if rows else None)
+            self.folder_names[key] = folder_name
+        return folder_name
+
+    # Forget cached folder names after an entity's name or address changes
+    # Without entity_id every entity of the type is forgotten (e.g. all tenancies when a property's address changes)
+    @classmethod
+    def invalidate_folder_name(cls, entity_type, entity_id=None):
+        for key in [key for key in cls.folder_names if key[0] == entity_type and entity_id in (None, key[1])]:
+            cls.folder_names.pop(key, None)
 
     # Upload a document for a specific entity type and ID
     # This method handles the encryption of the document and stores it in the appropriate folder
     def upload_document(self, entity_type, entity_id, doc_name, doc_type, expiry_date, file_path):
+        result = self.upload_documents(entity_type, entity_id, [{
+            "file_path": file_path, "doc_name": doc_name, "doc_type": doc_type, "expiry_date": expiry_date
+        }])[0]
+        return result["ok"]
+
+    # Upload many documents for one entity in a single batch
+    # files is a list of dicts with file_path, doc_name, doc_type and expiry_date.
+    # The folder name is looked up once, the files are encrypted in parallel on a thread pool,
+    # and every metadata row and activity-log row is written in one transaction.
+    # progress(done, total, file_path, ok) is called as each file finishes encrypting, and
+    # cancelled() is checked before each file starts; files not started are skipped.
+    # Returns one dict per file (same order) with file_path, ok, error and encrypted_filename.
+    # When deduplicating, each file is hashed first and only encrypted if the blob store does not
+    # already hold it; blob_hash and duplicate (True when an existing blob was reused) are added.
+    def upload_documents(self, entity_type, entity_id, files, progress=None, cancelled=None, workers=UPLOAD_WORKERS):
+        results = [{"file_path": f["file_path"], "ok": False, "error": None, "encrypted_filename": None,
+                    "blob_hash": None, "duplicate": False} for f in files]
         try:
             config = self.table_map[entity_type]
 
             folder_name = self.get_folder_name(entity_type, entity_id)
             print("🔍 Folder Name:", folder_name)
 
-            storage_path = self.ensure_entity_folders_exist(entity_type, folder_name)
-            print("📂 Storage Path:", storage_path)
+            if self.deduplicate: # The file name only labels the record, the content goes to the blob store
+                storage_path = os.path.join(STORAGE_PATHS[entity_type], folder_name)
+                used = {row[0] for row in self.db.fetchall(
+                    f"SELECT file_path FROM {config['table']} WHERE {config['id_field']} = ?", (entity_id,))}
+            else:
+                storage_path = self.ensure_entity_folders_exist(entity_type, folder_name)
+                print("📂 Storage Path:", storage_path)
+                used = set()
+            if os.path.isdir(storage_path):
+                used.update(os.listdir(storage_path))
 
-            filename = os.path.basename(file_path)
-            encrypted_filename = f"{int(os.path.getmtime(file_path))}_{filename}.encrypted"
+            # Pick every target name up front so files with the same name and mtime can't collide
+            for result in results:
+                result["encrypted_filename"] = self.unique_encrypted_filename(result["file_path"], used)
 
-            full_path = os.path.join(storage_path, encrypted_filename)
-            print("🔐 Full Path to Encrypt To:", full_path)
+            def encrypt(result): # Runs on a pool thread
+                if cancelled and cancelled():
+                    raise InterruptedError("Upload cancelled")
+                if self.deduplicate:
+                    result["blob_hash"], created = self.blobs.store(result["file_path"])
+                    result["duplicate"] = not created
+                    return
+                full_path = os.path.join(storage_path, result["encrypted_filename"])
+                print("🔐 Full Path to Encrypt To:", full_path)
+                encrypt_file(result["file_path"], full_path)
 
-            encrypt_file(file_path, full_path)
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files)))) as pool:
+                futures = {pool.submit(encrypt, result): result for result in results}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    result = futures[future]
+                    error = future.exception()
+                    result["ok"], result["error"] = error is None, (str(error) if error else None)
+                    if error and not isinstance(error, InterruptedError):
+                        print(f"[ERROR] Encrypting {result['file_path']} failed:", error)
+                    if progress:
+                        progress(done, len(files), result["file_path"], result["ok"])
 
-            with self.db.cursor() as cur:
-                cur.execute(f"""
-                    INSERT INTO {config['table']}
-                    ({config['id_field']}, doc_name, doc_type, file_path, expiry_date)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (entity_id, doc_name, doc_type, encrypted_filename, expiry_date))
+            encrypted = [(f, r) for f, r in zip(files, results) if r["ok"]]
+            if not encrypted:
+                return results
 
-            self.log_activity("Document Upload", f"{doc_name} uploaded for {entity_type} {entity_id}")
-            return True
+            try: # All rows in one transaction: either every encrypted file is recorded or none is
+                with self.blobs.collecting, self.db.cursor() as cur:
+                    if self.deduplicate: # The triggers from migration 0005 count the references
+                        for _, r in encrypted: # A reused blob may have been collected since it was stored
+                            if not os.path.exists(self.blobs.path(r["blob_hash"])):
+                                r["blob_hash"], created = self.blobs.store(r["file_path"])
+                                r["duplicate"] = r["duplicate"] and not created
+                        cur.executemany("""
+                            INSERT OR IGNORE INTO document_blobs (blob_hash, size, created_at)
+                            VALUES (?, ?, ?)
+                        """, [(r["blob_hash"], os.path.getsize(self.blobs.path(r["blob_hash"])),
+                               datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")) for _, r in encrypted])
+                    folder_path = None if self.deduplicate else folder_name
+                    cur.executemany(f"""
+                        INSERT INTO {config['table']}
+                        ({config['id_field']}, doc_name, doc_type, file_path, expiry_date, blob_hash, folder_path)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, [(entity_id, f["doc_name"], f["doc_type"], r["encrypted_filename"], f.get("expiry_date"),
+                           r["blob_hash"], folder_path) for f, r in encrypted])
+                    cur.executemany(self.ACTIVITY_LOG_INSERT, [
+                        self.activity_row("Document Upload", f"{f['doc_name']} uploaded for {entity_type} {entity_id}")
+                        for f, _ in encrypted
+                    ])
+            except Exception as e: # Don't leave encrypted files behind with no record pointing at them
+                for _, r in encrypted:
+                    if r["blob_hash"]: # Blobs that were already stored belong to other documents
+                        if not r["duplicate"]:
+                            self.blobs.remove(r["blob_hash"])
+                    else:
+                        path = os.path.join(storage_path, r["encrypted_filename"])
+                        if os.path.exists(path):
+                            os.remove(path)
+                    r["ok"], r["error"] = False, f"Database error: {e}"
+                raise
+
+            for _, r in encrypted:
+                self.resolve_path(entity_type, entity_id, r["encrypted_filename"], r["blob_hash"], folder_path)
+            print(f"[INFO] Activity logged: Document Upload - {len(encrypted)} document(s) for {entity_type} {entity_id}")
+            if self.deduplicate:
+                duplicates = sum(r["duplicate"] for _, r in encrypted)
+                print(f"[INFO] Blob store: {len(encrypted) - duplicates} new blob(s), {duplicates} duplicate(s) reused")
+            return results
 
         except Exception as e: # Handle any exceptions that occur during the upload process
             print("[ERROR] Upload failed:", e)
-            return False
+            for result in results:
+                if result["ok"] is False and result["error"] is None:
+                    result["error"] = str(e)
+            return results
+
+    # Build an encrypted file name that is not in used (and add it to used)
+    @staticmethod
+    def unique_encrypted_filename(file_path, used):
+        filename = os.path.basename(file_path)
+        stamp = int(os.path.getmtime(file_path))
+        candidate = f"{stamp}_{filename}.encrypted"
+        counter = 1
+        while candidate in used:
+            counter += 1
+            candidate = f"{stamp}_{counter}_{filename}.encrypted"
+        used.add(candidate)
+        return candidate
 
     # Retrieve a document for a specific entity type and ID
     # This method retrieves the document from the storage path and returns its details
@@ -124,20 +325,24 @@ class DocumentManager:
             config = self.table_map[entity_type]
             with self.db.cursor() as cur:
                 cur.execute(f"""
-                    SELECT doc_id, doc_name, doc_type, file_path, expiry_date
+                    SELECT doc_id, doc_name, doc_type, file_path, expiry_date, blob_hash, folder_path
                     FROM {config['table']}
                     WHERE {config['id_field']} = ?
                 """, (entity_id,))
-                return [
-                    {
-                        "id": row[0],
-                        "name": row[1],
-                        "type": row[2],
-                        "filename": row[3],
-                        "expiry": row[4]
-                    }
-                    for row in cur.fetchall()
-                ]
+                rows = cur.fetchall()
+
+            for row in rows: # Remember where each file is, so opening it needs no further queries
+                self.resolve_path(entity_type, entity_id, row[3], row[5], row[6])
+            return [
+                {
+                    "id": row[0],
+                    "name": row[1],
+                    "type": row[2],
+                    "filename": row[3],
+                    "expiry": row[4]
+                }
+                for row in rows
+            ]
 
         except Exception as e: # Handle any exceptions that occur during the retrieval process
             print("[ERROR] Get documents failed:", e)
@@ -145,20 +350,25 @@ class DocumentManager:
 
     # Delete a document for a specific entity type and ID
     # This method removes the document from the storage path and deletes its record from the database
+    # A deduplicated document only drops its reference; the blob goes once nothing else uses it
     def delete_document(self, entity_type, entity_id, filename):
         try:
             config = self.table_map[entity_type]
-            folder_name = self.get_folder_name(entity_type, entity_id)
-            path = os.path.join(STORAGE_PATHS[entity_type], folder_name, filename)
-
-            if os.path.exists(path):
-                os.remove(path)
+            blob_hash, folder_path = self.get_storage(entity_type, entity_id, filename)
+            path = self.resolve_path(entity_type, entity_id, filename, blob_hash, folder_path)
+            self.document_paths.pop((entity_type, int(entity_id), filename), None)
+            if not blob_hash:
+                if os.path.exists(path):
+                    os.remove(path)
+                self.cache.discard(path)
 
             with self.db.cursor() as cur:
                 cur.execute(f"""
                     DELETE FROM {config['table']}
                     WHERE {config['id_field']} = ? AND file_path = ?
                 """, (entity_id, filename))
+            if blob_hash:
+                self.collect_blob_garbage()
 
             self.log_activity(
                 "Document Delete",
@@ -170,9 +380,29 @@ class DocumentManager:
             print("[ERROR] Delete failed:", e)
             return False
 
+    # Decrypt a document into memory
+    # This method returns the decrypted bytes without writing any plaintext to disk
+    # It is used by the in-app previews (see scripts/utils/document_preview.py)
+    # Documents opened again in the same session come straight from the cache
+    def decrypt_document_bytes(self, entity_type: str, entity_id: int, filename: str) -> bytes | None:
+        try:
+            encrypted_path = self._get_encrypted_path(entity_type, entity_id, filename)
+            if not os.path.exists(encrypted_path):
+                print(f"[ERROR] Encrypted file not found: {encrypted_path}")
+                return None
+            stamp = self.cache.stamp(encrypted_path)
+            data = self.cache.get(encrypted_path, stamp)
+            if data is None:
+                data = encryption_manager.decrypt_to_bytes(encrypted_path)
+                self.cache.put(encrypted_path, stamp, data)
+            return data
+        except Exception as e:
+            print("[ERROR] Decrypt failed:", e)
+            return None
+
     # Decrypt a document to a temporary location
     # This method decrypts the document and returns the path to the decrypted file
-    # This is useful for previewing the document without permanently storing it in the local file system
+    # Only needed for formats opened in an external viewer (e.g. PDFs); the file is removed at app exit
     def decrypt_document_to_temp(self, entity_type: str, entity_id: int, filename: str) -> str | None:
         try:
             # Build the path to the .encrypted file
@@ -192,21 +422,50 @@ class DocumentManager:
 
             # Perform decryption
             encryption_manager.decrypt_file(encrypted_path, target)
+            if target not in TEMP_FILES_TO_CLEAN:
+                TEMP_FILES_TO_CLEAN.append(target)
 
             return target
         except Exception as e:
             print("[ERROR] Decrypt failed:", e)
             return None
 
-    # Log activity in the database
-    # This method records the actions performed by the user in the activity logs
-    def log_activity(self, action, details):
+    # Remove every blob no document uses any more
+    # Also picks up blobs left unused when an entity's documents were removed by a cascade
+    # Returns (blobs removed, bytes freed)
+    def collect_blob_garbage(self):
+        with self.blobs.collecting: # Uploads wait, so none can reuse a blob that is being removed
+            with self.db.cursor() as cur:
+                cur.execute("DELETE FROM document_blobs WHERE ref_count <= 0 RETURNING blob_hash")
+                unused = [row[0] for row in cur.fetchall()]
+
+            freed = 0
+            for blob_hash in unused: # Only after the rows are gone, so no document can point at a missing blob
+                self.cache.discard(self.blobs.path(blob_hash))
+                freed += self.blobs.remove(blob_hash)
+        if unused:
+            print(f"[INFO] Blob store: removed {len(unused)} unused blob(s), {freed / 1048576:.1f} MB freed")
+        return len(unused), freed
+
+    # Clear the decrypted-document cache
+    # Called on logout and when the app quits so no plaintext outlives the session
+    @classmethod
+    def clear_cache(cls):
+        cls.cache.clear()
+
+    ACTIVITY_LOG_INSERT = """
+        INSERT INTO activity_logs (user, action, details, timestamp)
+        VALUES (?, ?, ?, ?)
+    """
+
+    # Build the activity_logs row for an action
+    def activity_row(self, action, details):
         user = "admin"  # Replace with session user if available
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return (user, action, details, timestamp)
 
-        query = """
-            INSERT INTO activity_logs (user, action, details, timestamp)
-            VALUES (?, ?, ?, ?)
-        """
-        self.db.execute(query, (user, action, details, timestamp))
+    # Log activity in the database
+    # This method records the actions performed by the user in the activity logs
+    def log_activity(self, action, details):
+        self.db.execute(self.ACTIVITY_LOG_INSERT, self.activity_row(action, details))
         print(f"[INFO] Activity logged: {action} - {details}")
\ No newline at end of file
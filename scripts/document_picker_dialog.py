@@ -1,18 +1,47 @@
 import os
+import threading
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton,
-    QFileDialog, QComboBox, QDateEdit, QMessageBox
+    QFileDialog, QComboBox, QDateEdit, QMessageBox, QProgressDialog
 )
-from PySide6.QtCore import QDate
+from PySide6.QtCore import QDate, QThread, Qt, Signal
 from scripts.document_manager import DocumentManager
 from config import MAX_FILE_SIZE_MB
 from config import DOCUMENT_TYPES
 
 
+# UploadWorker class running a batch upload off the GUI thread
+# DocumentManager.upload_documents() encrypts the files on its own thread pool and
+# writes the rows in one transaction; this thread just drives it and reports
+# per-file progress back to the dialog through Qt signals.
+
+class UploadWorker(QThread):
+    progress = Signal(int, int, str) # files done, total files, file just finished
+    completed = Signal(list) # per-file results from upload_documents()
+
+    def __init__(self, doc_manager, entity_type, entity_id, files, parent=None):
+        super().__init__(parent)
+        self.doc_manager = doc_manager
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.files = files
+        self.cancel_event = threading.Event() # Set by the progress dialog's Cancel button
+
+    def run(self): # Called on the worker thread
+        results = self.doc_manager.upload_documents(
+            self.entity_type, self.entity_id, self.files,
+            progress=lambda done, total, path, ok: self.progress.emit(done, total, os.path.basename(path)),
+            cancelled=self.cancel_event.is_set,
+        )
+        self.completed.emit(results)
+
+
 # DocumentPickerDialog class to create a dialog for selecting and uploading documents
 # This dialog allows users to select a file, enter a name, and choose a document type  
 # for different entities (tenants, landlords, properties, tenancies) in the database.
 # The dialog also handles the encryption and storage of the selected file, ensuring that sensitive information is stored securely.
+# Several files can be selected at once; they are uploaded as one batch in the background
+# (each file's name becomes its document name) with a progress dialog.
 
 class DocumentPickerDialog(QDialog): # This class inherits from QDialog to create a custom dialog
     def __init__(self, entity_type, entity_id, parent=None):
@@ -60,9 +89,9 @@ class DocumentPickerDialog(QDialog): # This class inherits from QDialog to creat
             self.expiry_input.setVisible(False)
 
         # File selection
-        # This is the button that allows users to select a file to upload
-        self.file_path = None
-        self.select_button = QPushButton("Select File")
+        # This is the button that allows users to select the files to upload
+        self.file_paths = []
+        self.select_button = QPushButton("Select File(s)")
         self.select_button.setToolTip(f"Choose a file to upload (max size: {MAX_FILE_SIZE_MB} MB)")
         self.select_button.clicked.connect(self.select_file)
         layout.addWidget(self.select_button)
@@ -78,15 +107,22 @@ class DocumentPickerDialog(QDialog): # This class inherits from QDialog to creat
         self.setLayout(layout)
 
     # Select file button
-    # This method opens a file dialog to select a file for upload
+    # This method opens a file dialog to select one or more files for upload
     def select_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select File")
-        if file_path:
-            self.file_path = file_path
-            self.select_button.setText(os.path.basename(file_path))
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "Select File(s)")
+        if file_paths:
+            self.file_paths = file_paths
+            if len(file_paths) == 1:
+                self.select_button.setText(os.path.basename(file_paths[0]))
+                self.name_input.setEnabled(True)
+                self.name_input.setPlaceholderText("")
+            else: # Each file keeps its own name
+                self.select_button.setText(f"{len(file_paths)} files selected")
+                self.name_input.setEnabled(False)
+                self.name_input.setPlaceholderText("Each file's name is used")
 
     # Upload file button
-    # This method handles the upload process, including file size checks and database interactions
+    # This method checks the selection and starts the batch upload in the background
     def upload_file(self):
         self.upload_button.setEnabled(False)
 
@@ -94,29 +130,66 @@ class DocumentPickerDialog(QDialog): # This class inherits from QDialog to creat
         doc_type = self.type_input.currentText()
         expiry = self.expiry_input.date().toString("yyyy-MM-dd") if self.entity_type == "property" else None
 
-        # Check file size
-        if os.path.getsize(self.file_path) > MAX_FILE_SIZE_MB * 1024 * 1024:
-            QMessageBox.warning(self, 'File Too Large', f'File exceeds {MAX_FILE_SIZE_MB} MB limit.')
+        # Check if name and file paths are provided
+        # If the name (for a single file) or the files are missing, show a warning message
+        if not self.file_paths or (len(self.file_paths) == 1 and not name):
+            QMessageBox.warning(self, "Missing Info", "Please provide a name and select a file.")
             self.upload_button.setEnabled(True)
             return
 
-        # Check if name and file path are provided
-        # If the name or file path is empty, show a warning message
-        if not name or not self.file_path:
-            QMessageBox.warning(self, "Missing Info", "Please provide a name and select a file.")
+        # Check file sizes
+        too_large = [p for p in self.file_paths if os.path.getsize(p) > MAX_FILE_SIZE_MB * 1024 * 1024]
+        if too_large:
+            names = "\n".join(os.path.basename(p) for p in too_large)
+            QMessageBox.warning(self, 'File Too Large', f'These files exceed the {MAX_FILE_SIZE_MB} MB limit:\n{names}')
             self.upload_button.setEnabled(True)
             return
 
-        # Upload the document
-        # This method handles the encryption of the document and stores it in the appropriate folder
-        success = self.doc_manager.upload_document(
-            self.entity_type, self.entity_id, name, doc_type, expiry, self.file_path
-        )
-        # If the upload is successful, show a success message and close the dialog
-        if success:
-            QMessageBox.information(self, "Success", "Document uploaded successfully.")
-            self.upload_button.setEnabled(True)
+        files = [{
+            "file_path": path,
+            "doc_name": name if len(self.file_paths) == 1 else os.path.splitext(os.path.basename(path))[0],
+            "doc_type": doc_type,
+            "expiry_date": expiry,
+        } for path in self.file_paths]
+
+        # Upload the documents on a worker thread so the window stays responsive
+        self.progress_dialog = QProgressDialog("Encrypting documents...", "Cancel", 0, len(files), self)
+        self.progress_dialog.setWindowTitle("Uploading")
+        self.progress_dialog.setWindowModality(Qt.WindowModal)
+        self.progress_dialog.setMinimumDuration(300) # Only shown if the batch takes a moment
+
+        self.worker = UploadWorker(self.doc_manager, self.entity_type, self.entity_id, files, self)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.completed.connect(self.upload_finished)
+        self.progress_dialog.canceled.connect(self.worker.cancel_event.set)
+        self.worker.start()
+
+    def reject(self): # Closing the dialog mid-upload skips the files not started yet
+        if getattr(self, "worker", None) is not None and self.worker.isRunning():
+            self.worker.cancel_event.set()
+            self.worker.wait()
+        super().reject()
+
+    def show_progress(self, done, total, filename): # Update the progress dialog as each file finishes
+        self.progress_dialog.setLabelText(f"Encrypted {filename} ({done} of {total})")
+        self.progress_dialog.setValue(done)
+
+    def upload_finished(self, results): # Report the batch outcome and close the dialog if anything was saved
+        self.worker.wait()
+        self.progress_dialog.canceled.disconnect(self.worker.cancel_event.set)
+        self.progress_dialog.reset()
+        self.upload_button.setEnabled(True)
+
+        uploaded = [r for r in results if r["ok"]]
+        failed = [r for r in results if not r["ok"]]
+        # If every upload succeeded, show a success message and close the dialog
+        if not failed:
+            message = "Document uploaded successfully." if len(results) == 1 else f"{len(uploaded)} documents uploaded successfully."
+            QMessageBox.information(self, "Success", message)
+            self.accept()
+        elif uploaded: # Some files failed: list them, keep the ones that worked
+            details = "\n".join(f"{os.path.basename(r['file_path'])}: {r['error']}" for r in failed)
+            QMessageBox.warning(self, "Partly Uploaded", f"{len(uploaded)} uploaded, {len(failed)} failed:\n{details}")
             self.accept()
         else: # If the upload fails, show an error message
-            QMessageBox.critical(self, "Failure", "Failed to upload document.")
-            self.upload_button.setEnabled(True)
+            QMessageBox.critical(self, "Failure", "Failed to upload document." if len(results) == 1 else "Failed to upload the documents.")
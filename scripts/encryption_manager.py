@@ -1,12 +1,52 @@
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import os
-from config import ENCRYPTION_KEY_PATH
+import hmac
+import time
+import base64
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from scripts.utils import compression
+from config import ENCRYPTION_KEY_PATH, ENCRYPTION_CHUNK_SIZE
 
 # Location of the encryption key
 KEY_FILE = ENCRYPTION_KEY_PATH
 
 # This script handles the generation, loading, encryption, and decryption of files using a symmetric encryption key.
-# It uses the Fernet symmetric encryption algorithm from the cryptography library.
+# The key is a Fernet key. Files are written in a chunked container (below) so that encrypting or
+# decrypting a document needs a couple of chunks of memory instead of the whole file, and documents
+# that compress well are compressed before they are encrypted; files written by older versions as
+# one Fernet token are still decrypted transparently.
+
+# === Container format (version 2) === #
+# Header: magic | version | chunk size | HKDF salt | nonce prefix | compression codec
+# Body: the (compressed) plaintext split into chunk-size pieces, each sealed with AES-256-GCM
+# (ciphertext + 16-byte tag). The file key is derived from the Fernet key with HKDF and a random
+# per-file salt. Each chunk's nonce is the prefix, the chunk number and a final-chunk flag, and the
+# header is authenticated with every chunk, so chunks cannot be altered, reordered, dropped, or the
+# file truncated without decryption failing. The codec id comes from scripts/utils/compression.py.
+# Version 1 files have the same layout without the codec byte and are never compressed.
+MAGIC = b"STARENC\x00"
+FORMAT_VERSION = 2
+HEADER_V1 = struct.Struct(">8sBI16s7s")
+HEADER = struct.Struct(">8sBI16s7sB")
+TAG_SIZE = 16
+MAX_CHUNK_SIZE = 64 * 1024 * 1024 # Larger chunk sizes in a header are treated as corruption
+HKDF_INFO = b"STAR PMK document encryption v1"
+CONTENT_HASH_INFO = b"STAR PMK content hash v1" # Keeps the content-hash key separate from the file keys
+
+KEY_CHECK_INTERVAL = 5 # Seconds between checks of the key file for a rotated key
+CIPHER_CACHE_SIZE = 64 # Per-file AES-GCM ciphers kept ready (e.g. for documents opened again)
+
+
+class DecryptionError(Exception): # Raised when a file is corrupt, truncated or was encrypted with another key
+    pass
+
 
 def generate_key(): # Generate a new encryption key
     os.makedirs(os.path.dirname(KEY_FILE), exist_ok=True) # Ensure the directory exists
@@ -19,36 +59,250 @@ def generate_key(): # Generate a new encryption key
             f.write(key) # Write the key to the file
 
         print("✅ Secret key generated and stored.")
+        KeyService().invalidate() # Pick the new key up on the next operation
 
     else: # If the key file already exists
         print("🔑 Secret key already exists.")
 
-def load_key(): # Load the encryption key from the file
-    if not os.path.exists(KEY_FILE): # Check if the key file exists
-        raise FileNotFoundError("Secret key not found. Run generate_key() first.")
+def load_key(): # Return the encryption key (read from the file once, then served from memory)
+    return KeyService().current().key
+
+def derive_file_key(master, salt): # AES-256 key for one file, derived from the raw Fernet key and the file's salt
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=HKDF_INFO).derive(master)
+
+# KeyMaterial class holding one Fernet key and the ciphers built from it
+# The Fernet object (for legacy files) and the decoded key are made once. Per-file
+# AES-GCM ciphers are cached by salt, so a document that is opened again skips the
+# key derivation. Safe to share between threads.
+
+class KeyMaterial:
+    def __init__(self, key):
+        self.key = key
+        self.fernet = Fernet(key) # Also validates the key
+        self.master = base64.urlsafe_b64decode(key)
+        self.hash_key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=CONTENT_HASH_INFO).derive(self.master)
+        self._ciphers = OrderedDict() # salt -> AESGCM, least recently used first
+        self._lock = threading.Lock()
+
+    def cipher(self, salt): # AES-GCM cipher for the file with this salt
+        with self._lock:
+            aes = self._ciphers.get(salt)
+            if aes is not None:
+                self._ciphers.move_to_end(salt)
+                return aes
+        aes = AESGCM(derive_file_key(self.master, salt))
+        with self._lock:
+            self._ciphers[salt] = aes
+            if len(self._ciphers) > CIPHER_CACHE_SIZE:
+                self._ciphers.popitem(last=False)
+        return aes
+
+# KeyService class serving the encryption key from memory
+# Singleton pattern, like DatabaseManager: the key file is read once and every encrypt
+# and decrypt reuses the same KeyMaterial. At most every KEY_CHECK_INTERVAL seconds the
+# file's modification time and size are checked, and if the key has been rotated the
+# new one is loaded and the old ciphers are dropped.
+
+class KeyService:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls, key_file=None): # Create the shared instance on first use
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(KeyService, cls).__new__(cls)
+                cls._instance._setup(key_file or KEY_FILE)
+        return cls._instance
+
+    def _setup(self, key_file): # Nothing is read until the key is first needed
+        self.key_file = key_file
+        self._material = None
+        self._stamp = None # (mtime_ns, size) of the key file when it was loaded
+        self._checked_at = float("-inf") # time.monotonic() of the last check
+        self._lock = threading.Lock()
+        self.stats = {"loads": 0, "checks": 0} # Used by the benchmark and for debugging
+
+    def current(self): # KeyMaterial for the key in effect, reloading it if the file changed
+        material = self._material
+        if material is not None and time.monotonic() - self._checked_at < KEY_CHECK_INTERVAL:
+            return material
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self): # Check the key file and (re)load it if it is new or has changed
+        try:
+            info = os.stat(self.key_file)
+        except FileNotFoundError:
+            raise FileNotFoundError("Secret key not found. Run generate_key() first.") from None
+        self.stats["checks"] += 1
+
+        stamp = (info.st_mtime_ns, info.st_size)
+        if self._material is None or stamp != self._stamp:
+            with open(self.key_file, 'rb') as f: # Closed straight away
+                key = f.read().strip()
+            if self._material is None or key != self._material.key:
+                if self._material is not None:
+                    print("🔑 Encryption key changed on disk, reloaded.")
+                self._material = KeyMaterial(key)
+                self.stats["loads"] += 1
+            self._stamp = stamp
+        self._checked_at = time.monotonic()
+        return self._material
+
+    def invalidate(self): # Re-check the key file on the next operation
+        with self._lock:
+            self._stamp = None
+            self._checked_at = float("-inf")
+
+# === Chunked encryption === #
+def key_material(key=None): # KeyMaterial for an explicit key, or the shared one
+    return KeyService().current() if key is None else KeyMaterial(key)
+
+def chunk_nonce(prefix, index, final): # 12-byte GCM nonce: prefix, chunk number, final-chunk flag
+    return prefix + struct.pack(">I?", index, final)
+
+def read_full(stream, size): # Read size bytes, or fewer only at the end of the stream
+    data = stream.read(size)
+    while data and len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+def plain_blocks(src, chunk_size): # Yield src in chunk_size blocks; only the last is shorter (possibly empty)
+    while True:
+        block = read_full(src, chunk_size)
+        yield block
+        if len(block) < chunk_size:
+            return
+
+def compressed_blocks(src, codec, level, chunk_size): # Yield the compressed stream of src in chunk_size blocks
+    if codec is compression.NONE:
+        yield from plain_blocks(src, chunk_size)
+        return
+    compressor = codec.compressor(level)
+    pending = bytearray()
+    while True:
+        data = src.read(chunk_size)
+        pending += compressor.compress(data) if data else compressor.flush()
+        while len(pending) >= chunk_size:
+            yield bytes(pending[:chunk_size])
+            del pending[:chunk_size]
+        if not data:
+            yield bytes(pending)
+            return
+
+def encrypt_stream(src, dst, key=None, chunk_size=ENCRYPTION_CHUNK_SIZE, codec=compression.NONE, level=None): # Encrypt the src file object into dst
+    salt, prefix = os.urandom(16), os.urandom(7)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, chunk_size, salt, prefix, codec.id)
+    aes = key_material(key).cipher(salt)
+    dst.write(header)
+
+    blocks = compressed_blocks(src, codec, level, chunk_size)
+    index, chunk = 0, next(blocks)
+    for following in blocks: # One block ahead so the last one can be flagged as final
+        if not following: # Only the last block can be empty
+            break
+        dst.write(aes.encrypt(chunk_nonce(prefix, index, False), chunk, header))
+        chunk, index = following, index + 1
+    dst.write(aes.encrypt(chunk_nonce(prefix, index, True), chunk, header))
+
+def parse_header(header, src): # Check a container header (reading the rest of it from src for newer versions)
+    # Returns (header bytes, chunk size, salt, nonce prefix, codec)
+    version = header[len(MAGIC)]
+    if version == 1:
+        _, _, chunk_size, salt, prefix = HEADER_V1.unpack(header)
+        codec_id = compression.NONE.id
+    elif version == FORMAT_VERSION:
+        header += read_full(src, HEADER.size - HEADER_V1.size)
+        if len(header) < HEADER.size:
+            raise DecryptionError("Encrypted file is truncated")
+        _, _, chunk_size, salt, prefix, codec_id = HEADER.unpack(header)
+    else:
+        raise DecryptionError(f"Unsupported encrypted file (version {version})")
+
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise DecryptionError(f"Unsupported encrypted file (chunk size {chunk_size})")
+    try:
+        codec = compression.codec_by_id(codec_id)
+    except KeyError:
+        raise DecryptionError(f"File was compressed with codec {codec_id}, which is not available (is zstandard installed?)") from None
+    return header, chunk_size, salt, prefix, codec
 
-    return open(KEY_FILE, 'rb').read() # Read the key from the file
+def iter_decrypted(src, key=None): # Yield the plaintext of the src file object chunk by chunk
+    keys = key_material(key)
+    header = read_full(src, HEADER_V1.size)
+    if len(header) < HEADER_V1.size or not header.startswith(MAGIC): # Legacy file: one Fernet token
+        try:
+            yield keys.fernet.decrypt(header + src.read())
+        except InvalidToken:
+            raise DecryptionError("File is corrupt or was encrypted with a different key") from None
+        return
 
-def encrypt_file(input_file, output_file): # Encrypt a file using the global key
-    key = load_key() # Load the encryption key
-    fernet = Fernet(key) # Create a Fernet object with the key
+    header, chunk_size, salt, prefix, codec = parse_header(header, src)
+    aes = keys.cipher(salt)
+    decompressor = codec.decompressor()
 
-    with open(input_file, 'rb') as file: # Open the input file in read-binary mode
-        original = file.read()
+    index = 0
+    block = read_full(src, chunk_size + TAG_SIZE)
+    if not block:
+        raise DecryptionError("Encrypted file is truncated")
+    while block:
+        following = read_full(src, chunk_size + TAG_SIZE)
+        try:
+            chunk = aes.decrypt(chunk_nonce(prefix, index, not following), block, header)
+        except InvalidTag:
+            raise DecryptionError(f"Chunk {index} failed authentication (corrupt, truncated or wrong key)") from None
+        plain = decompressor.decompress(chunk)
+        if plain:
+            yield plain
+        block, index = following, index + 1
+    tail = decompressor.flush()
+    if tail:
+        yield tail
 
-    encrypted = fernet.encrypt(original) # Encrypt the original file content
+def decrypt_stream(src, dst, key=None): # Decrypt the src file object into dst
+    for chunk in iter_decrypted(src, key):
+        dst.write(chunk)
 
-    with open(output_file, 'wb') as file: # Open the output file in write-binary mode
-        file.write(encrypted)
+def decrypt_to_bytes(input_file, key=None): # Decrypt a file straight into memory (nothing is written to disk)
+    with open(input_file, 'rb') as src:
+        return b"".join(iter_decrypted(src, key))
 
-def decrypt_file(input_file, output_file): # Decrypt a file using the global key
-    key = load_key() # Load the encryption key
-    fernet = Fernet(key) # Create a Fernet object with the key
+# === Content hashing === #
+# Documents are identified by a keyed hash (HMAC-SHA256) of their plaintext. Equal files get
+# the same hash, so they can be stored once, but without the key nobody can tell from the
+# database or the blob names whether a known file is in the store.
+def content_hash(src, key=None, chunk_size=ENCRYPTION_CHUNK_SIZE): # Hex HMAC of the src file object
+    digest = hmac.new(key_material(key).hash_key, digestmod=hashlib.sha256)
+    for chunk in iter(lambda: src.read(chunk_size), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
 
-    with open(input_file, 'rb') as file: # Open the input file in read-binary mode
-        encrypted = file.read()
+def hash_file(input_file, key=None): # Content hash of a file, read chunk by chunk
+    with open(input_file, 'rb') as src:
+        return content_hash(src, key)
 
-    decrypted = fernet.decrypt(encrypted) # Decrypt the encrypted file content
+# === Files === #
+def encrypt_file(input_file, output_file, key=None, codec=None): # Encrypt a file using the global key (or key)
+    if codec is None: # Compress unless the format is already compressed (see compression.codec_for)
+        codec = compression.codec_for(input_file)
+    partial = output_file + ".part" # Only a complete file ever appears at output_file
+    try:
+        with open(input_file, 'rb') as src, open(partial, 'wb') as dst:
+            encrypt_stream(src, dst, key, codec=codec, level=compression.level(codec))
+        os.replace(partial, output_file)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
 
-    with open(output_file, 'wb') as file: # Open the output file in write-binary mode
-        file.write(decrypted)
+def decrypt_file(input_file, output_file, key=None): # Decrypt a file using the global key (or key)
+    partial = output_file + ".part" # Plaintext from a file that fails authentication is thrown away
+    try:
+        with open(input_file, 'rb') as src, open(partial, 'wb') as dst:
+            decrypt_stream(src, dst, key)
+        os.replace(partial, output_file)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
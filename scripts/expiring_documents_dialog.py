@@ -0,0 +1,85 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+from PySide6.QtGui import QColor
+from scripts.expiry_scanner import ExpiryScanner
+from scripts.document_manager import DocumentManager
+from scripts.utils.document_preview import preview_document
+from config import EXPIRY_WINDOW_DAYS
+
+
+# ExpiringDocumentsDialog class inherits from QDialog
+# This class is the drill-down behind the dashboard's expiring documents alert
+# It lists the documents expiring within EXPIRY_WINDOW_DAYS (and those already expired), soonest first
+# Rows are fetched from ExpiryScanner a page at a time as the user scrolls to the bottom
+# Double-clicking a row opens the document
+
+class ExpiringDocumentsDialog(QDialog):
+    def __init__(self, within_days=EXPIRY_WINDOW_DAYS, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Expiring Documents")
+        self.setMinimumSize(800, 450)
+        self.within_days = within_days
+        self.scanner = ExpiryScanner()
+        self.doc_manager = DocumentManager()
+        self.documents = [] # ExpiringDocument rows shown so far
+        self.cursor = None # Where the next page starts (None once everything is loaded)
+        self.setup_ui()
+        self.load_first_page()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Expires", "Days Left", "Belongs To", "Document", "Type"])
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalScrollBar().valueChanged.connect(self.maybe_load_more)
+        self.table.doubleClicked.connect(self.open_selected)
+        layout.addWidget(self.table)
+
+    def load_first_page(self): # Count the expiring documents and show the soonest page
+        self.total = self.scanner.count(self.within_days)
+        self.documents, self.cursor = self.scanner.page(self.within_days)
+        self.table.setRowCount(0)
+        self.add_rows(self.documents)
+
+    def maybe_load_more(self, value): # Fetch the next page once the view is scrolled to the bottom
+        if self.cursor is not None and value >= self.table.verticalScrollBar().maximum():
+            documents, self.cursor = self.scanner.page(self.within_days, after=self.cursor)
+            self.documents.extend(documents)
+            self.add_rows(documents)
+
+    def add_rows(self, documents): # Append documents to the table
+        for doc in documents:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            if doc.days_left < 0:
+                days = f"Expired {-doc.days_left} day(s) ago"
+            else:
+                days = "Today" if doc.days_left == 0 else f"{doc.days_left} day(s)"
+            owner = f"{doc.entity_type.title()}: {doc.entity_name or doc.entity_id}"
+            for column, value in enumerate([doc.expiry_date, days, owner, doc.doc_name, doc.doc_type]):
+                item = QTableWidgetItem(value or "")
+                if doc.days_left < 0:
+                    item.setForeground(QColor("#c0392b")) # Highlight documents that have already expired
+                self.table.setItem(row, column, item)
+
+        shown = self.table.rowCount()
+        more = ", scroll for more" if self.cursor is not None else ""
+        self.summary_label.setText(
+            f"📁 {self.total} document(s) expired or expiring within {self.within_days} days ({shown} shown{more})"
+        )
+
+    def open_selected(self): # Preview the double-clicked document
+        row = self.table.currentRow()
+        if row < 0:
+            return
+        doc = self.documents[row]
+        if not preview_document(self.doc_manager, doc.entity_type, doc.entity_id, doc.filename, self):
+            QMessageBox.warning(self, "Preview Unavailable", "The selected document could not be opened.")
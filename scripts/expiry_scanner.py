@@ -0,0 +1,102 @@
+from datetime import date
+from dataclasses import dataclass
+from scripts.database_manager import DatabaseManager
+from config import EXPIRY_WINDOW_DAYS, EXPIRY_PAGE_SIZE
+
+# Documents table of each entity type, in document_expiries order
+DOCUMENT_TABLES = ["tenant_documents", "landlord_documents", "property_documents", "tenancy_documents"]
+
+# Only real dates stored as YYYY-MM-DD are listed: DATE() gives NULL for empty or hand-typed values,
+# and with a modifier it moves impossible ones (2024-02-30) on, so neither matches itself. They would
+# otherwise sort before every real date and can't be turned into days left.
+VALID_DATE = "DATE(expiry_date, '+0 day') = expiry_date"
+
+# Documents expiring on or before the horizon (already expired ones included), counted per table
+# so each count is served by that table's expiry_date index alone
+EXPIRING_COUNT_QUERY = " + ".join(
+    f"(SELECT COUNT(*) FROM {table} WHERE expiry_date <= DATE('now', :window) AND {VALID_DATE})"
+    for table in DOCUMENT_TABLES
+)
+
+# One page of expiring documents, soonest first, starting after the :after_* position (keyset paging)
+# The expiry_date >= bound lets every index scan start at the page instead of the beginning;
+# the entity names are looked up for the rows of the page only.
+EXPIRING_PAGE_QUERY = f"""
+    SELECT page.*,
+           CASE page.entity_type
+               WHEN 'tenant' THEN (SELECT first_name || ' ' || last_name FROM tenants WHERE tenant_id = page.entity_id)
+               WHEN 'landlord' THEN (SELECT first_name || ' ' || last_name FROM landlords WHERE landlord_id = page.entity_id)
+               WHEN 'property' THEN (SELECT door_number || ' ' || street || ', ' || postcode FROM properties WHERE property_id = page.entity_id)
+               WHEN 'tenancy' THEN (
+                   SELECT p.door_number || ' ' || p.street || ' (from ' || t.start_date || ')'
+                   FROM tenancies t LEFT JOIN properties p ON p.property_id = t.property_id
+                   WHERE t.tenancy_id = page.entity_id)
+           END AS entity_name
+    FROM (
+        SELECT entity_type, entity_id, doc_id, doc_name, doc_type, file_path, expiry_date
+        FROM document_expiries
+        WHERE expiry_date <= DATE('now', :window)
+          AND expiry_date >= :after_date
+          AND (expiry_date, doc_id, entity_type) > (:after_date, :after_id, :after_type)
+          AND {VALID_DATE}
+        ORDER BY expiry_date, doc_id, entity_type
+        LIMIT :limit
+    ) AS page
+    ORDER BY page.expiry_date, page.doc_id, page.entity_type
+"""
+
+START = ("", 0, "") # Position before the first document
+
+
+# ExpiringDocument class holding one row of the expiry list
+# days_left is negative for documents that have already expired.
+
+@dataclass
+class ExpiringDocument:
+    entity_type: str
+    entity_id: int
+    doc_id: int
+    doc_name: str
+    doc_type: str
+    filename: str
+    expiry_date: str
+    entity_name: str = None
+    days_left: int = 0
+
+
+# ExpiryScanner class listing the documents that expire within a window
+# count() gives the number for the dashboard alert and the list header, and page() returns the
+# documents in expiry order a page at a time; pass the cursor it returns to get the next page.
+# Both stay cheap with hundreds of thousands of documents because they only touch the
+# expiry_date indexes and the rows being shown.
+
+class ExpiryScanner:
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager() # Anything with fetchall(), e.g. for benchmarks
+
+    @staticmethod
+    def window(days): # DATE() modifier for a window of days
+        return f"+{int(days)} day"
+
+    def count(self, within_days=EXPIRY_WINDOW_DAYS): # Documents expiring within the window (or already expired)
+        rows = self.db.fetchall(f"SELECT {EXPIRING_COUNT_QUERY}", {"window": self.window(within_days)})
+        return rows[0][0] if rows else 0
+
+    def page(self, within_days=EXPIRY_WINDOW_DAYS, after=START, limit=EXPIRY_PAGE_SIZE): # One page of expiring documents
+        # Returns (documents, cursor); cursor is None when there are no more pages
+        rows = self.db.fetchall(EXPIRING_PAGE_QUERY, {
+            "window": self.window(within_days), "limit": limit,
+            "after_date": after[0], "after_id": after[1], "after_type": after[2],
+        })
+        today = date.today()
+        documents = []
+        for row in rows:
+            try:
+                days_left = (date.fromisoformat(row[6]) - today).days
+            except ValueError: # A date SQLite accepts but Python doesn't (year 0): skip the row
+                continue
+            documents.append(ExpiringDocument(*row, days_left=days_left))
+        if len(rows) < limit:
+            return documents, None
+        last = rows[-1] # The next page starts after the last row read, even if it was skipped
+        return documents, (last[6], last[2], last[0])
@@ -0,0 +1,113 @@
+import os
+import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImageIOHandler, QImageReader
+from scripts.database_manager import DatabaseManager
+from scripts.thumbnail_cache import thumbnail_cache
+from config import UPLOAD_WORKERS, IMAGE_MAX_DIMENSION, IMAGE_JPEG_QUALITY
+
+
+# ImageIngest class adding a batch of photos to a property
+# Each file is handled on a worker thread with a single decode: photos whose longer side is over
+# IMAGE_MAX_DIMENSION are scaled down while decoding, and photos with an EXIF orientation are
+# turned upright, then saved in their own format (JPEGs at IMAGE_JPEG_QUALITY). Anything else is
+# copied byte for byte. The thumbnails are made from the decoded picture while it is in memory.
+# Every target name is picked before the work starts, so files in the same batch (or the same
+# second) can't overwrite each other, and all the rows are inserted in one transaction; if that
+# fails, the files written by the batch are removed again.
+# ingest() can run on any thread and reports progress(done, total, file_path, ok) as files finish.
+
+class ImageIngest:
+    def __init__(self, db=None, thumbnails=None, max_dimension=IMAGE_MAX_DIMENSION, workers=UPLOAD_WORKERS):
+        self.db = db or DatabaseManager()
+        self.thumbnails = thumbnails or thumbnail_cache()
+        self.max_dimension = max_dimension
+        self.workers = workers
+
+    @staticmethod
+    def unique_image_filename(file_path, used, stamp): # <stamp>_<name>, numbered if that's taken
+        filename = os.path.basename(file_path)
+        candidate = f"{stamp}_{filename}"
+        counter = 1
+        while candidate in used:
+            counter += 1
+            candidate = f"{stamp}_{counter}_{filename}"
+        used.add(candidate)
+        return candidate
+
+    def store(self, source, target): # Write source to target, scaled down and upright if needed; returns (QImage, rewritten)
+        reader = QImageReader(source)
+        reader.setAutoTransform(True) # Apply the EXIF orientation while decoding
+        image_format = bytes(reader.format()).decode()
+        size = reader.size()
+        scale = self.max_dimension / max(size.width(), size.height(), 1) if size.isValid() else 1
+        if scale < 1: # The orientation doesn't change the longer side, so scale before rotating
+            reader.setScaledSize(QSize(max(1, round(size.width() * scale)), max(1, round(size.height() * scale))))
+        upright = reader.transformation() == QImageIOHandler.TransformationNone
+        image = reader.read()
+        if image.isNull():
+            raise ValueError(f"Not a readable image ({reader.errorString()})")
+
+        if scale < 1 or not upright:
+            quality = IMAGE_JPEG_QUALITY if image_format == "jpeg" else -1
+            if not image.save(target, image_format, quality): # The saved file carries no orientation tag
+                raise OSError(f"Could not write {target}")
+            return image, True
+        shutil.copyfile(source, target)
+        return image, False
+
+    def ingest(self, property_id, folder, files, progress=None, cancelled=None): # Add files to the property; returns per-file results
+        results = [{"file_path": path, "ok": False, "error": None, "image_path": None,
+                    "content_hash": None, "rewritten": False} for path in files]
+        os.makedirs(folder, exist_ok=True)
+
+        # Pick every target name up front so files with the same name can't collide
+        used, stamp = set(os.listdir(folder)), int(time.time())
+        for result in results:
+            result["image_path"] = os.path.join(folder, self.unique_image_filename(result["file_path"], used, stamp))
+
+        def process(result): # Runs on a pool thread
+            if cancelled and cancelled():
+                raise InterruptedError("Upload cancelled")
+            try:
+                image, result["rewritten"] = self.store(result["file_path"], result["image_path"])
+                result["content_hash"], _ = self.thumbnails.generate(result["image_path"], image=image)
+            except Exception:
+                if os.path.exists(result["image_path"]):
+                    os.remove(result["image_path"])
+                raise
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(files)))) as pool:
+            futures = {pool.submit(process, result): result for result in results}
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = futures[future]
+                error = future.exception()
+                result["ok"], result["error"] = error is None, (str(error) if error else None)
+                if error and not isinstance(error, InterruptedError):
+                    print(f"[ERROR] Adding image {result['file_path']} failed:", error)
+                if progress:
+                    progress(done, len(files), result["file_path"], result["ok"])
+
+        stored = [r for r in results if r["ok"]]
+        if not stored:
+            return results
+
+        try: # All rows in one transaction: either every stored image is recorded or none is
+            with self.db.cursor() as cur:
+                cur.executemany("""
+                    INSERT INTO property_images (property_id, image_path, uploaded_date, content_hash)
+                    VALUES (?, ?, DATE('now'), ?)
+                """, [(property_id, r["image_path"], r["content_hash"]) for r in stored])
+        except Exception as e: # Don't leave images behind with no record pointing at them
+            print("[ERROR] Saving images failed:", e)
+            for r in stored:
+                if os.path.exists(r["image_path"]):
+                    os.remove(r["image_path"])
+                r["ok"], r["error"] = False, f"Database error: {e}"
+            return results
+
+        resized = sum(r["rewritten"] for r in stored)
+        print(f"[INFO] {len(stored)} image(s) added to property {property_id}, {resized} scaled down or turned upright")
+        return results
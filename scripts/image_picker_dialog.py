@@ -1,14 +1,48 @@
 import os
-import shutil
-import time
+import bisect
+import threading
+from collections import OrderedDict
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QPushButton, QListWidget, QListWidgetItem,
-    QFileDialog, QLabel, QMessageBox, QHBoxLayout
+    QDialog, QVBoxLayout, QPushButton, QListWidget, QListWidgetItem, QListView,
+    QFileDialog, QLabel, QMessageBox, QHBoxLayout, QProgressDialog
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QSize, QThread, QTimer, Signal
 from PySide6.QtGui import QPixmap, QIcon
 from scripts.database_manager import DatabaseManager
-from config import PROPERTIES_DIR
+from scripts.thumbnail_cache import thumbnail_cache, decode_scaled
+from scripts.carousel_loader import CarouselLoader, DecodeTask, LoaderSignals
+from scripts.image_ingest import ImageIngest
+from config import PROPERTIES_DIR, THUMBNAIL_SIZES, PICKER_ICON_CACHE_SIZE
+
+HASH_ROLE = Qt.UserRole + 1 # Item data: the image's content hash, if known
+SCROLL_SETTLE_MS = 30 # Thumbnails are requested once scrolling pauses this long
+PREVIEW_SIZE = QSize(600, 400)
+
+
+# ImageIngestWorker class running a batch image upload off the GUI thread
+# ImageIngest.ingest() scales, copies and thumbnails the files on its own thread pool and
+# writes the rows in one transaction; this thread just drives it and reports per-file
+# progress back to the dialog through Qt signals.
+
+class ImageIngestWorker(QThread):
+    progress = Signal(int, int, str) # files done, total files, file just finished
+    completed = Signal(list) # per-file results from ingest()
+
+    def __init__(self, ingest, property_id, folder, files, parent=None):
+        super().__init__(parent)
+        self.ingest = ingest
+        self.property_id = property_id
+        self.folder = folder
+        self.files = files
+        self.cancel_event = threading.Event() # Set by the progress dialog's Cancel button
+
+    def run(self): # Called on the worker thread
+        results = self.ingest.ingest(
+            self.property_id, self.folder, self.files,
+            progress=lambda done, total, path, ok: self.progress.emit(done, total, os.path.basename(path)),
+            cancelled=self.cancel_event.is_set,
+        )
+        self.completed.emit(results)
 
 
 # ImagePickerDialog class to manage property images
@@ -16,6 +50,13 @@ from config import PROPERTIES_DIR
 # It uses a QListWidget to display the images and allows users to upload new images or delete existing ones.
 # The images are stored in a folder named using the property ID, door number, street, and postcode.
 # The images are also stored in a SQLite database with a reference to the property ID.
+# Uploads run in the background through ImageIngest (scaled down, turned upright and thumbnailed
+# on a thread pool) with a progress dialog.
+# The images are shown as a grid of 64 px thumbnails. Only the items on screen ask for theirs: they
+# are read from the thumbnail cache (or made from the original) on the carousel's worker threads,
+# requests for items scrolled past before their turn are skipped, and the decoded icons are kept
+# in an LRU of PICKER_ICON_CACHE_SIZE, so a gallery of thousands of photos opens and scrolls
+# without decoding more than a screenful.
 
 class ImagePickerDialog(QDialog): # This class inherits from QDialog to create a custom dialog
     def __init__(self, property_id, door_number, street, postcode):
@@ -25,6 +66,17 @@ class ImagePickerDialog(QDialog): # This class inherits from QDialog to create a
         # Create a folder using the naming convention "ID_DoorNumber_Street_Postcode" under the "properties" folder.
         self.folder_path = self.create_property_folder(property_id, door_number, street, postcode)
         self.db = DatabaseManager()
+        self.thumbnails = thumbnail_cache()
+        self.pool = CarouselLoader.pool() # Shares the carousel's decode threads
+        self.items = {} # image path -> list item
+        self.icons = OrderedDict() # image path -> QIcon, least recently used first
+        self.pending = set() # Image paths queued or loading
+        self.on_screen = set() # Image paths visible when thumbnails were last requested, updated in place
+        self.new_hashes = [] # (content_hash, image_id) worked out while loading, saved in one batch
+        self.ingest = ImageIngest(self.db, self.thumbnails)
+        self.worker = None
+        self.signals = LoaderSignals(self)
+        self.signals.finished.connect(self.thumbnail_loaded)
         self.setup_ui()
         self.load_images()
 
@@ -41,61 +93,168 @@ class ImagePickerDialog(QDialog): # This class inherits from QDialog to create a
     def setup_ui(self):
         layout = QVBoxLayout()
 
-        # Image list
+        # Image grid
         self.image_list = QListWidget()
+        self.image_list.setViewMode(QListView.IconMode)
+        self.image_list.setMovement(QListView.Static)
+        self.image_list.setResizeMode(QListView.Adjust) # Re-flow the grid when the dialog is resized
+        self.image_list.setUniformItemSizes(True)
+        self.image_list.setTextElideMode(Qt.ElideMiddle)
         self.image_list.itemDoubleClicked.connect(self.preview_image)
+        height = THUMBNAIL_SIZES["picker"]
+        self.image_list.setIconSize(QSize(height * 3 // 2, height)) # Room for landscape photos
+        self.image_list.setGridSize(QSize(height * 3 // 2 + 24, height + 36))
+        placeholder = QPixmap(self.image_list.iconSize())
+        placeholder.fill(Qt.lightGray)
+        self.placeholder = QIcon(placeholder) # Shown until an item's thumbnail arrives
+
+        # Thumbnails are requested for the items on screen once scrolling or resizing settles
+        self.visible_timer = QTimer(self)
+        self.visible_timer.setSingleShot(True)
+        self.visible_timer.setInterval(SCROLL_SETTLE_MS)
+        self.visible_timer.timeout.connect(self.request_visible_thumbnails)
+        self.image_list.verticalScrollBar().valueChanged.connect(self.schedule_thumbnails)
 
         # Buttons layout
         button_layout = QHBoxLayout()
-        upload_button = QPushButton("Upload Image")
-        upload_button.clicked.connect(self.upload_image)
+        self.upload_button = QPushButton("Upload Image")
+        self.upload_button.clicked.connect(self.upload_image)
         delete_button = QPushButton("Delete Image")
         delete_button.clicked.connect(self.delete_selected_image)
 
-        button_layout.addWidget(upload_button)
+        button_layout.addWidget(self.upload_button)
         button_layout.addWidget(delete_button)
 
         layout.addWidget(self.image_list)
         layout.addLayout(button_layout)
 
         self.setLayout(layout)
+        self.resize(640, 480)
 
     # Load images from the database and display them in the list widget
     # This method retrieves the images associated with the property ID from the database
+    # Thumbnails already in memory are shown straight away, the rest once they scroll into view
     def load_images(self):
         self.image_list.clear()
+        self.items = {}
         query = """
-            SELECT image_id, image_path
+            SELECT image_id, image_path, content_hash
             FROM property_images
             WHERE property_id = ?
         """
-        images = self.db.execute(query, (self.property_id,), fetchall=True)
-        for image in images:
-            image_id, image_path = image
-            item = QListWidgetItem(os.path.basename(image_path))
+        images = self.db.fetchall(query, (self.property_id,))
+        for image_id, image_path, content_hash in images:
+            name = os.path.basename(image_path)
+            item = QListWidgetItem(self.icons.get(image_path, self.placeholder), name)
             item.setData(Qt.UserRole, (image_id, image_path))
-            item.setIcon(QIcon(image_path))
+            item.setData(HASH_ROLE, content_hash)
+            item.setToolTip(name)
             self.image_list.addItem(item)
+            self.items[image_path] = item
+        self.schedule_thumbnails()
+
+    def schedule_thumbnails(self): # Request thumbnails once scrolling (or loading) settles
+        self.visible_timer.start()
+
+    def resizeEvent(self, event): # A bigger dialog shows more items
+        super().resizeEvent(event)
+        self.schedule_thumbnails()
+
+    def visible_items(self): # Items at least partly on screen
+        # The grid is laid out in item order, so the first and last visible rows are found by bisection
+        view = self.image_list
+        top, bottom = 0, view.viewport().height()
+        rect = lambda row: view.visualItemRect(view.item(row))
+        first = bisect.bisect_left(range(view.count()), True, key=lambda row: rect(row).bottom() >= top)
+        last = bisect.bisect_left(range(view.count()), True, key=lambda row: rect(row).top() > bottom)
+        return [view.item(row) for row in range(first, last)]
+
+    def request_visible_thumbnails(self): # Queue the on-screen items' thumbnails
+        visible = {item.data(Qt.UserRole)[1]: item for item in self.visible_items()}
+        self.on_screen.intersection_update(visible) # In place: queued requests check this set when their turn comes,
+        self.on_screen.update(visible)              # and skip anything no longer on screen
+        for path, item in visible.items():
+            if path in self.icons:
+                self.icons.move_to_end(path)
+            elif path not in self.pending:
+                self.pending.add(path)
+                self.pool.start(DecodeTask(path, THUMBNAIL_SIZES["picker"], item.data(HASH_ROLE),
+                                           self.thumbnails, self.signals, wanted=self.on_screen.__contains__))
 
-    # Upload an image to the property folder and store its path in the database
-    # This method opens a file dialog to select images and copies them to the property folder
+    def thumbnail_loaded(self, path, image, content_hash): # Runs on the GUI thread when a thumbnail is ready
+        self.pending.discard(path)
+        if image is None: # Skipped: scrolled away before its turn
+            if path in self.on_screen: # ...and back again since
+                self.schedule_thumbnails()
+            return
+        icon = QIcon(QPixmap.fromImage(image)) if not image.isNull() else self.placeholder
+        self.icons[path] = icon
+        while len(self.icons) > PICKER_ICON_CACHE_SIZE: # Items far off screen go back to the placeholder
+            evicted, _ = self.icons.popitem(last=False)
+            if evicted in self.items:
+                self.items[evicted].setIcon(self.placeholder)
+        item = self.items.get(path)
+        if item is None: # Deleted meanwhile
+            return
+        item.setIcon(icon)
+        if content_hash and not item.data(HASH_ROLE):
+            item.setData(HASH_ROLE, content_hash)
+            self.new_hashes.append((content_hash, item.data(Qt.UserRole)[0]))
+        if not self.pending:
+            self.save_hashes()
+
+    def save_hashes(self): # Record the content hashes worked out while loading
+        if self.new_hashes:
+            with self.db.cursor() as cur:
+                cur.executemany("UPDATE property_images SET content_hash = ? WHERE image_id = ?", self.new_hashes)
+            self.new_hashes = []
+
+    def done(self, result): # Closing the dialog skips the thumbnails still queued and the uploads not started yet
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel_event.set()
+            self.worker.wait()
+        self.on_screen.clear()
+        self.save_hashes()
+        super().done(result)
+
+    # Upload images to the property folder and store their paths in the database
+    # This method opens a file dialog to select images and adds them as one batch in the background
     def upload_image(self):
         file_dialog = QFileDialog(self)
         file_dialog.setFileMode(QFileDialog.ExistingFiles) # Allow multiple file selection
         file_dialog.setNameFilter("Images (*.png *.jpg *.jpeg *.bmp)")
-        if file_dialog.exec():
-            selected_files = file_dialog.selectedFiles()
-            for file_path in selected_files: # Iterate through the selected files
-                filename = os.path.basename(file_path)
-                # Create a unique file name using a timestamp.
-                dest_path = os.path.join(self.folder_path, f"{int(time.time())}_{filename}") # Create a unique file name
-                shutil.copy(file_path, dest_path) # Copy the selected file to the destination path
-                self.db.execute("""
-                    INSERT INTO property_images (property_id, image_path, uploaded_date)
-                    VALUES (?, ?, DATE('now'))
-                """, (self.property_id, dest_path)) # Insert the image path into the database
+        if not file_dialog.exec():
+            return
+        files = file_dialog.selectedFiles()
+        self.upload_button.setEnabled(False)
+
+        self.progress_dialog = QProgressDialog("Processing images...", "Cancel", 0, len(files), self)
+        self.progress_dialog.setWindowTitle("Uploading")
+        self.progress_dialog.setWindowModality(Qt.WindowModal)
+        self.progress_dialog.setMinimumDuration(300) # Only shown if the batch takes a moment
+
+        self.worker = ImageIngestWorker(self.ingest, self.property_id, self.folder_path, files, self)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.completed.connect(self.upload_finished)
+        self.progress_dialog.canceled.connect(self.worker.cancel_event.set)
+        self.worker.start()
+
+    def show_progress(self, done, total, filename): # Update the progress dialog as each image finishes
+        self.progress_dialog.setLabelText(f"Processed {filename} ({done} of {total})")
+        self.progress_dialog.setValue(done)
+
+    def upload_finished(self, results): # Show the new images and list any that couldn't be added
+        self.worker.wait()
+        self.progress_dialog.canceled.disconnect(self.worker.cancel_event.set)
+        self.progress_dialog.reset()
+        self.upload_button.setEnabled(True)
         self.load_images()
 
+        failed = [r for r in results if not r["ok"] and r["error"] != "Upload cancelled"]
+        if failed:
+            details = "\n".join(f"{os.path.basename(r['file_path'])}: {r['error']}" for r in failed)
+            QMessageBox.warning(self, "Upload Failed", f"{len(failed)} image(s) could not be added:\n{details}")
+
     # Delete the selected image from the list and the database
     # This method removes the selected image from the database and deletes it from the file system
     def delete_selected_image(self):
@@ -109,6 +268,7 @@ class ImagePickerDialog(QDialog): # This class inherits from QDialog to create a
             if os.path.exists(image_path):
                 os.remove(image_path)
             self.db.execute("DELETE FROM property_images WHERE image_id = ?", (image_id,))
+            self.icons.pop(image_path, None)
             self.load_images()
 
     # Preview the selected image in a dialog
@@ -119,9 +279,9 @@ class ImagePickerDialog(QDialog): # This class inherits from QDialog to create a
         preview_dialog.setWindowTitle("Image Preview")
         layout = QVBoxLayout()
         image_label = QLabel()
-        pixmap = QPixmap(image_path) # Load the image using QPixmap
-        image_label.setPixmap(pixmap.scaled(600, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)) 
-        # Scale the image to fit the dialog
+        # Decode at (about) the preview height instead of full size, then fit it to the dialog
+        pixmap = QPixmap.fromImage(decode_scaled(image_path, PREVIEW_SIZE.height()))
+        image_label.setPixmap(pixmap.scaled(PREVIEW_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation))
         layout.addWidget(image_label)
         preview_dialog.setLayout(layout)
         preview_dialog.exec()
@@ -1,5 +1,4 @@
 import os
-import webbrowser
 from PySide6.QtWidgets import (
     QLabel, QLineEdit, QComboBox, QPushButton, QListWidget, QListWidgetItem, QMessageBox, QDialog, QVBoxLayout
 )
@@ -10,14 +9,13 @@ from scripts.database_manager import DatabaseManager
 from scripts.document_manager import DocumentManager
 from scripts.document_picker_dialog import DocumentPickerDialog
 from scripts.utils.form_validator import FormValidator
-from scripts.utils.file_utils import cleanup_temp_preview_folder
-from scripts.utils.image_preview import TempImagePreview
+from scripts.utils.document_preview import preview_document
 
 
 # LandlordDetailsPage class to create a dialog for managing landlord details
 # This class inherits from BaseDetailsPage and provides a form for entering landlord information
 # It also allows for the upload, deletion, and previewing of documents associated with the landlord.
-# The documents are stored in a SQLite database and can be previewed in a temporary folder.
+# The documents are stored in a SQLite database and can be previewed without leaving decrypted copies on disk.
 
 class LandlordDetailsPage(BaseDetailsPage): # This class inherits from BaseDetailsPage to create a custom dialog
     def __init__(self, landlord_data=None, parent=None):
@@ -114,6 +112,7 @@ class LandlordDetailsPage(BaseDetailsPage): # This class inherits from BaseDetai
                     "UPDATE landlords SET first_name = ?, last_name = ?, email = ?, phone = ?, address = ?, status = ? WHERE landlord_id = ?",
                     (data["first_name"], data["last_name"], data["email"], data["phone"], data["address"], data["status"], self.landlord_id)
                 )
+                DocumentManager.invalidate_folder_name("landlord", self.landlord_id) # The name may have changed
             else:
                 cur.execute(
                     "INSERT INTO landlords (first_name, last_name, email, phone, address, status) VALUES (?, ?, ?, ?, ?, ?)",
@@ -171,19 +170,6 @@ class LandlordDetailsPage(BaseDetailsPage): # This class inherits from BaseDetai
             self.doc_manager.delete_document("landlord", self.landlord_id, filename)
             self.load_documents()
 
-    def preview_document(self, item): # Preview the selected document in a temporary folder
+    def preview_document(self, item): # Preview the selected document (images in memory, PDFs in the default viewer)
         filename = item.data(Qt.UserRole + 1)
-        # Get the path to the decrypted document
-        path = self.doc_manager.decrypt_document_to_temp("landlord", self.landlord_id, filename) 
-        if not path: # If the path is not valid, show an error message
-            return
-        if path.lower().endswith((".png", ".jpg", ".jpeg")): # Check if the file is an image
-            # Create a temporary preview dialog for the image
-            self.preview_image(path)
-        elif path.lower().endswith(".pdf"): # Check if the file is a PDF
-            # Open the PDF file in the default web browser
-            webbrowser.open(path)
-
-    def preview_image(self, path): # Open a temporary image preview dialog
-        dialog = TempImagePreview(path, self)
-        dialog.exec()
\ No newline at end of file
+        preview_document(self.doc_manager, "landlord", self.landlord_id, filename, self)
\ No newline at end of file
@@ -2,10 +2,7 @@ from PySide6.QtWidgets import QMessageBox, QDialog
 from scripts.base_manager import BaseManager
 from scripts.database_manager import DatabaseManager
 from scripts.landlord_details_page import LandlordDetailsPage
-import os
-import shutil
-import glob
-from config import LANDLORDS_DIR
+from scripts.storage_reconciler import remove_entity_folders
 
 
 # LandlordManager class to manage landlord data
@@ -14,6 +11,13 @@ from config import LANDLORDS_DIR
 # The landlords are stored in a SQLite database and can be searched by name, email, or phone number.
 
 class LandlordManager(BaseManager): # This class inherits from BaseManager to create a custom table view
+    # Server-side paging: one column (or None) per table column, plus the search fields
+    sort_columns = ["name", "email", "phone", "status"]
+    key_column = "landlord_id"
+    default_sort = ("name", False)
+    search_columns = ["name", "email", "phone"]
+    search_index = "landlords"
+
     def __init__(self, parent=None):
         self.db = DatabaseManager()
         super().__init__(
@@ -22,35 +26,20 @@ class LandlordManager(BaseManager): # This class inherits from BaseManager to cr
             columns=["Name", "Email", "Phone", "Status"],
             parent=parent
         )
-        self.load_data()
+        self.load_data_async() # Rows arrive from a search worker
 
-    def get_data(self): # Fetch landlord data from the database
-        query = """
+    def get_query(self): # SQL for the landlord table, paged and sorted by BaseManager
+        return """
             SELECT
                 landlord_id,
                 first_name,
                 last_name,
                 email,
                 phone,
-                status
+                status,
+                first_name || ' ' || last_name AS name
             FROM landlords
-            ORDER BY first_name, last_name
-        """
-        with self.db.cursor() as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
-        landlords = []
-        for row in rows:
-            landlords.append({
-                "landlord_id": row[0],
-                "first_name":  row[1],
-                "last_name":   row[2],
-                "email":       row[3],
-                "phone":       row[4],
-                "status":      row[5],
-                "name":        f"{row[1]} {row[2]}"
-            })
-        return landlords
+        """, ()
 
     def extract_row_values(self, item): # Extract values from the landlord item for display in the table
         return [
@@ -74,9 +63,7 @@ class LandlordManager(BaseManager): # This class inherits from BaseManager to cr
                 (landlord_id,)
             )
         # Clean up folder in resources\landlords
-        # Checks if the folder exists before attempting to delete it
-        pattern = os.path.join(LANDLORDS_DIR, f"{landlord_id}_*")
-        for folder in glob.glob(pattern):
-            shutil.rmtree(folder, ignore_errors=True)
+        # The folder and its contents are deleted in the background
+        remove_entity_folders("landlord", landlord_id)
 
         self.load_data()
\ No newline at end of file
@@ -9,6 +9,12 @@ from scripts.maintenance_details_page import MaintenanceDetailsPage
 # The maintenance requests are stored in a SQLite database and can be filtered based on their status.
 
 class MaintenanceManager(BaseManager): # This class inherits from BaseManager to create a custom table view
+    # Server-side paging: one column (or None) per table column, plus the search fields
+    sort_columns = ["address", "issue", "date_reported", "status"]
+    key_column = "maintenance_id"
+    default_sort = ("date_reported", True)
+    search_columns = ["issue", "status", "address"]
+
     def __init__(self, filter_unresolved=False, parent=None):
         self.db = DatabaseManager() # Database manager instance
         self.filter_unresolved = filter_unresolved # Flag to filter unresolved maintenance requests
@@ -19,9 +25,9 @@ class MaintenanceManager(BaseManager): # This class inherits from BaseManager to
             columns=["Property", "Issue", "Reported", "Status"],
             parent=parent
         )
-        self.load_data()
+        self.load_data_async() # Rows arrive from a search worker
 
-    def get_data(self): # Fetch maintenance data from the database
+    def get_query(self): # SQL for the maintenance table, paged and sorted by BaseManager
         base_query = """
             SELECT 
                 m.maintenance_id,
@@ -38,14 +44,7 @@ class MaintenanceManager(BaseManager): # This class inherits from BaseManager to
         if self.filter_unresolved: # If the filter_unresolved flag is set, filter out resolved and voided maintenance requests
             base_query += " WHERE LOWER(m.status) NOT IN ('resolved', 'voided')"
 
-        base_query += " ORDER BY m.date_reported DESC"
-
-        rows = self.db.execute(base_query, fetchall=True)
-        col_names = [
-            "maintenance_id", "property_id", "address", "issue",
-            "description", "date_reported", "status"
-        ]
-        return [dict(zip(col_names, row)) for row in rows]
+        return base_query, ()
 
     def extract_row_values(self, item): # Extract values from the maintenance item for display in the table
         return [
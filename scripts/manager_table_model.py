@@ -0,0 +1,78 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+# ManagerTableModel class backing the virtual (infinite scroll) manager tables
+# Rows are fetched from the manager's get_query() in batches as the user scrolls:
+# QTableView calls canFetchMore()/fetchMore() when it reaches the end of the loaded rows,
+# and only asks data() for the cells in the visible viewport. Display values are worked
+# out once per row when a batch arrives, so repainting never touches the database.
+
+class ManagerTableModel(QAbstractTableModel):
+    def __init__(self, manager, columns, batch_size=200, parent=None):
+        super().__init__(parent)
+        self.manager = manager # BaseManager that owns the query, sort and search state
+        self.columns = columns # Header labels
+        self.batch_size = batch_size # Rows fetched per scroll step
+        self.rows = [] # Loaded row dictionaries
+        self.values = [] # Display strings for each loaded row
+        self.exhausted = False # True once the last batch came back short
+
+    # === Qt model interface === #
+    def rowCount(self, parent=QModelIndex()): # Number of rows loaded so far
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()): # Number of table columns
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole): # Display text for a visible cell
+        if role == Qt.DisplayRole and index.isValid():
+            return self.values[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole): # Column labels and row numbers
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section] if section < len(self.columns) else None
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()): # More rows are waiting in the database
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()): # Load the next batch after the last loaded row
+        if parent.isValid() or self.exhausted:
+            return
+        # Ask for one extra row to find out whether this is the last batch
+        self.append_batch(self.manager.fetch_more_rows(self.rows, self.batch_size + 1))
+
+    def append_batch(self, batch): # Add a fetched batch (batch_size + 1 rows at most) to the model
+        if len(batch) > self.batch_size:
+            batch = batch[:self.batch_size]
+        else:
+            self.exhausted = True
+        if batch:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+            self.rows.extend(batch)
+            self.values.extend(
+                [str(value) for value in self.manager.extract_row_values(row)] for row in batch
+            )
+            self.endInsertRows()
+
+    # === Helpers === #
+    def reload(self, first_batch=None): # Drop the loaded rows and start again from the first batch
+        # first_batch can hold rows already fetched elsewhere (e.g. by a search worker)
+        self.beginResetModel()
+        self.rows = []
+        self.values = []
+        self.exhausted = False
+        self.endResetModel()
+        if first_batch is not None:
+            self.append_batch(first_batch)
+        else:
+            self.fetchMore() # Fill the first screen straight away
+
+    def row_item(self, row): # Return the data item for a model row, or None
+        if 0 <= row < len(self.rows):
+            return self.rows[row]
+        return None
@@ -0,0 +1,125 @@
+import os
+import re
+import time
+import datetime
+import importlib.util
+
+# Folder holding the numbered migration scripts (e.g. 0003_add_fts.py)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+# Rough cost of rewriting or indexing one row, used by the dry-run estimate.
+# A migration can override it with its own COST_PER_ROW.
+DEFAULT_COST_PER_ROW = 0.000002 # Seconds per row
+
+class MigrationError(Exception): # Raised when a migration fails and has been rolled back
+    pass
+
+# MigrationManager class to bring a database up to the latest schema version
+# Migrations are numbered scripts in scripts/migrations. Each one defines DESCRIPTION,
+# TABLES (the tables whose size affects its run time) and an upgrade(cur) function.
+# Applied versions are recorded in the schema_version table. Each migration runs in its
+# own transaction and is rolled back completely if it fails, so a database is never left
+# half-migrated. A dry run lists the pending migrations with an estimated duration based
+# on the row counts of the tables they touch.
+#
+# Migrations must only use cur.execute(); executescript() commits implicitly and would
+# break the rollback.
+
+class MigrationManager:
+    def __init__(self, conn, migrations_dir=MIGRATIONS_DIR):
+        self.conn = conn
+        self.migrations_dir = migrations_dir
+
+    def ensure_version_table(self): # Create the schema_version table if it is missing
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version     INTEGER PRIMARY KEY,
+                name        TEXT,
+                applied_at  TEXT,
+                duration_ms REAL
+            )
+        """)
+        self.conn.commit()
+
+    def discover(self): # Load every migration script, ordered by version number
+        migrations = []
+        for filename in sorted(os.listdir(self.migrations_dir)):
+            match = MIGRATION_FILE.match(filename)
+            if not match:
+                continue
+            path = os.path.join(self.migrations_dir, filename)
+            spec = importlib.util.spec_from_file_location(f"migration_{match.group(1)}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            migrations.append((int(match.group(1)), filename[:-3], module))
+        return migrations
+
+    def applied_versions(self): # Versions already recorded in schema_version
+        # Read-only, so a dry run never creates the version table
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'").fetchone():
+            return set()
+        return {row[0] for row in self.conn.execute("SELECT version FROM schema_version")}
+
+    def current_version(self): # Highest applied version (0 for a brand-new database)
+        return max(self.applied_versions(), default=0)
+
+    def pending(self): # Migrations that have not been applied yet
+        applied = self.applied_versions()
+        return [m for m in self.discover() if m[0] not in applied]
+
+    def estimate(self, module): # Estimate how long a migration will take, from table sizes
+        existing = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        rows = {}
+        for table in getattr(module, "TABLES", []):
+            rows[table] = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] if table in existing else 0
+        seconds = sum(rows.values()) * getattr(module, "COST_PER_ROW", DEFAULT_COST_PER_ROW)
+        return seconds, rows
+
+    def apply(self, dry_run=False): # Apply (or, with dry_run, just describe) every pending migration
+        pending = self.pending()
+        if not pending:
+            print(f"[Migrations] Schema is up to date (version {self.current_version()}).")
+            return []
+
+        if not dry_run:
+            self.ensure_version_table()
+
+        applied = []
+        for version, name, module in pending:
+            if dry_run: # Describe the migration and its expected duration without running it
+                seconds, rows = self.estimate(module)
+                print(f"[Migrations] Would apply {name}: {module.DESCRIPTION} (~{seconds:.2f}s)")
+                for table, count in rows.items():
+                    if count:
+                        print(f"              {table}: {count:,} rows")
+                applied.append(name)
+                continue
+
+            start = time.perf_counter()
+            try:
+                self.conn.execute("BEGIN IMMEDIATE") # Take the write lock for the whole migration
+                # Another process may have applied it while we waited for the lock
+                if self.conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                    self.conn.rollback()
+                    continue
+
+                cur = self.conn.cursor()
+                module.upgrade(cur)
+                duration_ms = (time.perf_counter() - start) * 1000
+                cur.execute(
+                    "INSERT INTO schema_version (version, name, applied_at, duration_ms) VALUES (?, ?, ?, ?)",
+                    (version, name, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), duration_ms)
+                )
+                self.conn.commit()
+                cur.close()
+
+            except Exception as e: # Roll the whole migration back and stop
+                self.conn.rollback()
+                print(f"[Migrations] {name} failed and was rolled back: {e}")
+                raise MigrationError(f"{name}: {e}") from e
+
+            print(f"[Migrations] Applied {name} in {duration_ms:.0f} ms")
+            applied.append(name)
+
+        return applied
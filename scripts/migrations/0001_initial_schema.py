@@ -0,0 +1,180 @@
+# Migration 0001: initial schema
+# Creates the original STAR PMK tables. Every statement uses IF NOT EXISTS, so this
+# migration is also how databases created before the migration engine get adopted:
+# their tables are left untouched and version 1 is simply recorded.
+
+DESCRIPTION = "Initial schema"
+TABLES = [] # Tables whose size affects the run time (none: it only creates tables)
+
+SCHEMA = {
+    "users": """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+            username    TEXT    UNIQUE NOT NULL,
+            password    TEXT    NOT NULL,
+            is_admin    INTEGER NOT NULL DEFAULT 0
+        );
+    """,
+    "activity_logs": """
+        CREATE TABLE IF NOT EXISTS activity_logs (
+            log_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            user        TEXT,
+            action      TEXT,
+            details     TEXT,
+            timestamp   TEXT,
+            FOREIGN KEY (user) REFERENCES users(username) ON DELETE SET NULL
+        );
+    """,
+    "landlords": """
+        CREATE TABLE IF NOT EXISTS landlords (
+            landlord_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name  TEXT,
+            last_name   TEXT,
+            email       TEXT,
+            phone       TEXT,
+            address     TEXT,
+            status      TEXT
+        );
+    """,
+    "landlord_documents": """
+        CREATE TABLE IF NOT EXISTS landlord_documents (
+            doc_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            landlord_id INTEGER,
+            doc_type    TEXT,
+            doc_name    TEXT,
+            file_path   TEXT,
+            uploaded_date TEXT,
+            expiry_date TEXT,
+            FOREIGN KEY (landlord_id) REFERENCES landlords (landlord_id) ON DELETE CASCADE
+        );
+    """,
+    "properties": """
+        CREATE TABLE IF NOT EXISTS properties (
+            property_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            door_number TEXT,
+            street      TEXT,
+            postcode    TEXT,
+            area        TEXT,
+            city        TEXT,
+            bedrooms    INTEGER,
+            property_type TEXT,
+            price       REAL,
+            availability_date TEXT,
+            landlord_id INTEGER,
+            image_path  TEXT,
+            status      TEXT,
+            notes       TEXT,
+            FOREIGN KEY (landlord_id) REFERENCES landlords (landlord_id) ON DELETE SET NULL
+        );
+    """,
+    "property_images": """
+        CREATE TABLE IF NOT EXISTS property_images (
+            image_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            property_id   INTEGER,
+            image_path    TEXT,
+            uploaded_date TEXT,
+            FOREIGN KEY (property_id) REFERENCES properties(property_id) ON DELETE CASCADE
+        );
+    """,
+    "property_documents": """
+        CREATE TABLE IF NOT EXISTS property_documents (
+            doc_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            property_id INTEGER,
+            doc_type    TEXT,
+            doc_name    TEXT,
+            file_path   TEXT,
+            uploaded_date TEXT,
+            expiry_date TEXT,
+            FOREIGN KEY (property_id) REFERENCES properties (property_id) ON DELETE CASCADE
+        );
+    """,
+    "tenants": """
+        CREATE TABLE IF NOT EXISTS tenants (
+            tenant_id   INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name  TEXT,
+            last_name   TEXT,
+            email       TEXT,
+            phone       TEXT,
+            date_of_birth TEXT,
+            nationality TEXT,
+            emergency_contact TEXT,
+            status      TEXT
+        );
+    """,
+    "tenant_documents": """
+        CREATE TABLE IF NOT EXISTS tenant_documents (
+            doc_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            tenant_id   INTEGER,
+            doc_type    TEXT,
+            doc_name    TEXT,
+            file_path   TEXT,
+            uploaded_date TEXT,
+            expiry_date TEXT,
+            FOREIGN KEY (tenant_id) REFERENCES tenants (tenant_id) ON DELETE CASCADE
+        );
+    """,
+    "tenancies": """
+        CREATE TABLE IF NOT EXISTS tenancies (
+            tenancy_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            property_id     INTEGER,
+            start_date      TEXT,
+            end_date        TEXT,
+            rent_amount     REAL,
+            deposit_amount  REAL,
+            status          TEXT,
+            FOREIGN KEY (property_id) REFERENCES properties(property_id) ON DELETE CASCADE
+        );
+    """,
+    "tenancy_tenants": """
+        CREATE TABLE IF NOT EXISTS tenancy_tenants (
+            tenancy_id    INTEGER,
+            tenant_id     INTEGER,
+            PRIMARY KEY (tenancy_id, tenant_id),
+            FOREIGN KEY (tenancy_id) REFERENCES tenancies(tenancy_id) ON DELETE CASCADE,
+            FOREIGN KEY (tenant_id) REFERENCES tenants(tenant_id) ON DELETE CASCADE
+        );
+    """,
+    "tenancy_documents": """
+        CREATE TABLE IF NOT EXISTS tenancy_documents (
+            doc_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            tenancy_id  INTEGER,
+            doc_type    TEXT,
+            doc_name    TEXT,
+            file_path   TEXT,
+            uploaded_date TEXT,
+            expiry_date TEXT,
+            FOREIGN KEY (tenancy_id) REFERENCES tenancies(tenancy_id) ON DELETE CASCADE
+        );
+    """,
+    "payments": """
+        CREATE TABLE IF NOT EXISTS payments (
+            payment_id  INTEGER PRIMARY KEY AUTOINCREMENT,
+            tenancy_id  INTEGER,
+            tenant_id   INTEGER,
+            payment_date TEXT,
+            due_date    TEXT,
+            amount      REAL,
+            method      TEXT,
+            status      TEXT,
+            payment_type TEXT,
+            notes       TEXT,
+            FOREIGN KEY (tenancy_id) REFERENCES tenancies (tenancy_id) ON DELETE CASCADE,
+            FOREIGN KEY (tenant_id) REFERENCES tenants (tenant_id) ON DELETE CASCADE
+        );
+    """,
+    "maintenance": """
+        CREATE TABLE IF NOT EXISTS maintenance (
+            maintenance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            property_id INTEGER,
+            issue       TEXT,
+            description TEXT,
+            date_reported TEXT,
+            status      TEXT,
+            FOREIGN KEY (property_id) REFERENCES properties(property_id) ON DELETE CASCADE
+        );
+    """,
+}
+
+def upgrade(cur): # Create every table that does not exist yet
+    for name, ddl in SCHEMA.items():
+        cur.execute(ddl)
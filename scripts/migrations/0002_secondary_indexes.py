@@ -0,0 +1,17 @@
+from scripts.utils.db_indexes import INDEXES
+
+# Migration 0002: secondary indexes
+# Adds the foreign-key and filter-column indexes from scripts/utils/db_indexes.py.
+# Building an index reads the whole table, so the run time grows with these tables.
+
+DESCRIPTION = "Secondary indexes for foreign keys and filter columns"
+COST_PER_ROW = 0.000004 # Several indexes are built per table
+TABLES = [ # Tables whose size affects the run time
+    "tenancy_tenants", "tenancies", "properties", "property_images", "payments",
+    "maintenance", "landlords", "activity_logs", "tenant_documents",
+    "landlord_documents", "property_documents", "tenancy_documents",
+]
+
+def upgrade(cur): # Create every index that does not exist yet
+    for name, ddl in INDEXES.items():
+        cur.execute(ddl)
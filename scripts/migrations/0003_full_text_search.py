@@ -0,0 +1,164 @@
+import sqlite3
+
+# Migration 0003: full-text search
+# Adds FTS5 indexes for the manager and picker search boxes. Tenants, landlords and
+# properties use external-content tables over their own columns. Tenancies and payments
+# are searched by tenant name and property address, so their indexes hold those derived
+# values and are refreshed by triggers on every table they come from.
+# If this SQLite build has no FTS5 module the indexes are skipped, and search_service
+# falls back to LIKE matching.
+
+DESCRIPTION = "FTS5 search indexes kept in sync by triggers"
+COST_PER_ROW = 0.000010 # Every row is tokenised into the new index
+TABLES = ["tenants", "landlords", "properties", "tenancies", "payments"] # Tables whose size affects the run time
+
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+# External-content indexes: table -> (fts table, key column, indexed columns)
+CONTENT_INDEXES = {
+    "tenants":    ("tenants_fts", "tenant_id", ["first_name", "last_name", "email", "phone", "status"]),
+    "landlords":  ("landlords_fts", "landlord_id", ["first_name", "last_name", "email", "phone", "status"]),
+    "properties": ("properties_fts", "property_id", [
+        "door_number", "street", "postcode", "area", "city", "property_type", "status"
+    ]),
+}
+
+# Rows for the derived indexes, filtered by the WHERE clause the triggers add
+TENANCY_ROWS = """
+    SELECT tn.tenancy_id,
+           COALESCE(GROUP_CONCAT(t.first_name || ' ' || t.last_name, ', '), ''),
+           COALESCE(p.door_number || ' ' || p.street || ', ' || p.postcode, ''),
+           tn.status
+    FROM tenancies tn
+    LEFT JOIN tenancy_tenants tt ON tn.tenancy_id = tt.tenancy_id
+    LEFT JOIN tenants t ON tt.tenant_id = t.tenant_id
+    LEFT JOIN properties p ON tn.property_id = p.property_id
+    WHERE {where}
+    GROUP BY tn.tenancy_id
+"""
+
+PAYMENT_ROWS = """
+    SELECT p.payment_id, COALESCE(t.first_name || ' ' || t.last_name, ''),
+           p.payment_type, p.status, p.method
+    FROM payments p
+    LEFT JOIN tenants t ON p.tenant_id = t.tenant_id
+    WHERE {where}
+"""
+
+def refresh_tenancies(where): # Trigger body that re-indexes the tenancies matching where
+    return f"""
+        DELETE FROM tenancies_fts WHERE rowid IN (SELECT tn.tenancy_id FROM tenancies tn WHERE {where});
+        INSERT INTO tenancies_fts (rowid, tenant_names, property_address, status)
+        {TENANCY_ROWS.format(where=where)};
+    """
+
+def refresh_payments(where): # Trigger body that re-indexes the payments matching where
+    return f"""
+        DELETE FROM payments_fts WHERE rowid IN (SELECT p.payment_id FROM payments p WHERE {where});
+        INSERT INTO payments_fts (rowid, tenant_name, payment_type, status, method)
+        {PAYMENT_ROWS.format(where=where)};
+    """
+
+def content_triggers(table, fts, key, columns): # Standard insert/update/delete sync for an external-content index
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts} (rowid, {cols}) VALUES (new.{key}, {new});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old});
+            INSERT INTO {fts} (rowid, {cols}) VALUES (new.{key}, {new});
+        END""",
+    ]
+
+def derived_triggers(): # Triggers keeping the tenancy and payment indexes in step with their sources
+    return [
+        # Tenancies
+        f"""CREATE TRIGGER IF NOT EXISTS tenancies_fts_ai AFTER INSERT ON tenancies BEGIN
+            {refresh_tenancies("tn.tenancy_id = new.tenancy_id")}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS tenancies_fts_au AFTER UPDATE ON tenancies BEGIN
+            DELETE FROM tenancies_fts WHERE rowid = old.tenancy_id;
+            {refresh_tenancies("tn.tenancy_id = new.tenancy_id")}
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS tenancies_fts_ad AFTER DELETE ON tenancies BEGIN
+            DELETE FROM tenancies_fts WHERE rowid = old.tenancy_id;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS tenancy_tenants_fts_ai AFTER INSERT ON tenancy_tenants BEGIN
+            {refresh_tenancies("tn.tenancy_id = new.tenancy_id")}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS tenancy_tenants_fts_ad AFTER DELETE ON tenancy_tenants BEGIN
+            {refresh_tenancies("tn.tenancy_id = old.tenancy_id")}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS properties_tenancies_fts_au
+            AFTER UPDATE OF door_number, street, postcode ON properties BEGIN
+            {refresh_tenancies("tn.property_id = new.property_id")}
+        END""",
+
+        # Payments
+        f"""CREATE TRIGGER IF NOT EXISTS payments_fts_ai AFTER INSERT ON payments BEGIN
+            {refresh_payments("p.payment_id = new.payment_id")}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS payments_fts_au AFTER UPDATE ON payments BEGIN
+            DELETE FROM payments_fts WHERE rowid = old.payment_id;
+            {refresh_payments("p.payment_id = new.payment_id")}
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS payments_fts_ad AFTER DELETE ON payments BEGIN
+            DELETE FROM payments_fts WHERE rowid = old.payment_id;
+        END""",
+
+        # Tenant renames show up in both derived indexes
+        f"""CREATE TRIGGER IF NOT EXISTS tenants_derived_fts_au
+            AFTER UPDATE OF first_name, last_name ON tenants BEGIN
+            {refresh_tenancies("tn.tenancy_id IN (SELECT tenancy_id FROM tenancy_tenants WHERE tenant_id = new.tenant_id)")}
+            {refresh_payments("p.tenant_id = new.tenant_id")}
+        END""",
+    ]
+
+def fts5_available(cur): # True if this SQLite build includes the FTS5 module
+    try:
+        cur.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        cur.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def upgrade(cur): # Create the indexes and triggers, then fill the indexes from the existing rows
+    if not fts5_available(cur):
+        print("[Migrations] FTS5 is not available in this SQLite build, search will use LIKE.")
+        return
+
+    for table, (fts, key, columns) in CONTENT_INDEXES.items():
+        cur.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {", ".join(columns)},
+                content='{table}', content_rowid='{key}',
+                tokenize='{TOKENIZER}', prefix='1 2 3 4 5 6'
+            )
+        """)
+        for trigger in content_triggers(table, fts, key, columns):
+            cur.execute(trigger)
+        cur.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')") # Index the rows already in the table
+
+    cur.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tenancies_fts USING fts5(
+            tenant_names, property_address, status, tokenize='{TOKENIZER}', prefix='1 2 3 4 5 6'
+        )
+    """)
+    cur.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS payments_fts USING fts5(
+            tenant_name, payment_type, status, method, tokenize='{TOKENIZER}', prefix='1 2 3 4 5 6'
+        )
+    """)
+    for trigger in derived_triggers():
+        cur.execute(trigger)
+
+    cur.execute("DELETE FROM tenancies_fts")
+    cur.execute(f"INSERT INTO tenancies_fts (rowid, tenant_names, property_address, status) {TENANCY_ROWS.format(where='1')}")
+    cur.execute("DELETE FROM payments_fts")
+    cur.execute(f"INSERT INTO payments_fts (rowid, tenant_name, payment_type, status, method) {PAYMENT_ROWS.format(where='1')}")
@@ -0,0 +1,107 @@
+# Migration 0004: materialised dashboard counters
+# Adds a one-row dashboard_stats table holding every figure on the dashboard, kept up
+# to date by triggers, so opening the dashboard reads one row instead of counting tables.
+# Date-relative counters ("next 30 days", "overdue", "vacant today") are anchored on
+# the stored computed_on date: the triggers judge every row against that date, and
+# DashboardStatsService recomputes the whole row once computed_on is no longer today.
+# computed_on starts out NULL, so the first dashboard load fills the table in.
+
+DESCRIPTION = "Trigger-maintained dashboard_stats summary table"
+TABLES = [] # The counters are filled in by the first dashboard load, not here
+
+ANCHOR = "dashboard_stats.computed_on" # The date the date-relative counters are correct for
+HORIZON = f"DATE({ANCHOR}, '+30 day')"
+
+# table -> (columns whose updates can change a counter, [(counter, condition on {row})])
+COUNTERS = {
+    "properties": ([], [("total_properties", "1")]),
+    "tenants": ([], [("total_tenants", "1")]),
+    "payments": (["payment_type", "status", "due_date"], [
+        ("rent_due", f"{{row}}.payment_type = 'rent' AND {{row}}.due_date BETWEEN {ANCHOR} AND {HORIZON}"),
+        ("overdue_payments", f"{{row}}.status = 'unpaid' AND {{row}}.due_date < {ANCHOR}"),
+    ]),
+    "maintenance": (["status"], [
+        ("outstanding_maintenance", "LOWER({row}.status) NOT IN ('resolved', 'voided')"),
+        ("unresolved_maintenance", "LOWER({row}.status) NOT IN ('resolved', 'closed')"),
+    ]),
+    "tenancies": (["property_id", "start_date", "end_date"], [
+        ("ending_soon", f"{{row}}.end_date <= {HORIZON}"),
+    ]),
+    "tenant_documents": (["expiry_date"], [("expiring_documents", f"{{row}}.expiry_date <= {HORIZON}")]),
+    "landlord_documents": (["expiry_date"], [("expiring_documents", f"{{row}}.expiry_date <= {HORIZON}")]),
+    "property_documents": (["expiry_date"], [("expiring_documents", f"{{row}}.expiry_date <= {HORIZON}")]),
+    "tenancy_documents": (["expiry_date"], [("expiring_documents", f"{{row}}.expiry_date <= {HORIZON}")]),
+}
+
+def flag(condition): # 1 if condition holds, else 0 (NULL comparisons count as 0)
+    return f"(CASE WHEN {condition} THEN 1 ELSE 0 END)"
+
+def occupied(property_id, except_tenancy=None): # A tenancy on the property is active on the anchor date
+    condition = f"t.property_id = {property_id} AND {ANCHOR} BETWEEN t.start_date AND t.end_date"
+    if except_tenancy:
+        condition += f" AND t.tenancy_id != {except_tenancy}"
+    return f"EXISTS (SELECT 1 FROM tenancies t WHERE {condition})"
+
+def active(row): # The tenancy row is active on the anchor date
+    return f"{row}.property_id IS NOT NULL AND {ANCHOR} BETWEEN {row}.start_date AND {row}.end_date"
+
+# Vacant properties: how each write changes the number of properties with no active tenancy.
+# An update is treated as removing the old row and then adding the new one. When a property
+# is deleted its tenancies are cascaded first, so the last active one adds the property back
+# as vacant and the property delete then takes it away again.
+VACANCY = {
+    ("properties", "INSERT"): f"+ {flag('NOT ' + occupied('new.property_id'))}",
+    ("properties", "DELETE"): f"- {flag('NOT ' + occupied('old.property_id'))}",
+    ("tenancies", "INSERT"): f"- {flag(active('new') + ' AND NOT ' + occupied('new.property_id', 'new.tenancy_id'))}",
+    ("tenancies", "DELETE"): f"+ {flag(active('old') + ' AND NOT ' + occupied('old.property_id'))}",
+    ("tenancies", "UPDATE"): (
+        f"+ {flag(active('old') + ' AND NOT ' + occupied('old.property_id', 'new.tenancy_id'))}"
+        f" - {flag(active('new') + ' AND NOT ' + occupied('new.property_id', 'new.tenancy_id'))}"
+    ),
+}
+
+def counter_triggers(table, watched, counters): # Insert/delete/update triggers adjusting the counters for table
+    events = {
+        "INSERT": ("ai", "AFTER INSERT", lambda cond: f"+ {flag(cond.format(row='new'))}"),
+        "DELETE": ("ad", "AFTER DELETE", lambda cond: f"- {flag(cond.format(row='old'))}"),
+    }
+    if watched: # Tables whose counted values can change in place
+        events["UPDATE"] = ("au", f"AFTER UPDATE OF {', '.join(watched)}",
+                            lambda cond: f"+ {flag(cond.format(row='new'))} - {flag(cond.format(row='old'))}")
+
+    triggers = []
+    for event, (suffix, timing, delta) in events.items():
+        changes = {}
+        for counter, condition in counters:
+            changes.setdefault(counter, []).append(delta(condition))
+        if (table, event) in VACANCY:
+            changes["vacant_properties"] = [VACANCY[(table, event)]]
+        assignments = ",\n                ".join(f"{counter} = {counter} {' '.join(parts)}" for counter, parts in changes.items())
+        triggers.append(f"""CREATE TRIGGER IF NOT EXISTS dashboard_stats_{table}_{suffix} {timing} ON {table} BEGIN
+            UPDATE dashboard_stats SET
+                {assignments}
+            WHERE id = 1;
+        END""")
+    return triggers
+
+def upgrade(cur): # Create the summary row and the triggers that maintain it
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dashboard_stats (
+            id                      INTEGER PRIMARY KEY CHECK (id = 1),
+            total_properties        INTEGER DEFAULT 0,
+            total_tenants           INTEGER DEFAULT 0,
+            rent_due                INTEGER DEFAULT 0,
+            outstanding_maintenance INTEGER DEFAULT 0,
+            unresolved_maintenance  INTEGER DEFAULT 0,
+            vacant_properties       INTEGER DEFAULT 0,
+            ending_soon             INTEGER DEFAULT 0,
+            overdue_payments        INTEGER DEFAULT 0,
+            expiring_documents      INTEGER DEFAULT 0,
+            computed_on             TEXT
+        )
+    """)
+    cur.execute("INSERT OR IGNORE INTO dashboard_stats (id) VALUES (1)")
+
+    for table, (watched, counters) in COUNTERS.items():
+        for trigger in counter_triggers(table, watched, counters):
+            cur.execute(trigger)
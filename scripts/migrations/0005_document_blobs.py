@@ -0,0 +1,47 @@
+# Migration 0005: content-addressed document blobs
+# Adds the document_blobs table (one row per distinct encrypted document in BLOBS_DIR) and a
+# blob_hash column on every *_documents table. Triggers keep document_blobs.ref_count equal to
+# the number of document rows using each blob, including rows removed by a cascade (e.g. when
+# a tenant is deleted), so blobs nothing uses any more are found through a small partial index.
+# Existing documents keep a NULL blob_hash and stay in their per-entity folders.
+
+DESCRIPTION = "Deduplicated document blobs with reference counts"
+COST_PER_ROW = 0.000004 # The blob_hash indexes are built over every document row
+TABLES = ["tenant_documents", "landlord_documents", "property_documents", "tenancy_documents"]
+
+def blob_triggers(table): # Keep ref_count in step with the rows of table that point at a blob
+    adjust = "UPDATE document_blobs SET ref_count = ref_count {delta} WHERE blob_hash = {row}.blob_hash;"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS document_blobs_{table}_ai AFTER INSERT ON {table}
+        WHEN new.blob_hash IS NOT NULL BEGIN
+            {adjust.format(delta="+ 1", row="new")}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS document_blobs_{table}_ad AFTER DELETE ON {table}
+        WHEN old.blob_hash IS NOT NULL BEGIN
+            {adjust.format(delta="- 1", row="old")}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS document_blobs_{table}_au AFTER UPDATE OF blob_hash ON {table}
+        WHEN old.blob_hash IS NOT new.blob_hash BEGIN
+            {adjust.format(delta="- 1", row="old")}
+            {adjust.format(delta="+ 1", row="new")}
+        END""",
+    ]
+
+def upgrade(cur): # Create the blob table, the blob_hash columns and the reference-counting triggers
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS document_blobs (
+            blob_hash   TEXT PRIMARY KEY,
+            size        INTEGER,
+            ref_count   INTEGER NOT NULL DEFAULT 0,
+            created_at  TEXT
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_document_blobs_unused ON document_blobs (blob_hash) WHERE ref_count <= 0")
+
+    for table in TABLES:
+        columns = {row[1] for row in cur.execute(f"PRAGMA table_info({table})").fetchall()}
+        if "blob_hash" not in columns:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN blob_hash TEXT REFERENCES document_blobs (blob_hash)")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_blob ON {table} (blob_hash)")
+        for trigger in blob_triggers(table):
+            cur.execute(trigger)
@@ -0,0 +1,35 @@
+from scripts.utils.file_utils import entity_folder_name
+
+# Migration 0006: stored document folders
+# Adds a folder_path column to every *_documents table: the folder, under the entity type's
+# storage path, that the encrypted file was saved in. DocumentManager then finds a document's
+# file from its own row, so renaming a tenant or changing an address no longer loses track of
+# files saved under the old folder name. Rows already stored in entity folders are filled in
+# from the current names; deduplicated rows (blob_hash set) live in the blob store instead.
+
+DESCRIPTION = "Folder path stored on document rows"
+COST_PER_ROW = 0.000010 # Every existing entity-folder document is updated
+TABLES = ["tenant_documents", "landlord_documents", "property_documents", "tenancy_documents"]
+
+# table -> (owner column, owner table, SQL for the name its folder is built from), as DocumentManager had them
+FOLDER_NAMES = {
+    "tenant_documents": ("tenant_id", "tenants", "first_name || ' ' || last_name"),
+    "landlord_documents": ("landlord_id", "landlords", "first_name || ' ' || last_name"),
+    "property_documents": ("property_id", "properties", "door_number || ' ' || street || ', ' || postcode"),
+    "tenancy_documents": ("tenancy_id", "tenancies", "start_date || '_' || (SELECT door_number || '_' || street || '_' || postcode FROM properties WHERE properties.property_id = tenancies.property_id)"),
+}
+
+def upgrade(cur): # Add the column and record the folder of every existing entity-folder document
+    for table, (id_field, name_table, name_sql) in FOLDER_NAMES.items():
+        columns = {row[1] for row in cur.execute(f"PRAGMA table_info({table})").fetchall()}
+        if "folder_path" not in columns:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN folder_path TEXT")
+
+        rows = cur.execute(f"""
+            SELECT d.doc_id, d.{id_field},
+                   (SELECT {name_sql} FROM {name_table} WHERE {name_table}.{id_field} = d.{id_field})
+            FROM {table} d
+            WHERE d.folder_path IS NULL AND d.blob_hash IS NULL AND d.{id_field} IS NOT NULL
+        """).fetchall()
+        cur.executemany(f"UPDATE {table} SET folder_path = ? WHERE doc_id = ?",
+                        [(entity_folder_name(owner, name), doc_id) for doc_id, owner, name in rows])
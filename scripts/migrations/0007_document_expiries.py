@@ -0,0 +1,22 @@
+# Migration 0007: unified document expiry view
+# Adds document_expiries, every dated document from the four *_documents tables in one view.
+# Each arm is read through its expiry_date index (0002_secondary_indexes), so a query ordered by
+# (expiry_date, doc_id, entity_type) is answered by merging four index scans and a page of the
+# soonest-expiring documents reads only the rows on that page (see scripts/expiry_scanner.py).
+
+DESCRIPTION = "Unified view of document expiry dates"
+TABLES = [] # A view costs nothing to create
+
+# entity type -> owner column of its documents table
+OWNERS = {"tenant": "tenant_id", "landlord": "landlord_id", "property": "property_id", "tenancy": "tenancy_id"}
+
+def upgrade(cur): # Create the view
+    arms = "\n        UNION ALL\n        ".join(
+        f"SELECT '{entity_type}' AS entity_type, {owner} AS entity_id, doc_id, doc_name, doc_type, file_path, expiry_date "
+        f"FROM {entity_type}_documents WHERE expiry_date IS NOT NULL"
+        for entity_type, owner in OWNERS.items()
+    )
+    cur.execute(f"""
+        CREATE VIEW IF NOT EXISTS document_expiries AS
+        {arms}
+    """)
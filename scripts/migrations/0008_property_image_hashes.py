@@ -0,0 +1,15 @@
+# Migration 0008: property image content hashes
+# Adds a content_hash column to property_images: the SHA-256 of the image file, which names its
+# thumbnails in THUMBNAILS_DIR (see scripts/thumbnail_cache.py). Existing rows are left NULL and
+# filled in the first time the image is shown, as hashing needs the files rather than the database.
+# The index lets StorageReconciler check which thumbnails are still used.
+
+DESCRIPTION = "Content hash column on property images"
+COST_PER_ROW = 0.000002 # The content_hash index is built over every image row
+TABLES = ["property_images"]
+
+def upgrade(cur): # Add the column and its index
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(property_images)").fetchall()}
+    if "content_hash" not in columns:
+        cur.execute("ALTER TABLE property_images ADD COLUMN content_hash TEXT")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_property_images_content_hash ON property_images (content_hash)")
@@ -10,6 +10,17 @@ from scripts.payment_details_page import PaymentDetailsPage
 # The payments are stored in a SQLite database and can be filtered by tenant, status, or type.
 
 class PaymentManager(BaseManager): # This class inherits from BaseManager to create a custom table view
+    # Server-side paging: one column (or None) per table column, plus the search fields
+    sort_columns = [
+        "payment_id", "tenant_name", "payment_type", "amount",
+        "payment_date", "due_date", "status", "method"
+    ]
+    key_column = "payment_id"
+    default_sort = ("payment_date", True)
+    search_columns = ["tenant_name", "status", "payment_type"]
+    search_index = "payments"
+    virtual_table = True # Infinite scroll, these tables grow the largest
+
     def __init__(self, parent=None):
         self.db = DatabaseManager() # Database manager instance
         super().__init__(
@@ -18,10 +29,10 @@ class PaymentManager(BaseManager): # This class inherits from BaseManager to cre
             columns=["ID", "Tenant", "Type", "Amount", "Date", "Due", "Status", "Method"],
             parent=parent
         )
-        self.load_data()
+        self.load_data_async() # Rows arrive from a search worker
 
-    def get_data(self): # Fetch payment data from the database
-        query = """
+    def get_query(self): # SQL for the payment table, paged and sorted by BaseManager
+        return """
             SELECT
                 p.payment_id,
                 t.first_name || ' ' || t.last_name AS tenant_name,
@@ -33,13 +44,7 @@ class PaymentManager(BaseManager): # This class inherits from BaseManager to cre
                 p.method
             FROM payments p
             JOIN tenants t ON p.tenant_id = t.tenant_id
-            ORDER BY p.payment_date DESC
-        """
-        with self.db.cursor() as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
-            col_names = [desc[0] for desc in cur.description]
-            return [dict(zip(col_names, row)) for row in rows]
+        """, ()
 
     def extract_row_values(self, item): # Extract values from the payment item for display in the table
         return [
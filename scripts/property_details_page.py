@@ -1,18 +1,19 @@
 import os
+import ntpath
 from PySide6.QtWidgets import (
     QLineEdit, QComboBox, QTextEdit, QDateEdit,
     QGroupBox, QVBoxLayout, QLabel, QPushButton, QListWidget,
     QMessageBox, QHBoxLayout, QDialog
 )
-from PySide6.QtGui import QDoubleValidator, QPixmap
+from PySide6.QtGui import QDoubleValidator
 from PySide6.QtCore import QDate, Qt
 from scripts.base_details_page import BaseDetailsPage
 from scripts.document_manager import DocumentManager
 from scripts.image_picker_dialog import ImagePickerDialog
 from scripts.utils.form_validator import FormValidator
 from scripts.document_picker_dialog import DocumentPickerDialog
-from scripts.utils.file_utils import cleanup_temp_preview_folder
-from scripts.utils.image_preview import TempImagePreview
+from scripts.utils.document_preview import preview_document
+from scripts.carousel_loader import CarouselLoader
 from config import PROPERTIES_DIR
 
 
@@ -27,6 +28,9 @@ class PropertyDetailsPage(BaseDetailsPage): # This class inherits from BaseDetai
         self.property_data = property_data or {} # Get property data if provided
         self.doc_manager = DocumentManager() # Document manager instance
         self.image_paths = [] # List to hold image paths
+        self.carousel = CarouselLoader(parent=self) # Loads and prefetches the images off the GUI thread
+        self.carousel.loaded.connect(self.paint_image)
+        self.carousel.hashed.connect(self.record_image_hash)
         self.current_image_index = 0 # Current image index for displaying images
 
         # === FORM INPUTS (LEFT PANEL) === #
@@ -190,6 +194,19 @@ class PropertyDetailsPage(BaseDetailsPage): # This class inherits from BaseDetai
                 if fname.lower().endswith((".jpg", ".jpeg", ".png")): # Check for image files
                     self.image_paths.append(os.path.join(folder, fname)) # Append image paths to the list
 
+        # Each file's row, matched by file name as the stored path may be relative or use other separators
+        # (ntpath splits on both), and its content hash if already recorded, so showing an image doesn't
+        # have to read the whole file
+        rows = {
+            ntpath.basename(image_path): (image_id, content_hash)
+            for image_id, image_path, content_hash in self.doc_manager.db.fetchall(
+                "SELECT image_id, image_path, content_hash FROM property_images WHERE property_id = ?", (prop_id,))
+        }
+        matched = {path: rows[os.path.basename(path)] for path in self.image_paths if os.path.basename(path) in rows}
+        self.carousel.set_images(self.image_paths,
+                                 {path: content_hash for path, (_, content_hash) in matched.items()},
+                                 {path: image_id for path, (image_id, _) in matched.items()})
+
         if self.image_paths: # If images are found, set the first image for display
             self.current_image_index = 0
             self.update_image_display() # Update the image display
@@ -199,11 +216,27 @@ class PropertyDetailsPage(BaseDetailsPage): # This class inherits from BaseDetai
 
     def update_image_display(self): # Update the image display with the current image
         if self.image_paths: # If images are available
-            path = self.image_paths[self.current_image_index]
-            self.image_label.setPixmap(QPixmap(path).scaledToHeight(180, Qt.SmoothTransformation))
+            # Shows the stored 180 px thumbnail, loaded in the background unless it is already in memory
+            if self.image_label.pixmap().isNull():
+                self.image_label.setText("Loading...")
+            self.carousel.show(self.current_image_index)
         else: # If no images are available set a default message
             self.image_label.setText("No images")
 
+    def paint_image(self, path, pixmap): # Called by the carousel loader once an image is ready
+        if not self.image_paths or path != self.image_paths[self.current_image_index]:
+            return # The user has moved on; the image stays cached for when they come back
+        if pixmap.isNull():
+            self.image_label.setText("Image unavailable")
+        else:
+            self.image_label.setPixmap(pixmap)
+
+    def record_image_hash(self, path, content_hash, image_id): # Save a hash the loader worked out, for next time
+        if image_id is None: # A file in the folder with no row of its own
+            return
+        self.doc_manager.db.execute(
+            "UPDATE property_images SET content_hash = ? WHERE image_id = ?", (content_hash, image_id))
+
     def show_prev_image(self): # Show the previous image in the list
         # If there are images, update the current image index and display the previous image
         if self.image_paths:
@@ -274,10 +307,7 @@ class PropertyDetailsPage(BaseDetailsPage): # This class inherits from BaseDetai
             self.doc_manager.delete_document("property", self.property_data["id"], match["filename"])
             self.load_documents()
 
-    def preview_document(self):
-        # Clean up any existing temp files before previewing a new one
-        cleanup_temp_preview_folder()
-
+    def preview_document(self): # Preview the selected document (images in memory, PDFs in the default viewer)
         if not self.property_data.get("id"):
             return
         item = self.documents_list.currentItem()
@@ -287,19 +317,8 @@ class PropertyDetailsPage(BaseDetailsPage): # This class inherits from BaseDetai
         match = next((doc for doc in self.documents if doc["name"] == name_part), None)
         if not match:
             return
-        path = self.doc_manager.decrypt_document_to_temp("property", self.property_data["id"], match["filename"])
-        if not path or not os.path.exists(path):
-            QMessageBox.warning(self, "Missing File", "The selected document could not be found.")
-            return
-        if path.lower().endswith((".png", ".jpg", ".jpeg")):
-            self.preview_image(path)
-        elif path.lower().endswith(".pdf"):
-            import webbrowser
-            webbrowser.open(path)
-
-    def preview_image(self, path): # Preview the selected image in a temporary viewer dialog
-        dialog = TempImagePreview(path, self)
-        dialog.exec()
+        if not preview_document(self.doc_manager, "property", self.property_data["id"], match["filename"], self):
+            QMessageBox.warning(self, "Preview Unavailable", "The selected document could not be opened.")
 
 def accept(self): # Override the accept method to handle form submission
     data = self.collect_data()
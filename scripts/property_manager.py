@@ -1,11 +1,9 @@
-import os
-import shutil
-import glob
 from scripts.base_manager import BaseManager
 from scripts.database_manager import DatabaseManager
 from scripts.property_details_page import PropertyDetailsPage
+from scripts.document_manager import DocumentManager
 from PySide6.QtWidgets import QDialog
-from config import PROPERTIES_DIR
+from scripts.storage_reconciler import remove_entity_folders
 
 
 # PropertyManager class to manage property records
@@ -14,9 +12,17 @@ from config import PROPERTIES_DIR
 # The properties are stored in a SQLite database and can be filtered by availability.
 
 class PropertyManager(BaseManager): # This class inherits from BaseManager to create a custom table view
+    # Server-side paging: one column (or None) per table column, plus the search fields
+    sort_columns = [
+        "door_number", "street", "postcode", "area", "city",
+        "price", "property_type", "availability_date", "status"
+    ]
+    key_column = "id"
+    search_columns = ["postcode", "city", "property_type"]
+    search_index = "properties"
+
     def __init__(self, filter_vacant=False):
         self.db = DatabaseManager() # Database manager instance
-        self.properties = [] # List to hold property data
         self.filter_vacant = filter_vacant # Flag to filter vacant properties
 
         super().__init__(
@@ -27,51 +33,24 @@ class PropertyManager(BaseManager): # This class inherits from BaseManager to cr
                 "Rent", "Property Type", "Available", "Status"
             ]
         )
-        self.load_properties()
-        self.load_data()
-
-    def load_properties(self): # Load properties from the database
-        with self.db.cursor() as cur:
-            if self.filter_vacant:
-                cur.execute("""
-                    SELECT property_id, door_number, street, postcode, area, city,
-                        bedrooms, property_type, price,
-                        availability_date, status, notes
-                    FROM properties p
-                    WHERE NOT EXISTS (
-                      SELECT 1 FROM tenancies t
-                      WHERE t.property_id = p.property_id
-                        AND DATE('now') BETWEEN t.start_date AND t.end_date
-                    )
-                """)
-            else:
-                cur.execute("""
-                    SELECT property_id, door_number, street, postcode, area, city,
-                        bedrooms, property_type, price,
-                        availability_date, status, notes
-                    FROM properties
-                """)
-            rows = cur.fetchall()
-            self.properties = [
-                {
-                    "id": row[0],
-                    "door_number": row[1],
-                    "street": row[2],
-                    "postcode": row[3],
-                    "area": row[4],
-                    "city": row[5],
-                    "bedrooms": row[6],
-                    "property_type": row[7],
-                    "price": row[8],
-                    "availability_date": row[9],
-                    "status": row[10],
-                    "notes": row[11],
-                }
-                for row in rows
-            ]
-
-    def get_data(self): # Fetch property data from the database
-        return self.properties
+        self.load_data_async() # Rows arrive from a search worker
+
+    def get_query(self): # SQL for the property table, paged and sorted by BaseManager
+        query = """
+            SELECT property_id AS id, door_number, street, postcode, area, city,
+                bedrooms, property_type, price,
+                availability_date, status, notes
+            FROM properties p
+        """
+        if self.filter_vacant: # Only properties with no tenancy running today
+            query += """
+                WHERE NOT EXISTS (
+                  SELECT 1 FROM tenancies t
+                  WHERE t.property_id = p.property_id
+                    AND DATE('now') BETWEEN t.start_date AND t.end_date
+                )
+            """
+        return query, ()
 
     def extract_row_values(self, item): # Extract values from the property item for display in the table
         return [
@@ -86,14 +65,6 @@ class PropertyManager(BaseManager): # This class inherits from BaseManager to cr
             item["status"],
         ]
 
-    def filter_item(self, item, query): # Filter properties based on the search query
-        query = query.lower()
-        return (
-            query in item["postcode"].lower()
-            or query in item["city"].lower()
-            or query in item["property_type"].lower()
-        )
-
     def open_details_dialog(self, item): # Open the Property Details dialog for adding or editing a property
         is_new = item is None # Check if the item is new or existing
         data = {} if is_new else item.copy() # Copy the item data if it exists
@@ -150,7 +121,9 @@ class PropertyManager(BaseManager): # This class inherits from BaseManager to cr
                     new_data["id"] = cur.lastrowid # Get the last inserted ID
                     data = new_data # Update the data with the new property ID
 
-            self.load_properties()
+            if not is_new: # Once committed: the address names the property's and its tenancies' document folders
+                DocumentManager.invalidate_folder_name("property", data["id"])
+                DocumentManager.invalidate_folder_name("tenancy")
             self.load_data()
             break
 
@@ -160,10 +133,7 @@ class PropertyManager(BaseManager): # This class inherits from BaseManager to cr
             cur.execute("DELETE FROM properties WHERE property_id = ?", (property_id,))
 
         # cleanup folder in resources\properties
-        # Checks if the folder exists before attempting to delete it
-        pattern = os.path.join(PROPERTIES_DIR, f"{property_id}_*")
-        for folder in glob.glob(pattern):
-            shutil.rmtree(folder, ignore_errors=True)
+        # Images and documents can be large, so the folder is deleted in the background
+        remove_entity_folders("property", property_id)
 
-        self.load_properties()
         self.load_data()
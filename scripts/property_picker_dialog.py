@@ -4,6 +4,9 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Signal, Qt
 from scripts.database_manager import DatabaseManager
+from scripts.search_service import SearchService
+from scripts.async_search import DebouncedSearch
+from config import SEARCH_RESULT_LIMIT
 
 
 # PropertyPickerDialog class to select a property from the database
@@ -20,8 +23,9 @@ class PropertyPickerDialog(QDialog): # This class inherits from QDialog to creat
         self.resize(700, 450)
 
         self.db = DatabaseManager() # Database manager instance
+        self.search_service = SearchService() # Shared full-text search
         self.setup_ui() # Setup the UI components
-        self.load_properties() # Load properties from the database
+        self.populate_properties(self.load_properties("")) # Load properties from the database
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -29,7 +33,9 @@ class PropertyPickerDialog(QDialog): # This class inherits from QDialog to creat
         # Search bar to filter properties
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search by address, city or postcode...")
-        self.search_input.textChanged.connect(self.load_properties)
+        # Debounced search, run on a worker thread
+        self.search_worker = DebouncedSearch(self.search_input, self.load_properties, self.populate_properties, parent=self)
+        self.search_input.returnPressed.connect(self.search_worker.flush)
         layout.addWidget(self.search_input)
 
         self.property_table = QTableWidget()
@@ -47,28 +53,35 @@ class PropertyPickerDialog(QDialog): # This class inherits from QDialog to creat
 
         self.setLayout(layout)
 
-    def load_properties(self): # Load properties from the database based on search input
-        keyword = self.search_input.text().strip() # Get the search keyword
+    def load_properties(self, keyword): # Load properties matching keyword (runs on a worker thread)
+        keyword = keyword.strip() # Clean up the search keyword
         params = [] # Initialize parameters for SQL query
         query = """
         SELECT property_id, door_number || ', ' || street, city, postcode, status
         FROM properties
         """
-
-        if keyword: # If there is a search keyword, filter properties based on it
-            query += """
-                WHERE
-                    street LIKE ? OR
-                    city LIKE ? OR
-                    postcode LIKE ?
-            """
-            like = f"%{keyword}%"
-            params = [like, like, like]
-
-        query += " ORDER BY city"
-
-        properties = self.db.execute(query, params, fetchall=True)
-        self.populate_properties(properties)
+        hits = self.search_service.hits_subquery("properties", keyword, SEARCH_RESULT_LIMIT)
+
+        if hits: # Ranked full-text matches, best first
+            hits_sql, params, _ = hits
+            query += f" JOIN ({hits_sql}) AS search_hits ON property_id = search_hits.search_rowid"
+            query += " ORDER BY search_hits.search_rank"
+
+        else:
+            if keyword: # No FTS index, fall back to matching the columns with LIKE
+                query += """
+                    WHERE
+                        street LIKE ? OR
+                        city LIKE ? OR
+                        postcode LIKE ?
+                """
+                like = f"%{keyword}%"
+                params = [like, like, like]
+
+            query += " ORDER BY city LIMIT ?"
+            params.append(SEARCH_RESULT_LIMIT)
+
+        return self.db.fetchall(query, params)
 
     def populate_properties(self, properties): # Populate the table with property data
         self.property_table.setRowCount(0)
@@ -0,0 +1,77 @@
+import re
+from scripts.database_manager import DatabaseManager
+from config import SEARCH_RESULT_LIMIT, SEARCH_RANK_MAX_HITS
+
+# Full-text indexes created by migration 0003_full_text_search: entity -> FTS5 table
+SEARCH_INDEXES = {
+    "tenants":    "tenants_fts",
+    "landlords":  "landlords_fts",
+    "properties": "properties_fts",
+    "tenancies":  "tenancies_fts",
+    "payments":   "payments_fts",
+}
+
+SEARCH_TERM = re.compile(r"\w+") # Same word boundaries as the unicode61 tokenizer
+
+
+# SearchService class shared by the manager tables and picker dialogs
+# Turns the text typed in a search box into an FTS5 MATCH query where every word is a
+# prefix ("jo sm" finds "John Smith"), and returns hits ranked by bm25 relevance.
+# Ranking costs a bm25 score per hit, so a very broad search (more than
+# SEARCH_RANK_MAX_HITS matches) is not ranked as a whole: a limited search ranks
+# just the first hits it keeps, and an unlimited one keeps the caller's own order.
+# When the FTS5 indexes are missing (SQLite built without FTS5) callers get None back
+# and keep their LIKE search.
+
+class SearchService:
+    _available = None # Cached set of FTS tables present in the database
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager() # Anything with fetchval()/fetchall(), e.g. for benchmarks
+
+    @staticmethod
+    def match_query(text): # Build an FTS5 MATCH expression from free text, or None if it has no words
+        terms = SEARCH_TERM.findall(text or "")
+        if not terms:
+            return None
+        # Quoting each word keeps FTS5 operators typed by the user (AND, OR, NEAR, -) literal
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def has_index(self, entity): # True if the FTS table for entity exists
+        if SearchService._available is None:
+            rows = self.db.fetchall("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%\\_fts' ESCAPE '\\'")
+            SearchService._available = {row[0] for row in rows}
+        return SEARCH_INDEXES.get(entity) in SearchService._available
+
+    def count_matches(self, entity, match): # Number of rows matching an FTS5 MATCH expression
+        fts = SEARCH_INDEXES[entity]
+        return self.db.fetchval(f"SELECT COUNT(*) FROM {fts} WHERE {fts} MATCH ?", (match,))
+
+    def hits_subquery(self, entity, text, limit=None): # (sql, params, ranked) yielding search_rowid, search_rank
+        # Returns None when there is nothing to search for or no index to search with.
+        # ranked is False when search_rank is not filled in and must not be sorted on.
+        match = self.match_query(text)
+        if match is None or not self.has_index(entity):
+            return None
+        fts = SEARCH_INDEXES[entity]
+        sql = f"SELECT rowid AS search_rowid, rank AS search_rank FROM {fts} WHERE {fts} MATCH ?"
+        params = [match]
+
+        if self.count_matches(entity, match) <= SEARCH_RANK_MAX_HITS:
+            if limit: # Keep only the best hits
+                sql += " ORDER BY rank LIMIT ?"
+                params.append(limit)
+            return sql, params, True
+
+        if limit: # Too many hits to rank them all: keep the first ones and rank only those
+            return sql + " ORDER BY rowid LIMIT ?", params + [limit], True
+        return f"SELECT rowid AS search_rowid, NULL AS search_rank FROM {fts} WHERE {fts} MATCH ?", params, False
+
+    def search(self, entity, text, limit=SEARCH_RESULT_LIMIT): # Row ids matching text, best match first
+        hits = self.hits_subquery(entity, text, limit)
+        if hits is None:
+            return None
+        sql, params, ranked = hits
+        if ranked:
+            sql = f"SELECT * FROM ({sql}) ORDER BY search_rank"
+        return [row[0] for row in self.db.fetchall(sql, params)]
@@ -0,0 +1,343 @@
+import os
+import re
+import time
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from scripts.document_manager import DocumentManager
+from config import (
+    STORAGE_PATHS, QUARANTINE_DIR, THUMBNAILS_DIR, THUMBNAIL_SIZES, ORPHAN_ACTION,
+    ORPHAN_GRACE_MINUTES, ORPHAN_BATCH_SIZE, ORPHAN_QUARANTINE_DAYS,
+)
+
+ENTITY_FOLDER = re.compile(r"^(\d+)(?:_|$)") # "4_12_High_Street_AB1_2CD" or just "4"
+BLOB_FILE = re.compile(r"^[0-9a-f]{64}\.encrypted$")
+THUMBNAIL_FILE = re.compile(r"^([0-9a-f]{64})_(\d+)\.jpg$") # See ThumbnailCache.path()
+TRASH_PREFIX = ".deleted_" # Folders of deleted entities waiting for remove_entity_folders()
+QUARANTINE_STAMP = "%Y%m%d_%H%M%S"
+IMAGES_FOLDER = "property_images"
+SQL_VARIABLES = 500 # Blob or image hashes looked up per query
+
+# Table, id column and owner table of each entity type's documents
+ENTITY_TABLES = {
+    "tenant": ("tenant_documents", "tenant_id", "tenants"),
+    "landlord": ("landlord_documents", "landlord_id", "landlords"),
+    "property": ("property_documents", "property_id", "properties"),
+    "tenancy": ("tenancy_documents", "tenancy_id", "tenancies"),
+}
+
+
+# ReconcileReport class summarising one run of StorageReconciler
+# areas maps "tenant", "property", "property images", ... and "blobs" to [files, bytes] of orphans found there.
+# reclaimed_bytes is disk space actually freed (deleted orphans, unused blobs and expired quarantine);
+# quarantined_bytes was moved to QUARANTINE_DIR and is freed once that batch expires (purged_bytes).
+
+@dataclass
+class ReconcileReport:
+    action: str = ORPHAN_ACTION
+    dry_run: bool = False
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+    orphan_files: int = 0
+    orphan_bytes: int = 0
+    quarantined_bytes: int = 0
+    reclaimed_bytes: int = 0
+    purged_bytes: int = 0
+    unused_blobs: int = 0
+    skipped_recent: int = 0
+    errors: int = 0
+    cancelled: bool = False
+    seconds: float = 0.0
+    quarantine_folder: str = None
+    areas: dict = field(default_factory=dict)
+
+    def add_orphan(self, area, size): # Count an orphan found under area
+        files_bytes = self.areas.setdefault(area, [0, 0])
+        files_bytes[0] += 1
+        files_bytes[1] += size
+        self.orphan_files += 1
+        self.orphan_bytes += size
+
+    def summary(self): # Text for the admin page and the console
+        mb = lambda size: f"{size / 1048576:.1f} MB"
+        lines = [f"Scanned {self.scanned_files} file(s), {mb(self.scanned_bytes)} in {self.seconds:.1f} s"]
+        lines.append(f"Orphaned: {self.orphan_files} file(s), {mb(self.orphan_bytes)}" + (" (dry run, nothing changed)" if self.dry_run else ""))
+        for area, (files, size) in sorted(self.areas.items()):
+            lines.append(f"  {area}: {files} file(s), {mb(size)}")
+        if self.unused_blobs:
+            lines.append(f"Unused blobs removed: {self.unused_blobs}")
+        if self.quarantined_bytes:
+            lines.append(f"Quarantined: {mb(self.quarantined_bytes)} in {self.quarantine_folder}")
+        if self.purged_bytes:
+            lines.append(f"Expired quarantine deleted: {mb(self.purged_bytes)}")
+        lines.append(f"Reclaimed: {mb(self.reclaimed_bytes)}")
+        if self.skipped_recent:
+            lines.append(f"Skipped {self.skipped_recent} file(s) changed in the last {ORPHAN_GRACE_MINUTES} minutes")
+        if self.errors:
+            lines.append(f"{self.errors} file(s) could not be removed")
+        if self.cancelled:
+            lines.append("Stopped before the scan finished")
+        return "\n".join(lines)
+
+
+# StorageReconciler class finding files in the resources tree that no database row uses
+# It walks STORAGE_PATHS one entity folder at a time and BLOBS_DIR one sub-folder at a time, asking the
+# database only about that folder's entity (its *_documents rows and, for properties, property_images),
+# so memory stays flat however many documents there are. A folder whose entity no longer exists is
+# orphaned as a whole (e.g. tenancy folders left behind before delete_item looked in TENANCIES_DIR).
+# Files changed within ORPHAN_GRACE_MINUTES are left alone, as an upload may not have saved its row yet.
+# Orphans are moved to a timestamped folder under QUARANTINE_DIR (or deleted, with action="delete")
+# in batches of ORPHAN_BATCH_SIZE; quarantine folders older than ORPHAN_QUARANTINE_DAYS are deleted.
+# Only documents written by the app (*.encrypted) and property images are ever considered in a live
+# entity's folder; anything else someone put there is kept. Thumbnails of images no row uses any more
+# (or of sizes no longer in THUMBNAIL_SIZES) are deleted rather than quarantined, as they can be remade.
+
+class StorageReconciler:
+    def __init__(self, documents=None, action=ORPHAN_ACTION, dry_run=False, grace_minutes=ORPHAN_GRACE_MINUTES,
+                 batch_size=ORPHAN_BATCH_SIZE, storage_paths=STORAGE_PATHS, quarantine_dir=QUARANTINE_DIR,
+                 thumbnails_dir=THUMBNAILS_DIR):
+        if action not in ("quarantine", "delete"):
+            raise ValueError(f"Unknown orphan action: {action}")
+        self.documents = documents or DocumentManager() # Its database and blob store are the ones reconciled
+        self.db = self.documents.db
+        self.action = action
+        self.dry_run = dry_run
+        self.grace_seconds = grace_minutes * 60
+        self.batch_size = max(1, batch_size)
+        self.storage_paths = storage_paths
+        self.blobs_dir = self.documents.blobs.root
+        self.quarantine_dir = quarantine_dir
+        self.thumbnails_dir = thumbnails_dir
+        self.roots = {os.path.normcase(os.path.abspath(p)) for p in [*storage_paths.values(), self.blobs_dir, thumbnails_dir]}
+        self.batch = [] # (area, path, size) waiting to be quarantined or deleted
+
+    def run(self, progress=None, cancelled=None): # Reconcile the whole tree and return a ReconcileReport
+        # progress(report) is called after every batch; cancelled() is checked between folders
+        start = time.perf_counter()
+        self.report = ReconcileReport(action=self.action, dry_run=self.dry_run)
+        self.progress = progress
+        self.cutoff = time.time() - self.grace_seconds
+        stamp = datetime.now().strftime(QUARANTINE_STAMP)
+        self.quarantine_root = os.path.join(self.quarantine_dir, stamp)
+
+        if not self.dry_run: # Blobs left unused by cascades are known from the database alone
+            self.report.unused_blobs, freed = self.documents.collect_blob_garbage()
+            self.report.reclaimed_bytes += freed
+
+        for folder_task in self.folder_tasks():
+            if cancelled and cancelled():
+                self.report.cancelled = True
+                break
+            folder_task()
+        self.flush()
+
+        if not self.dry_run and not self.report.cancelled:
+            self.purge_quarantine()
+        if self.report.quarantined_bytes:
+            self.report.quarantine_folder = self.quarantine_root
+        self.report.seconds = time.perf_counter() - start
+        print(f"[Reconcile] {self.report.summary()}")
+        return self.report
+
+    def folder_tasks(self): # One callable per folder to reconcile, produced lazily while walking
+        for entity_type, base in self.storage_paths.items():
+            for entry in self.scan(base):
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if entry.name.startswith(TRASH_PREFIX):
+                    yield lambda path=entry.path, area=entity_type: self.reconcile_dead_folder(area, path)
+                    continue
+                match = ENTITY_FOLDER.match(entry.name)
+                if match:
+                    yield lambda path=entry.path, area=entity_type, entity_id=int(match.group(1)): \
+                        self.reconcile_entity_folder(area, entity_id, path)
+        for entry in self.scan(self.blobs_dir):
+            if entry.is_dir(follow_symlinks=False) and len(entry.name) == 2:
+                yield lambda path=entry.path: self.reconcile_blob_folder(path)
+        for entry in self.scan(self.thumbnails_dir):
+            if entry.is_dir(follow_symlinks=False) and len(entry.name) == 2:
+                yield lambda path=entry.path: self.reconcile_thumbnail_folder(path)
+
+    # === Folders === #
+
+    def reconcile_entity_folder(self, entity_type, entity_id, folder): # Diff one entity folder against its rows
+        table, id_field, owner_table = ENTITY_TABLES[entity_type]
+        if not self.rows(f"SELECT 1 FROM {owner_table} WHERE {id_field} = ?", (entity_id,)):
+            self.reconcile_dead_folder(entity_type, folder)
+            return
+
+        # Documents stored in a folder before deduplication; a renamed entity can have several folders,
+        # so any of its rows' file names keeps the file
+        documents = {row[0] for row in self.rows(
+            f"SELECT file_path FROM {table} WHERE {id_field} = ? AND blob_hash IS NULL", (entity_id,))}
+        for entry in self.scan(folder):
+            if entry.is_file(follow_symlinks=False) and entry.name.endswith(".encrypted"):
+                self.check(entity_type, entry, entry.name in documents)
+
+        if entity_type == "property": # Image rows hold absolute paths, matched by file name in case the app moved
+            images_folder = os.path.join(folder, IMAGES_FOLDER)
+            images = {os.path.basename(row[0]) for row in self.rows(
+                "SELECT image_path FROM property_images WHERE property_id = ?", (entity_id,))}
+            for entry in self.scan(images_folder):
+                if entry.is_file(follow_symlinks=False):
+                    self.check("property images", entry, entry.name in images)
+
+    def reconcile_dead_folder(self, area, folder): # Everything in the folder of a deleted entity is orphaned
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except OSError: # Removed meanwhile (e.g. by remove_entity_folders)
+                    continue
+                self.consider(area, path, info)
+
+    def reconcile_blob_folder(self, folder): # Diff one blob sub-folder against document_blobs
+        entries = [entry for entry in self.scan(folder)
+                   if entry.is_file(follow_symlinks=False) and BLOB_FILE.match(entry.name)]
+        known = set()
+        for i in range(0, len(entries), SQL_VARIABLES):
+            hashes = [entry.name[:64] for entry in entries[i:i + SQL_VARIABLES]]
+            known.update(row[0] for row in self.rows(
+                f"SELECT blob_hash FROM document_blobs WHERE blob_hash IN ({', '.join('?' * len(hashes))})", hashes))
+        for entry in entries:
+            self.check("blobs", entry, entry.name[:64] in known)
+
+    def reconcile_thumbnail_folder(self, folder): # Diff one thumbnail sub-folder against property_images
+        entries = [(entry, match) for entry in self.scan(folder)
+                   if entry.is_file(follow_symlinks=False) and (match := THUMBNAIL_FILE.match(entry.name))]
+        hashes = sorted({match.group(1) for _, match in entries})
+        known = set()
+        for i in range(0, len(hashes), SQL_VARIABLES):
+            chunk = hashes[i:i + SQL_VARIABLES]
+            known.update(row[0] for row in self.rows(
+                f"SELECT DISTINCT content_hash FROM property_images WHERE content_hash IN ({', '.join('?' * len(chunk))})", chunk))
+        sizes = set(THUMBNAIL_SIZES.values())
+        for entry, match in entries:
+            self.check("thumbnails", entry, match.group(1) in known and int(match.group(2)) in sizes)
+
+    def rows(self, query, params): # Unlike fetchall(), a failed lookup raises instead of looking like "no references"
+        with self.db.cursor() as cur:
+            cur.execute(query, params)
+            return cur.fetchall()
+
+    # === Orphans === #
+
+    def check(self, area, entry, referenced): # Count a scanned file and queue it if nothing uses it
+        try:
+            info = entry.stat(follow_symlinks=False)
+        except OSError:
+            return
+        if referenced:
+            self.report.scanned_files += 1
+            self.report.scanned_bytes += info.st_size
+        else:
+            self.consider(area, entry.path, info)
+
+    def consider(self, area, path, info): # Queue an unreferenced file unless it is too new to judge
+        self.report.scanned_files += 1
+        self.report.scanned_bytes += info.st_size
+        if info.st_mtime > self.cutoff:
+            self.report.skipped_recent += 1
+            return
+        self.report.add_orphan(area, info.st_size)
+        self.batch.append((area, path, info.st_size))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self): # Quarantine or delete the queued orphans
+        batch, self.batch = self.batch, []
+        if not self.dry_run:
+            for area, path, size in batch:
+                try:
+                    if self.action == "quarantine" and area != "thumbnails":
+                        target = self.quarantine_target(path)
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        shutil.move(path, target)
+                        self.report.quarantined_bytes += size
+                    else:
+                        os.remove(path)
+                        self.report.reclaimed_bytes += size
+                except FileNotFoundError: # Already gone
+                    pass
+                except OSError as e: # e.g. a document open in another program on Windows
+                    self.report.errors += 1
+                    print(f"[Reconcile] Could not remove {path}: {e}")
+                    continue
+                self.prune(os.path.dirname(path))
+        if batch and self.progress:
+            self.progress(self.report)
+
+    def quarantine_target(self, path): # Where an orphan goes in this run's quarantine folder, e.g. <stamp>/tenancies/3_x/doc.encrypted
+        path = os.path.abspath(path)
+        for root in self.roots:
+            if os.path.normcase(path).startswith(root + os.sep):
+                return os.path.join(self.quarantine_root, os.path.basename(root), path[len(root) + 1:])
+        return os.path.join(self.quarantine_root, os.path.basename(path))
+
+    def prune(self, folder): # Remove folders emptied by the batch, up to the storage folder itself
+        folder = os.path.abspath(folder)
+        while os.path.normcase(folder) not in self.roots and os.path.dirname(folder) != folder:
+            try:
+                os.rmdir(folder) # Only succeeds once the folder is empty
+            except OSError:
+                return
+            folder = os.path.dirname(folder)
+
+    def purge_quarantine(self): # Delete quarantine batches older than ORPHAN_QUARANTINE_DAYS
+        expiry = datetime.now() - timedelta(days=ORPHAN_QUARANTINE_DAYS)
+        for entry in self.scan(self.quarantine_dir):
+            try:
+                moved_at = datetime.strptime(entry.name, QUARANTINE_STAMP)
+            except ValueError: # Not one of ours
+                continue
+            if moved_at >= expiry or not entry.is_dir(follow_symlinks=False):
+                continue
+            size = 0
+            for root, _, files in os.walk(entry.path):
+                for name in files:
+                    try:
+                        size += os.path.getsize(os.path.join(root, name))
+                    except OSError:
+                        pass
+            shutil.rmtree(entry.path, ignore_errors=True)
+            if not os.path.exists(entry.path):
+                self.report.purged_bytes += size
+                self.report.reclaimed_bytes += size
+
+    @staticmethod
+    def scan(folder): # Entries of a folder, or none if it doesn't exist
+        try:
+            with os.scandir(folder) as entries:
+                return list(entries)
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+
+
+# === Deleting an entity's folders === #
+# The managers' delete_item() calls this once the entity's row is gone. The folders are renamed
+# straight away (so a new entity reusing the id starts clean) and deleted on a background thread,
+# so a large property doesn't block the window. Folders that could not be renamed or deleted, and
+# blobs the cascade left unused, are picked up by the next StorageReconciler run.
+
+_removal_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="folder-removal")
+
+def remove_entity_folders(entity_type, entity_id, storage_paths=STORAGE_PATHS): # Returns a Future for the background removal
+    base = storage_paths[entity_type]
+    trash = []
+    for entry in StorageReconciler.scan(base):
+        match = ENTITY_FOLDER.match(entry.name)
+        if match and int(match.group(1)) == int(entity_id) and entry.is_dir(follow_symlinks=False):
+            target = os.path.join(base, f"{TRASH_PREFIX}{time.time_ns()}_{entry.name}")
+            try:
+                os.replace(entry.path, target)
+                trash.append(target)
+            except OSError as e:
+                print(f"[Reconcile] Could not move {entry.path} aside: {e}")
+    DocumentManager.invalidate_folder_name(entity_type, entity_id)
+    return _removal_pool.submit(_remove_folders, trash)
+
+def _remove_folders(folders): # Runs on the removal thread
+    for folder in folders:
+        shutil.rmtree(folder, ignore_errors=True)
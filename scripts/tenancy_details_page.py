@@ -1,5 +1,4 @@
 import os
-import webbrowser
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QLineEdit, QDateEdit, QComboBox,
     QPushButton, QListWidget, QListWidgetItem, QMessageBox, QHBoxLayout, QWidget
@@ -12,8 +11,7 @@ from scripts.document_manager import DocumentManager
 from scripts.document_picker_dialog import DocumentPickerDialog
 from scripts.tenant_picker_dialog import TenantPickerDialog
 from scripts.property_picker_dialog import PropertyPickerDialog
-from scripts.utils.file_utils import cleanup_temp_preview_folder
-from scripts.utils.image_preview import TempImagePreview
+from scripts.utils.document_preview import preview_document
 
 
 # TenancyDetailsPage class to manage tenancy records
@@ -196,6 +194,8 @@ class TenancyDetailsPage(BaseDetailsPage): # This class inherits from BaseDetail
                     data["rent_amount"], data["status"], self.tenancy_id
                 ))
 
+                DocumentManager.invalidate_folder_name("tenancy", self.tenancy_id) # Start date or property may have changed
+
                 # Remove old tenant links
                 cur.execute("DELETE FROM tenancy_tenants WHERE tenancy_id = ?", (self.tenancy_id,))
             
@@ -265,17 +265,6 @@ class TenancyDetailsPage(BaseDetailsPage): # This class inherits from BaseDetail
             self.doc_manager.delete_document("tenancy", self.tenancy_id, filename)
             self.load_documents()
 
-    def preview_document(self, item): # Preview a document
+    def preview_document(self, item): # Preview a document (images in memory, PDFs in the default viewer)
         filename = item.data(Qt.UserRole + 1)
-        path = self.doc_manager.decrypt_document_to_temp("tenancy", self.tenancy_id, filename) # Decrypt the document to a temporary location
-        if not path:
-            return
-
-        if path.lower().endswith((".png", ".jpg", ".jpeg")): # Check if the file is an image
-            self.preview_image(path) # Preview the image
-        elif path.lower().endswith(".pdf"): # Check if the file is a PDF
-            webbrowser.open(path) # Open the PDF in the default web browser
-
-    def preview_image(self, path): # Preview an image
-        dialog = TempImagePreview(path, self)
-        dialog.exec()
+        preview_document(self.doc_manager, "tenancy", self.tenancy_id, filename, self)
@@ -1,10 +1,8 @@
-import glob
-import os
-import shutil
 from PySide6.QtWidgets import QMessageBox, QHeaderView
 from scripts.base_manager import BaseManager
 from scripts.database_manager import DatabaseManager
 from scripts.tenancy_details_page import TenancyDetailsPage
+from scripts.storage_reconciler import remove_entity_folders
 
 
 # TenancyManager class inherits from BaseManager
@@ -15,6 +13,15 @@ from scripts.tenancy_details_page import TenancyDetailsPage
 # The class uses a database manager to interact with the SQLite database
 
 class TenancyManager(BaseManager): # This class inherits from BaseManager
+    # Server-side paging: one column (or None) per table column, plus the search fields
+    sort_columns = [
+        "tenancy_id", "tenant_names", "property_address", "start_date", "end_date",
+        "rent_amount", "status"
+    ]
+    key_column = "tenancy_id"
+    search_columns = ["tenant_names", "property_address", "status"]
+    search_index = "tenancies"
+
     def __init__(self, filter_ending_soon=False, parent=None): # The filter_ending_soon parameter
                                                                # is for the dashbaord card
         self.db = DatabaseManager() # This is the database manager instance
@@ -30,9 +37,9 @@ class TenancyManager(BaseManager): # This class inherits from BaseManager
             parent=parent
         )
 
-        self.load_data()
+        self.load_data_async() # Rows arrive from a search worker
 
-    def get_data(self): # This method retrieves data from the database
+    def get_query(self): # SQL for the tenancy table, paged and sorted by BaseManager
         # The SQL query retrieves tenancy information, including tenant names and property addresses
         query = """
             SELECT
@@ -53,14 +60,7 @@ class TenancyManager(BaseManager): # This class inherits from BaseManager
             query += " WHERE tn.end_date <= DATE('now', '+30 day')"
 
         query += " GROUP BY tn.tenancy_id" # Group by tenancy ID to avoid duplicates
-
-        with self.db.cursor() as cur:
-            cur.execute(query)
-            results = cur.fetchall()
-            col_names = [desc[0] for desc in cur.description]
-            return [dict(zip(col_names, row)) for row in results]
-
-
+        return query, ()
 
     def extract_row_values(self, item): # This method extracts the values from a single row of data
         # It returns a list of values to be displayed in the table
@@ -88,11 +88,8 @@ class TenancyManager(BaseManager): # This class inherits from BaseManager
             cur.execute("DELETE FROM tenancies WHERE tenancy_id = ?", (tenancy_id,)) # Delete the tenancy
             cur.execute("DELETE FROM tenancy_tenants WHERE tenancy_id = ?", (tenancy_id,)) # Delete the associated tenants
 
-        # Remove tenancy folder(s) matching pattern
-        pattern = os.path.join("tenancies", f"{tenancy_id}_*")
-        for folder in glob.glob(pattern): # Use glob to find all folders matching the pattern. Glod is a module for Unix style pathname pattern expansion. 
-            # In simple terms, it is used to find files and directories matching a specified pattern.
-            shutil.rmtree(folder, ignore_errors=True)
+        # Remove tenancy folder(s) in resources\tenancies, in the background
+        remove_entity_folders("tenancy", tenancy_id)
 
         self.load_data()
 
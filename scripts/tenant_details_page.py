@@ -5,13 +5,11 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QDate
 from PySide6.QtGui import QPixmap
-import webbrowser
 from scripts.base_details_page import BaseDetailsPage
 from scripts.document_manager import DocumentManager
 from scripts.document_picker_dialog import DocumentPickerDialog
 from scripts.utils.form_validator import FormValidator
-from scripts.utils.file_utils import cleanup_temp_preview_folder
-from scripts.utils.image_preview import TempImagePreview
+from scripts.utils.document_preview import preview_document
 from scripts.database_manager import DatabaseManager
 
 
@@ -183,11 +181,7 @@ class TenantDetailsPage(BaseDetailsPage): # This class inherits from BaseDetails
         self.load_documents() # Reload the documents to update the list
 
     def preview_document(self, item): # This method is called when a document is double-clicked in the list
-        # It previews the selected document
-
-        # Clean up any existing temp files before previewing a new one
-        cleanup_temp_preview_folder()
-
+        # It previews the selected document (images in memory, PDFs in the default viewer)
         selected_text = item.text() # Get the text of the selected item
         name_part = selected_text.split(" (")[0] # Extract the name part from the selected item
         tenant_id = self.tenant_data.get("id") # Get the tenant ID from the tenant data
@@ -195,18 +189,5 @@ class TenantDetailsPage(BaseDetailsPage): # This class inherits from BaseDetails
         if not match: # If no matching document is found, return
             return
 
-        # Decrypt the document to a temporary location
-        decrypted_path = self.doc_manager.decrypt_document_to_temp("tenant", tenant_id, match["filename"])
-        if not decrypted_path: # If decryption fails, return
-            return
-
-        if decrypted_path.lower().endswith((".png", ".jpg", ".jpeg")): # If the document is an image
-            self.preview_image(decrypted_path) # Preview the image
-
-        elif decrypted_path.lower().endswith(".pdf"): # If the document is a PDF
-            webbrowser.open(decrypted_path) # Open the PDF in the default web browser
-
-    def preview_image(self, path): # This method previews an image document
-        dialog = TempImagePreview(path, self) # Create a new instance of TempImagePreview
-        dialog.exec()
+        preview_document(self.doc_manager, "tenant", tenant_id, match["filename"], self)
 
@@ -3,8 +3,10 @@ from PySide6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QMessageBox
 )
 from PySide6.QtCore import Qt, Signal
-import sqlite3
-from config import DB_PATH
+from scripts.database_manager import DatabaseManager
+from scripts.search_service import SearchService
+from scripts.async_search import DebouncedSearch
+from config import SEARCH_RESULT_LIMIT
 
 
 # TenantPickerDialog class inherits from QDialog
@@ -22,6 +24,8 @@ class TenantPickerDialog(QDialog): # This class inherits from QDialog
         self.setWindowTitle("Select Tenant")
         self.setMinimumSize(750, 400)
         self.mode = mode  # "single" or "multi" to determine selection mode
+        self.db = DatabaseManager() # Database manager instance
+        self.search_service = SearchService() # Shared full-text search
         self.setup_ui()
 
     def setup_ui(self):
@@ -31,7 +35,9 @@ class TenantPickerDialog(QDialog): # This class inherits from QDialog
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search tenants...")
-        self.search_input.textChanged.connect(self.search_tenants)
+        # Debounced search, run on a worker thread
+        self.search_worker = DebouncedSearch(self.search_input, self.search_tenants, self.populate_tenants, parent=self)
+        self.search_input.returnPressed.connect(self.search_worker.flush)
         search_layout.addWidget(self.search_input)
 
         # Results table
@@ -53,29 +59,35 @@ class TenantPickerDialog(QDialog): # This class inherits from QDialog
         layout.addWidget(select_button)
         self.setLayout(layout)
 
-        self.search_tenants()  # Load initial list
+        self.populate_tenants(self.search_tenants(""))  # Load initial list
 
-    def search_tenants(self): # Search for tenants based on the input in the search bar
-        keyword = self.search_input.text().strip() # Get the search keyword
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
+    def search_tenants(self, keyword): # Search for tenants matching keyword (runs on a worker thread)
+        keyword = keyword.strip() # Clean up the search keyword
+        select = "SELECT tenant_id, first_name || ' ' || last_name AS name, email, phone FROM tenants"
+        hits = self.search_service.hits_subquery("tenants", keyword, SEARCH_RESULT_LIMIT)
 
-        if keyword: # If a keyword is provided, filter tenants based on the search criteria
-            cur.execute("""
-                SELECT tenant_id, first_name || ' ' || last_name AS name, email, phone
-                FROM tenants
+        if hits: # Ranked full-text matches, best first
+            hits_sql, params, _ = hits
+            results = self.db.fetchall(f"""
+                {select}
+                JOIN ({hits_sql}) AS search_hits ON tenant_id = search_hits.search_rowid
+                ORDER BY search_hits.search_rank
+            """, params)
+
+        elif keyword: # No FTS index, fall back to matching the columns with LIKE
+            results = self.db.fetchall(f"""
+                {select}
                 WHERE first_name LIKE ? OR last_name LIKE ? OR email LIKE ? OR phone LIKE ?
-            """, (f"%{keyword}%",) * 4)
+                LIMIT ?
+            """, (f"%{keyword}%",) * 4 + (SEARCH_RESULT_LIMIT,))
 
-        else: # If no keyword is provided, fetch all tenants
-            cur.execute("""
-                SELECT tenant_id, first_name || ' ' || last_name AS name, email, phone
-                FROM tenants
-            """)
+        else: # If no keyword is provided, list the first tenants
+            results = self.db.fetchall(f"{select} ORDER BY tenant_id LIMIT ?", (SEARCH_RESULT_LIMIT,))
 
-        results = cur.fetchall() # Fetch all results from the query
-        conn.close()
+        return results
 
+    def populate_tenants(self, results): # Show search results in the table (GUI thread)
+        self.results_table.setSortingEnabled(False) # Don't re-sort while rows are being filled in
         self.results_table.setRowCount(len(results)) # Set the number of rows in the table
         for row, data in enumerate(results): # Populate the table with tenant data
             # Iterate through each row of data
@@ -84,6 +96,7 @@ class TenantPickerDialog(QDialog): # This class inherits from QDialog
                 item = QTableWidgetItem(str(value))
                 item.setData(Qt.UserRole, data[0])  # Store tenant_id
                 self.results_table.setItem(row, col, item)
+        self.results_table.setSortingEnabled(True)
 
     def select_tenants(self): # This method is called when the user clicks the "Select Tenants" button
         # Get the selected items from the table
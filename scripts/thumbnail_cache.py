@@ -0,0 +1,127 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from PySide6.QtCore import QSize, Qt
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader, QPainter, QPixmap
+from config import THUMBNAILS_DIR, THUMBNAIL_SIZES
+
+HASH_MEMO_SIZE = 1024 # Image files whose content hash is remembered
+HASH_CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_QUALITY = 85 # JPEG quality of the stored thumbnails
+
+def decode_scaled(image_path, height): # Decode an image straight to height pixels tall (EXIF orientation applied)
+    # For JPEGs the decoder itself scales down (libjpeg DCT scaling), so a 12-megapixel photo
+    # is never decoded at full size; other formats are decoded and then scaled.
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    rotated = bool(reader.transformation() & QImageIOHandler.TransformationRotate90)
+    if size.isValid() and size.height() > 0:
+        upright = size.transposed() if rotated else size
+        if upright.height() > height:
+            scaled = QSize(max(1, round(upright.width() * height / upright.height())), height)
+            reader.setScaledSize(scaled.transposed() if rotated else scaled) # Scaling happens before the rotation
+    image = reader.read()
+    if not image.isNull() and image.height() != height:
+        image = image.scaledToHeight(height, Qt.SmoothTransformation)
+    return image
+
+def flatten(image): # Thumbnails are JPEGs: paint transparent images onto white
+    if not image.hasAlphaChannel():
+        return image
+    flat = QImage(image.size(), QImage.Format_RGB32)
+    flat.fill(Qt.white)
+    painter = QPainter(flat)
+    painter.drawImage(0, 0, image)
+    painter.end()
+    return flat
+
+
+# ThumbnailCache class keeping small copies of property images on disk
+# Each image gets one thumbnail per entry in THUMBNAIL_SIZES (180 px tall for the carousel, 64 px
+# for the image picker), stored as THUMBNAILS_DIR/3f/3fa9..._180.jpg under the SHA-256 of the
+# image's contents, so the same photo uploaded twice shares its thumbnails and a replaced file
+# gets new ones. All sizes are made from one scaled decode of the original, either when the image
+# is uploaded or the first time it is shown; after that only the small JPEG is ever decoded.
+# property_images.content_hash (migration 0008) records each image's hash so it isn't re-read;
+# for files without one the hash is computed and remembered by path, modification time and size.
+# Thumbnails no image row uses any more are deleted by StorageReconciler.
+# image() and generate() return QImages and can run on any thread; pixmap() is for the GUI thread.
+
+class ThumbnailCache:
+    def __init__(self, root=THUMBNAILS_DIR, sizes=THUMBNAIL_SIZES):
+        self.root = root
+        self.sizes = sorted(set(sizes.values()), reverse=True)
+        self._lock = threading.Lock()
+        self._hashes = OrderedDict() # (path, mtime_ns, size) -> content hash, least recently used first
+        self.stats = {"hits": 0, "generated": 0}
+
+    def path(self, content_hash, height): # Where the thumbnail of this height is stored
+        return os.path.join(self.root, content_hash[:2], f"{content_hash}_{height}.jpg")
+
+    def content_hash(self, image_path): # SHA-256 of an image file, reusing it if the file is unchanged
+        info = os.stat(image_path)
+        memo = (os.path.abspath(image_path), info.st_mtime_ns, info.st_size)
+        with self._lock:
+            content_hash = self._hashes.get(memo)
+            if content_hash is not None:
+                self._hashes.move_to_end(memo)
+                return content_hash
+        digest = hashlib.sha256()
+        with open(image_path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+        with self._lock:
+            self._hashes[memo] = content_hash
+            if len(self._hashes) > HASH_MEMO_SIZE:
+                self._hashes.popitem(last=False)
+        return content_hash
+
+    def generate(self, image_path, content_hash=None, image=None): # Make every size from one decode; returns (content_hash, {height: QImage})
+        # image: the picture already decoded (e.g. by an upload), so the file isn't read again
+        content_hash = content_hash or self.content_hash(image_path)
+        if image is None:
+            image = decode_scaled(image_path, self.sizes[0])
+        thumbnails = {}
+        if image.isNull(): # Missing, corrupt or unsupported file
+            return content_hash, thumbnails
+        image = flatten(image)
+        for height in self.sizes:
+            if image.height() != height:
+                image = image.scaledToHeight(height, Qt.SmoothTransformation)
+            target = self.path(content_hash, height)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            partial = f"{target}.{threading.get_ident()}.tmp" # Readers never see a half-written file
+            if image.save(partial, "JPG", THUMBNAIL_QUALITY):
+                os.replace(partial, target)
+            thumbnails[height] = image
+        self.stats["generated"] += 1
+        return content_hash, thumbnails
+
+    def image(self, image_path, height, content_hash=None): # Thumbnail of image_path as a QImage (null if it can't be read)
+        try:
+            content_hash = content_hash or self.content_hash(image_path)
+        except OSError:
+            return QImage()
+        thumbnail = QImage(self.path(content_hash, height))
+        if not thumbnail.isNull():
+            self.stats["hits"] += 1
+            return thumbnail
+        _, thumbnails = self.generate(image_path, content_hash)
+        return thumbnails.get(height, QImage())
+
+    def pixmap(self, image_path, height, content_hash=None): # Thumbnail as a QPixmap (GUI thread only)
+        return QPixmap.fromImage(self.image(image_path, height, content_hash))
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def thumbnail_cache(): # The ThumbnailCache used by the pages and dialogs
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ThumbnailCache()
+        return _shared
@@ -0,0 +1,102 @@
+import os
+import zlib
+from config import DOCUMENT_COMPRESSION, COMPRESSION_LEVELS, INCOMPRESSIBLE_EXTENSIONS
+
+try: # Optional dependency: smaller and faster than zlib (pip install zstandard)
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compression codecs for the encrypted document container
+# Every codec has a one-byte id that encryption_manager writes into the file header, so a
+# document is always decompressed with the codec it was stored with, whatever the current
+# settings. Codecs are looked up by id when reading and by name (DOCUMENT_COMPRESSION) when
+# writing; new ones are added with register_codec(), and an id must never be reused.
+
+PROBE_SIZE = 128 * 1024 # Bytes of a file test-compressed to see if compressing it is worthwhile
+PROBE_RATIO = 0.9 # Files whose sample does not shrink below this are stored uncompressed
+
+CODECS = {} # id -> codec
+
+# Passthrough class standing in for a compressor/decompressor when nothing is compressed
+
+class Passthrough:
+    def compress(self, data):
+        return data
+
+    def decompress(self, data):
+        return data
+
+    def flush(self):
+        return b""
+
+# Codec class for documents stored as they are (id 0); also the base class of the real codecs
+# compressor() and decompressor() return streaming objects with compress()/decompress() and flush().
+
+class Codec:
+    id = 0
+    name = "none"
+
+    def compressor(self, level=None):
+        return Passthrough()
+
+    def decompressor(self):
+        return Passthrough()
+
+# ZlibCodec class using the standard library, always available
+
+class ZlibCodec(Codec):
+    id = 1
+    name = "zlib"
+
+    def compressor(self, level=None):
+        return zlib.compressobj(6 if level is None else level)
+
+    def decompressor(self):
+        return zlib.decompressobj()
+
+# ZstdCodec class, registered only when the zstandard package is installed
+
+class ZstdCodec(Codec):
+    id = 2
+    name = "zstd"
+
+    def compressor(self, level=None):
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+
+    def decompressor(self):
+        return zstandard.ZstdDecompressor().decompressobj()
+
+def register_codec(codec): # Make a codec available for writing (by name) and reading (by id)
+    if CODECS.get(codec.id, codec).name != codec.name:
+        raise ValueError(f"Codec id {codec.id} is already used by {CODECS[codec.id].name}")
+    CODECS[codec.id] = codec
+    return codec
+
+NONE = register_codec(Codec())
+ZLIB = register_codec(ZlibCodec())
+if zstandard is not None:
+    register_codec(ZstdCodec())
+
+def codec_by_id(codec_id): # Codec for the id in a file header (KeyError if it isn't available here)
+    return CODECS[codec_id]
+
+def codec_by_name(name): # Registered codec with this name, or None
+    return next((codec for codec in CODECS.values() if codec.name == name), None)
+
+def default_codec(): # The configured codec, falling back to zlib when zstd isn't installed
+    return codec_by_name(DOCUMENT_COMPRESSION) or ZLIB
+
+def level(codec): # Configured compression level for a codec (None for its default)
+    return COMPRESSION_LEVELS.get(codec.name)
+
+def codec_for(file_path): # Codec to store a file with: none for formats that are already compressed
+    codec = default_codec()
+    if codec is NONE or os.path.splitext(file_path)[1].lower().lstrip(".") in INCOMPRESSIBLE_EXTENSIONS:
+        return NONE
+
+    with open(file_path, "rb") as f: # Other formats (e.g. PDFs with embedded scans) are judged by a sample
+        sample = f.read(PROBE_SIZE)
+    if not sample or len(zlib.compress(sample, 1)) > len(sample) * PROBE_RATIO:
+        return NONE
+    return codec
@@ -0,0 +1,139 @@
+import sqlite3
+
+# Secondary indexes for the STAR PMK database
+# init_database.py only creates primary keys, so every foreign-key lookup and every
+# dashboard filter used to be a full table scan. INDEXES lists the index set; migration
+# 0002_secondary_indexes applies it on fresh installs and existing databases alike.
+# QUERY_PLAN_CHECKS holds the dashboard and manager queries that must be served by an
+# index search; check_query_plans() runs EXPLAIN QUERY PLAN on them and reports any step
+# that scans a whole table or index, except for the checks in FULL_INDEX_SCANS_EXPECTED.
+
+INDEXES = {
+    # Foreign keys
+    "idx_tenancy_tenants_tenant":      "CREATE INDEX IF NOT EXISTS idx_tenancy_tenants_tenant ON tenancy_tenants (tenant_id)",
+    "idx_tenancies_property":          "CREATE INDEX IF NOT EXISTS idx_tenancies_property ON tenancies (property_id, start_date, end_date)",
+    "idx_properties_landlord":         "CREATE INDEX IF NOT EXISTS idx_properties_landlord ON properties (landlord_id)",
+    "idx_property_images_property":    "CREATE INDEX IF NOT EXISTS idx_property_images_property ON property_images (property_id)",
+    "idx_payments_tenant":             "CREATE INDEX IF NOT EXISTS idx_payments_tenant ON payments (tenant_id)",
+    "idx_payments_tenancy":            "CREATE INDEX IF NOT EXISTS idx_payments_tenancy ON payments (tenancy_id)",
+    "idx_maintenance_property":        "CREATE INDEX IF NOT EXISTS idx_maintenance_property ON maintenance (property_id)",
+    "idx_tenant_documents_owner":      "CREATE INDEX IF NOT EXISTS idx_tenant_documents_owner ON tenant_documents (tenant_id)",
+    "idx_landlord_documents_owner":    "CREATE INDEX IF NOT EXISTS idx_landlord_documents_owner ON landlord_documents (landlord_id)",
+    "idx_property_documents_owner":    "CREATE INDEX IF NOT EXISTS idx_property_documents_owner ON property_documents (property_id)",
+    "idx_tenancy_documents_owner":     "CREATE INDEX IF NOT EXISTS idx_tenancy_documents_owner ON tenancy_documents (tenancy_id)",
+
+    # Filter and sort columns
+    "idx_tenancies_end_date":          "CREATE INDEX IF NOT EXISTS idx_tenancies_end_date ON tenancies (end_date)",
+    "idx_payments_status_due":         "CREATE INDEX IF NOT EXISTS idx_payments_status_due ON payments (status, due_date)",
+    "idx_payments_type_due":           "CREATE INDEX IF NOT EXISTS idx_payments_type_due ON payments (payment_type, due_date)",
+    "idx_payments_due_date":           "CREATE INDEX IF NOT EXISTS idx_payments_due_date ON payments (due_date)",
+    "idx_payments_payment_date":       "CREATE INDEX IF NOT EXISTS idx_payments_payment_date ON payments (payment_date)",
+    "idx_maintenance_status":          "CREATE INDEX IF NOT EXISTS idx_maintenance_status ON maintenance (status)",
+    "idx_maintenance_date_reported":   "CREATE INDEX IF NOT EXISTS idx_maintenance_date_reported ON maintenance (date_reported)",
+    "idx_landlords_name":              "CREATE INDEX IF NOT EXISTS idx_landlords_name ON landlords (first_name, last_name)",
+    "idx_tenant_documents_expiry":     "CREATE INDEX IF NOT EXISTS idx_tenant_documents_expiry ON tenant_documents (expiry_date)",
+    "idx_landlord_documents_expiry":   "CREATE INDEX IF NOT EXISTS idx_landlord_documents_expiry ON landlord_documents (expiry_date)",
+    "idx_property_documents_expiry":   "CREATE INDEX IF NOT EXISTS idx_property_documents_expiry ON property_documents (expiry_date)",
+    "idx_tenancy_documents_expiry":    "CREATE INDEX IF NOT EXISTS idx_tenancy_documents_expiry ON tenancy_documents (expiry_date)",
+    "idx_activity_logs_timestamp":     "CREATE INDEX IF NOT EXISTS idx_activity_logs_timestamp ON activity_logs (timestamp)",
+}
+
+# Queries that must never fall back to a full table scan
+# Keep these in step with the subqueries of DASHBOARD_STATS_QUERY (dashboard_stats.py), the
+# EXPIRING_PAGE_QUERY of expiry_scanner.py and the managers/pickers
+QUERY_PLAN_CHECKS = {
+    "dashboard: rent due (30d)": """
+        SELECT COUNT(*) FROM payments
+        WHERE payment_type = 'rent'
+        AND due_date BETWEEN DATE('now') AND DATE('now', '+30 day')""",
+    "dashboard: maintenance counts":
+        "SELECT status, COUNT(*) FROM maintenance GROUP BY status",
+    "dashboard: vacant properties": """
+        SELECT COUNT(*) FROM properties p
+        WHERE NOT EXISTS (
+            SELECT 1 FROM tenancies t
+            WHERE t.property_id = p.property_id AND DATE('now') BETWEEN t.start_date AND t.end_date)""",
+    "dashboard: tenancies ending soon":
+        "SELECT COUNT(*) FROM tenancies WHERE end_date <= DATE('now', '+30 day')",
+    "dashboard: overdue payments":
+        "SELECT COUNT(*) FROM payments WHERE status = 'unpaid' AND due_date < DATE('now')",
+    "dashboard: expiring documents": """
+        SELECT (SELECT COUNT(*) FROM tenant_documents WHERE expiry_date <= DATE('now', '+30 day'))
+        + (SELECT COUNT(*) FROM landlord_documents WHERE expiry_date <= DATE('now', '+30 day'))
+        + (SELECT COUNT(*) FROM property_documents WHERE expiry_date <= DATE('now', '+30 day'))
+        + (SELECT COUNT(*) FROM tenancy_documents WHERE expiry_date <= DATE('now', '+30 day'))""",
+    "dashboard: activity feed": """
+        SELECT action, details, timestamp FROM activity_logs
+        ORDER BY timestamp DESC LIMIT 10""",
+    "payments: manager list": """
+        SELECT p.payment_id, t.first_name || ' ' || t.last_name AS tenant_name
+        FROM payments p
+        JOIN tenants t ON p.tenant_id = t.tenant_id
+        ORDER BY p.payment_date DESC""",
+    "payments: manager next page (keyset)": """
+        SELECT * FROM (
+            SELECT p.payment_id, p.payment_date, t.first_name || ' ' || t.last_name AS tenant_name
+            FROM payments p
+            JOIN tenants t ON p.tenant_id = t.tenant_id
+        ) WHERE (payment_date, payment_id) < ('2024-01-01', 1)
+        ORDER BY payment_date DESC, payment_id DESC LIMIT 10""",
+    "payments: by tenant":
+        "SELECT payment_id FROM payments WHERE tenant_id = 1",
+    "tenancies: by tenant": """
+        SELECT t.tenancy_id FROM tenancies t
+        JOIN tenancy_tenants tt ON tt.tenancy_id = t.tenancy_id
+        WHERE tt.tenant_id = 1""",
+    "maintenance: by property":
+        "SELECT maintenance_id FROM maintenance WHERE property_id = 1",
+    "images: by property":
+        "SELECT image_id, image_path FROM property_images WHERE property_id = 1",
+    "documents: tenant list":
+        "SELECT doc_id FROM tenant_documents WHERE tenant_id = 1",
+    "documents: landlord list":
+        "SELECT doc_id FROM landlord_documents WHERE landlord_id = 1",
+    "documents: property list":
+        "SELECT doc_id FROM property_documents WHERE property_id = 1",
+    "documents: tenancy list":
+        "SELECT doc_id FROM tenancy_documents WHERE tenancy_id = 1",
+    "documents: expiring list (next page)": """
+        SELECT entity_type, entity_id, doc_id, expiry_date FROM document_expiries
+        WHERE expiry_date <= DATE('now', '+30 day') AND expiry_date >= '2024-01-01'
+          AND (expiry_date, doc_id, entity_type) > ('2024-01-01', 1, 'tenant')
+          AND DATE(expiry_date, '+0 day') = expiry_date
+        ORDER BY expiry_date, doc_id, entity_type LIMIT 50""",
+}
+
+# Checks whose plan walks a whole index on purpose: an ordered scan that stops at the page's
+# LIMIT (activity feed, payments list), or a count over every row where the covering index is
+# the smallest thing to read (maintenance counts by status, vacant properties)
+FULL_INDEX_SCANS_EXPECTED = {
+    "dashboard: maintenance counts",
+    "dashboard: vacant properties",
+    "dashboard: activity feed",
+    "payments: manager list",
+}
+
+def find_table_scans(conn, query, index_scans_ok=False): # Return the EXPLAIN QUERY PLAN steps that scan a whole table or index
+    scans = []
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {query}"):
+        detail = row[-1]
+        words = detail.split()
+        # "SCAN payments" (or "SCAN p" for an alias) reads the whole table and
+        # "SCAN p USING [COVERING] INDEX ..." the whole index; only SEARCH steps use the index
+        # to narrow the rows. "SCAN (subquery-1)" and "SCAN CONSTANT ROW" read no table.
+        if len(words) >= 2 and words[0] == "SCAN" and not words[1].startswith("(") and words[1] != "CONSTANT":
+            if index_scans_ok and "INDEX" in words[2:5]:
+                continue
+            scans.append(detail)
+    return scans
+
+def check_query_plans(conn, checks=QUERY_PLAN_CHECKS): # Map each failing check to its full scans
+    failures = {}
+    for name, query in checks.items():
+        try:
+            scans = find_table_scans(conn, query, index_scans_ok=name in FULL_INDEX_SCANS_EXPECTED)
+        except sqlite3.Error as e: # A query that no longer matches the schema is a failure too
+            scans = [f"error: {e}"]
+        if scans:
+            failures[name] = scans
+    return failures
@@ -0,0 +1,38 @@
+import os
+import webbrowser
+from PySide6.QtGui import QImageReader
+from scripts.utils.image_preview import TempImagePreview
+
+# Shared document preview used by the tenant, landlord, property and tenancy details pages
+# Images are decrypted into memory and shown by TempImagePreview from those bytes, so no
+# plaintext is written to disk. Formats that need an external viewer (PDFs) are decrypted
+# to a temp file in TEMP_PREVIEW_DIR and opened with the system viewer; those files are
+# removed when the app exits.
+
+IMAGE_FORMATS = {bytes(fmt).decode().lower() for fmt in QImageReader.supportedImageFormats()} # e.g. png, jpg, jpeg
+EXTERNAL_FORMATS = {"pdf"} # Opened in the default viewer
+
+def document_extension(filename): # Lower-case extension of the original file ("x.pdf.encrypted" -> "pdf")
+    name = filename[:-len(".encrypted")] if filename.endswith(".encrypted") else filename
+    return os.path.splitext(name)[1].lstrip(".").lower()
+
+def preview_document(doc_manager, entity_type, entity_id, filename, parent=None): # Show a document; False if it could not be opened
+    extension = document_extension(filename)
+
+    if extension in IMAGE_FORMATS: # Decrypt into memory and show it in the app
+        data = doc_manager.decrypt_document_bytes(entity_type, entity_id, filename)
+        if data is None:
+            return False
+        dialog = TempImagePreview(parent=parent, data=data)
+        dialog.exec()
+        return True
+
+    if extension in EXTERNAL_FORMATS: # The system viewer needs a real file
+        path = doc_manager.decrypt_document_to_temp(entity_type, entity_id, filename)
+        if not path:
+            return False
+        webbrowser.open(path)
+        return True
+
+    print(f"[Preview] No preview available for .{extension} files: {filename}")
+    return False
@@ -1,6 +1,14 @@
 import os
 from config import TEMP_PREVIEW_DIR
 
+def entity_folder_name(entity_id, name): # Folder holding an entity's documents, e.g. "4_12_High_Street_AB1_2CD"
+    # Spaces become underscores and anything else that is not a letter or digit is dropped
+    if not name:
+        return str(entity_id)
+    sanitized = "_".join(name.split())
+    sanitized = "".join(c if c.isalnum() or c == "_" else "" for c in sanitized)
+    return f"{entity_id}_{sanitized}"
+
 def cleanup_temp_preview_folder():
     # Clear the temporary preview folder
     # This is used to remove any temporary files that may have been created